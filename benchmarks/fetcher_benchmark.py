@@ -0,0 +1,103 @@
+"""
+Throughput benchmark of NHLDataFetcher against a local mock of the NHL play-by-play API.
+
+Each run fetches the same game IDs into a fresh temporary NHL_DATA_PATH, so nothing is served from the local cache.
+The sequential mode (1 worker) is compared with concurrent modes:
+
+    $ python benchmarks/fetcher_benchmark.py --games 500 --latency 0.05 --workers 1 8 32
+
+"""
+from ift6758.data.nhl_data_fetcher import NHLDataFetcher
+from ift6758.data.nhl_mock_server import NHLMockServer
+import argparse
+import os
+import tempfile
+import time
+
+def run_fetch_benchmark(server: NHLMockServer, game_ids: list, workers: int, requests_per_second: float) -> dict:
+    """Fetches game IDs from the mock server into an empty data directory and measures the throughput.
+
+    Args:
+        server (NHLMockServer): Running mock server.
+        game_ids (list): Game IDs to fetch.
+        workers (int): Number of concurrent workers of the fetcher.
+        requests_per_second (float): Rate limit of the fetcher.
+
+    Returns:
+        dict: Games per second, bytes per second, retries, failures and latency percentiles of the run.
+    """
+    with tempfile.TemporaryDirectory() as data_path:
+        os.environ['NHL_DATA_PATH'] = data_path
+        fetcher = NHLDataFetcher(
+            workers=workers,
+            requests_per_second=requests_per_second,
+            burst=max(workers, 1),
+            api_url=server.url
+        )
+
+        start = time.perf_counter()
+        fetcher.fetch_raw_games_data(game_ids, description=f'{workers} worker(s)')
+        elapsed = time.perf_counter() - start
+
+        metrics = fetcher.get_fetch_metrics()
+        fetcher.catalog.connection.close()
+
+    bytes_total = sum(season['bytes'] for season in metrics.values())
+    latencies = {p: max((season[f'latency_p{p}'] or 0) for season in metrics.values()) for p in (50, 90, 99)}
+
+    return {
+        'workers': workers,
+        'seconds': elapsed,
+        'games_per_second': len(game_ids) / elapsed,
+        'bytes_per_second': bytes_total / elapsed,
+        'retries': sum(season['retries'] for season in metrics.values()),
+        'failures': sum(season['failures'] for season in metrics.values()),
+        **{f'latency_p{p}': latency for p, latency in latencies.items()}
+    }
+
+
+def print_results(results: list):
+    """Prints the results of the benchmark runs as a table.
+
+    Args:
+        results (list): Results of run_fetch_benchmark.
+    """
+    print(f"{'workers':>8} {'seconds':>9} {'games/s':>9} {'MB/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'retries':>8} {'failures':>9}")
+
+    for result in results:
+        print(
+            f"{result['workers']:>8} {result['seconds']:>9.2f} {result['games_per_second']:>9.1f} "
+            f"{result['bytes_per_second'] / 1e6:>8.2f} {result['latency_p50'] * 1000:>8.1f} "
+            f"{result['latency_p90'] * 1000:>8.1f} {result['latency_p99'] * 1000:>8.1f} "
+            f"{result['retries']:>8} {result['failures']:>9}"
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark NHLDataFetcher against a local mock of the NHL API.')
+    parser.add_argument('--games', type=int, default=200, help='Number of regular season games to fetch.')
+    parser.add_argument('--season', type=int, default=2023)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--latency', type=float, default=0.05, help='Server latency per request in seconds.')
+    parser.add_argument('--latency-jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--missing-rate', type=float, default=0.0)
+    parser.add_argument('--synthetic-plays', type=int, default=300)
+    parser.add_argument('--recorded-data-path', default=None, help='Serve recorded games from this directory.')
+    parser.add_argument('--requests-per-second', type=float, default=10000)
+    args = parser.parse_args()
+
+    game_ids = [f'{args.season}02{str(game).zfill(4)}' for game in range(1, args.games + 1)]
+
+    with NHLMockServer(
+            recorded_data_path=args.recorded_data_path,
+            latency=args.latency,
+            latency_jitter=args.latency_jitter,
+            error_rate=args.error_rate,
+            missing_rate=args.missing_rate,
+            synthetic_plays=args.synthetic_plays,
+            seed=0
+        ) as server:
+        results = [run_fetch_benchmark(server, game_ids, workers, args.requests_per_second) for workers in args.workers]
+
+    print_results(results)
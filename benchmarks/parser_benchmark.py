@@ -0,0 +1,265 @@
+"""
+Benchmark suite of NHLDataParser on synthetic play-by-play games (see NHLSyntheticGameGenerator).
+
+Two benchmarks are run:
+    - game: latency of get_shot_and_goal_pbp_df's parsing (raw_game_data_to_df) on games held in memory, and the peak
+      memory of a game's parse.
+    - season: throughput of a season parse from the raw games stored in a fresh temporary NHL_DATA_PATH (the games are
+      fetched from a local mock of the NHL API first, which isn't timed), the time to read the cached season again
+      and the peak memory of the season parse.
+
+The results are compared with a stored baseline, and the run fails when a metric regressed by more than the tolerance.
+Baselines depend on the machine, so none is shipped: the first run saves one, later runs compare with it. Save a new
+one before working on the parser and compare with it afterwards:
+
+    $ python benchmarks/parser_benchmark.py --save-baseline
+    $ python benchmarks/parser_benchmark.py --tolerance 0.1
+
+With --profile, the time of each stage of a season parse is also reported (see NHLStageProfiler).
+
+"""
+from ift6758.data.nhl_data_fetcher import NHLDataFetcher
+from ift6758.data.nhl_data_parser import NHLDataParser
+from ift6758.data.nhl_mock_server import NHLMockServer
+from ift6758.data.nhl_profiler import NHLStageProfiler
+from ift6758.data.nhl_synthetic_games import NHLSyntheticGameGenerator
+from ift6758.data.shared_constants import REGULAR_SEASON_GAME_TYPE
+import argparse
+import json
+import numpy as np
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parser_baseline.json')
+
+# Metrics that are better when higher, the other metrics (latencies, durations, memory) are better when lower
+HIGHER_IS_BETTER_METRICS = {'season_games_per_second', 'season_rows_per_second'}
+
+def measure_peak_memory(function) -> tuple:
+    """Runs a function while tracing the memory allocations of Python.
+
+    Args:
+        function (callable): Function to run, without arguments.
+
+    Returns:
+        tuple: Result of the function and peak traced memory in bytes (result, peak: int)
+    """
+    tracemalloc.start()
+
+    try:
+        result = function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, peak
+
+
+def run_game_benchmark(generator: NHLSyntheticGameGenerator, game_ids: list, repeats: int) -> dict:
+    """Parses games held in memory one at a time and measures the latency of each parse.
+
+    Args:
+        generator (NHLSyntheticGameGenerator): Generator of the games.
+        game_ids (list): Game IDs to parse.
+        repeats (int): Number of times each game is parsed.
+
+    Returns:
+        dict: Latency percentiles, mean latency and peak memory of a game's parse.
+    """
+    with tempfile.TemporaryDirectory() as data_path:
+        os.environ['NHL_DATA_PATH'] = data_path
+        parser = NHLDataParser()
+        games = dict(generator.generate_games(game_ids))
+        latencies = []
+
+        # The first parse warms up the imports and caches, it isn't measured
+        parser.raw_game_data_to_df(games[game_ids[0]], game_ids[0])
+
+        for _ in range(repeats):
+            for game_id, game_data in games.items():
+                start = time.perf_counter()
+                parser.raw_game_data_to_df(game_data, game_id)
+                latencies.append(time.perf_counter() - start)
+
+        _, peak = measure_peak_memory(lambda: parser.raw_game_data_to_df(games[game_ids[0]], game_ids[0]))
+        parser.data_fetcher.catalog.connection.close()
+
+    latencies = np.array(latencies) * 1000
+
+    return {
+        'game_p50_ms': float(np.percentile(latencies, 50)),
+        'game_p90_ms': float(np.percentile(latencies, 90)),
+        'game_p99_ms': float(np.percentile(latencies, 99)),
+        'game_mean_ms': float(latencies.mean()),
+        'game_peak_mb': peak / 1e6
+    }
+
+
+def parse_season(
+        server: NHLMockServer,
+        season: int,
+        game_ids: list,
+        workers: int,
+        trace_memory: bool,
+        profiler: NHLStageProfiler = None
+    ) -> dict:
+    """Parses a season of games in an empty data directory. The games are fetched from the mock server before the parse.
+
+    Args:
+        server (NHLMockServer): Running mock server.
+        season (int): Season of the games.
+        game_ids (list): Regular season game IDs of the season.
+        workers (int): Number of processes used to parse the games.
+        trace_memory (bool): If the memory allocations of the parse are traced (which slows it down).
+        profiler (NHLStageProfiler, optional): Profiler of the parser's stages. Defaults to None.
+
+    Returns:
+        dict: Parse and cached read durations, number of rows and peak memory (None when not traced) of the season.
+    """
+    with tempfile.TemporaryDirectory() as data_path:
+        os.environ['NHL_DATA_PATH'] = data_path
+        os.environ['NHL_API_URL'] = server.url
+
+        # The schedule stands in for the stats API, so only the benchmark's games are part of the season
+        with open(os.path.join(data_path, f'schedule_{season}.json'), 'w') as f:
+            json.dump({'data': [{'id': int(game_id), 'gameType': REGULAR_SEASON_GAME_TYPE} for game_id in game_ids]}, f)
+
+        fetcher = NHLDataFetcher(workers=8, requests_per_second=10000, burst=8, api_url=server.url)
+        fetcher.fetch_raw_games_data(game_ids, description='benchmark games')
+        fetcher.catalog.connection.close()
+
+        parser = NHLDataParser(workers=workers, profiler=profiler)
+        parse = lambda: parser.query_shots(season, game_type=REGULAR_SEASON_GAME_TYPE)
+
+        start = time.perf_counter()
+        season_df, peak = measure_peak_memory(parse) if trace_memory else (parse(), None)
+        parse_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parse()
+        cached_seconds = time.perf_counter() - start
+
+        parser.data_fetcher.catalog.connection.close()
+
+    return {'parse_seconds': parse_seconds, 'cached_seconds': cached_seconds, 'rows': len(season_df), 'peak': peak}
+
+
+def run_season_benchmark(server: NHLMockServer, season: int, game_ids: list, workers: int) -> dict:
+    """Measures the throughput of a season parse, then its peak memory in a second, traced, parse.
+
+    Args:
+        server (NHLMockServer): Running mock server.
+        season (int): Season of the games.
+        game_ids (list): Regular season game IDs of the season.
+        workers (int): Number of processes used to parse the games.
+
+    Returns:
+        dict: Games and rows parsed per second, duration of a cached read and peak memory of the season parse.
+    """
+    timed = parse_season(server, season, game_ids, workers, trace_memory=False)
+    traced = parse_season(server, season, game_ids, workers, trace_memory=True)
+
+    return {
+        'season_games_per_second': len(game_ids) / timed['parse_seconds'],
+        'season_rows_per_second': timed['rows'] / timed['parse_seconds'],
+        'season_cached_seconds': timed['cached_seconds'],
+        'season_peak_mb': traced['peak'] / 1e6
+    }
+
+
+def compare_with_baseline(metrics: dict, baseline: dict, tolerance: float) -> list:
+    """Compares metrics with baseline metrics.
+
+    Args:
+        metrics (dict): Metrics of the run.
+        baseline (dict): Metrics of the baseline.
+        tolerance (float): Relative change beyond which a worse metric is a regression (0.2 for 20%).
+
+    Returns:
+        list: Comparison of each metric of the baseline (metric: str, baseline: float, value: float, change: float, regressed: bool)
+    """
+    comparisons = []
+
+    for metric, baseline_value in baseline.items():
+        if metric not in metrics or not baseline_value:
+            continue
+
+        change = metrics[metric] / baseline_value - 1
+        worse_change = -change if metric in HIGHER_IS_BETTER_METRICS else change
+        comparisons.append((metric, baseline_value, metrics[metric], change, worse_change > tolerance))
+
+    return comparisons
+
+
+def print_results(metrics: dict, comparisons: list):
+    """Prints the metrics of the run, with their change from the baseline when there is one.
+
+    Args:
+        metrics (dict): Metrics of the run.
+        comparisons (list): Results of compare_with_baseline.
+    """
+    compared = {metric: (baseline_value, change, regressed) for metric, baseline_value, _, change, regressed in comparisons}
+    print(f"{'metric':<26} {'value':>12} {'baseline':>12} {'change':>9}")
+
+    for metric, value in metrics.items():
+        if metric in compared:
+            baseline_value, change, regressed = compared[metric]
+            print(f"{metric:<26} {value:>12.2f} {baseline_value:>12.2f} {change:>+8.1%}{' REGRESSION' if regressed else ''}")
+        else:
+            print(f"{metric:<26} {value:>12.2f} {'-':>12} {'-':>9}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark NHLDataParser on synthetic play-by-play games.')
+    parser.add_argument('--games', type=int, default=100, help='Number of regular season games of the season benchmark.')
+    parser.add_argument('--latency-games', type=int, default=20, help='Number of games of the latency benchmark.')
+    parser.add_argument('--repeats', type=int, default=5, help='Number of times each game of the latency benchmark is parsed.')
+    parser.add_argument('--plays', type=int, default=300, help='Number of plays of each game.')
+    parser.add_argument('--season', type=int, default=2023)
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes used to parse the season.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline file to compare with or to save.')
+    parser.add_argument('--save-baseline', action='store_true', help='Save the results as the new baseline.')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Relative change beyond which a worse metric fails the run.')
+    parser.add_argument('--profile', action='store_true', help='Report the time of each stage of a season parse.')
+    args = parser.parse_args()
+
+    generator = NHLSyntheticGameGenerator(plays_per_game=args.plays, seed=args.seed)
+    config = {'games': args.games, 'latency_games': args.latency_games, 'repeats': args.repeats, 'plays': args.plays, 'workers': args.workers}
+
+    metrics = run_game_benchmark(generator, generator.get_season_game_ids(args.season, args.latency_games), args.repeats)
+
+    with NHLMockServer(synthetic_plays=args.plays, seed=args.seed) as server:
+        metrics.update(run_season_benchmark(server, args.season, generator.get_season_game_ids(args.season, args.games), args.workers))
+
+        if args.profile:
+            profiler = NHLStageProfiler()
+            parse_season(server, args.season, generator.get_season_game_ids(args.season, args.games), args.workers, False, profiler)
+            print(profiler.get_report().to_string(index=False, float_format='{:.3f}'.format))
+
+    # The first run on a machine has nothing to compare with, its results become the baseline
+    if args.save_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w') as f:
+            json.dump({'config': config, 'metrics': metrics}, f, indent=4)
+
+        print_results(metrics, [])
+        print(f"Baseline saved to {args.baseline}")
+        sys.exit(0)
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+
+    if baseline['config'] != config:
+        print(f"The baseline was run with another configuration: {baseline['config']}")
+
+    comparisons = compare_with_baseline(metrics, baseline['metrics'], args.tolerance)
+    print_results(metrics, comparisons)
+
+    regressions = [metric for metric, _, _, _, regressed in comparisons if regressed]
+
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
@@ -2,26 +2,47 @@ import os
 import logging
 import pandas as pd
 
-from ift6758.data.nhl_data_fetcher import NHLDataFetcher
 from ift6758.data.nhl_data_parser import NHLDataParser
+from ift6758.data.shared_constants import FINAL_GAME_STATES
 
 logger = logging.getLogger(__name__)
 
 class GameClient:
-    def __init__(self):
+    def __init__(self, features: list = None):
         """
         Initialize the game client with the NHL data fetcher and parser.
-        Keeps track of processed events to only return new ones.
+        Keeps the parsing state of the current game to only parse and return new events.
+
+        Args:
+            features (list, optional): Features of the returned events, only their computations run. Defaults to None (all of them).
         """
-        self.data_fetcher = NHLDataFetcher()
         self.data_parser = NHLDataParser()
-        self.processed_events = pd.DataFrame()
-        self.current_game_id = None  
+        # The parser's fetcher is shared, so a single catalog, store and HTTP client serve the data directory
+        self.data_fetcher = self.data_parser.data_fetcher
+        self.features = features
+        self.current_game_id = None
+        self.game_state = None
+        self.last_sort_order = None
+
+    def get_game_data(self, game_id: str) -> dict:
+        """
+        Get the raw game data for a given game_id. Live games are refreshed through
+        the fetcher's cache policy, so polling an unchanged game is cheap.
+
+        Args:
+            game_id (str): ID of the game to get the data for
+
+        Returns:
+            dict: Raw play-by-play data of the game
+        """
+        self.data_fetcher.fetch_raw_game_data(game_id)
+        return self.data_fetcher.load_raw_game_data(game_id)
 
     def get_new_events(self, game_id: str) -> pd.DataFrame:
         """
-        Get game data for a given game_id. Only process events that haven't been 
-        seen before. Extract the required basic features.
+        Get the events of a game that weren't returned yet. Only the plays that follow the last
+        parsed play (by sortOrder) are parsed, continuing from the game's parsing state, so each
+        ping costs only its new plays.
 
         Args:
             game_id (str): ID of the game to fetch events from
@@ -29,14 +50,40 @@ class GameClient:
         Returns:
             pd.DataFrame: DataFrame containing the required features for new events
         """
-        # IF new gameid, reset processed events
+        # IF new gameid, reset the parsing state
         if self.current_game_id != game_id:
-            self.processed_events = pd.DataFrame()
             self.current_game_id = game_id
-        # all events and features
-        all_events_df = self.data_parser.get_shot_and_goal_pbp_df(game_id)
+            self.game_state = None
+            self.last_sort_order = -1
+
+        game_data = self.get_game_data(game_id)
+
+        if self.game_state is None:
+            self.game_state = self.data_parser.new_game_state(game_data)
+
+        # Plays are ordered by sortOrder, so the new plays are at the end
+        plays = game_data.get('plays', [])
+        first_new_play = len(plays)
+
+        while first_new_play > 0 and plays[first_new_play - 1]['sortOrder'] > self.last_sort_order:
+            first_new_play -= 1
+
+        new_plays = plays[first_new_play:]
+
+        try:
+            new_events = self.data_parser.parse_plays(
+                new_plays,
+                game_id,
+                self.game_state,
+                partial=game_data.get('gameState') not in FINAL_GAME_STATES,
+                features=self.features
+            )
+        except ValueError as e:
+            # The plays stay unparsed and are parsed again with the next plays
+            logger.warning(f"New events of game {game_id} can't be parsed yet: {e}")
+            return pd.DataFrame()
 
-        # only get new events
-        self.processed_events = pd.concat([self.processed_events, all_events_df]).drop_duplicates(keep=False)
+        if new_plays:
+            self.last_sort_order = new_plays[-1]['sortOrder']
 
-        return self.processed_events
+        return new_events
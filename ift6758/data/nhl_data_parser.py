@@ -1,19 +1,181 @@
 from ift6758.data.nhl_data_fetcher import NHLDataFetcher
-from ift6758.data.nhl_helper import NHLHelper
-import json
-import math
+from ift6758.data.nhl_event_store import NHLEventStore, EVENT_STORE_DTYPES, EVENT_STORE_FILE_EXTENSION, EVENT_STORE_TABLES, load_event_store
+from ift6758.data.nhl_feature_registry import NHLFeatureRegistry, PLAY_SCOPE, SHOT_SCOPE
+from ift6758.data.nhl_game_catalog import DIMENSION_TABLES, GAME_STATUS_FETCHED
+from ift6758.data.nhl_profiler import NHLStageProfiler
+from ift6758.data.shared_constants import REGULAR_SEASON_GAME_TYPE, PLAYOFF_GAME_TYPE
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 import numpy as np
+import operator
 import os
 import pandas as pd
+import warnings
+
+try:
+    import pyarrow
+    import pyarrow.dataset
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
 
 RELEVANT_EVENT_TYPES = ['shot-on-goal', 'goal']
 
-UNECESSARY_PBP_COLUMNS = ['eventId', 'typeCode', 'situationCode', 'sortOrder']
-UNECESSARY_EXTRA_COLUMNS = ['periodDescriptor', 'details']
+PLAY_COLUMNS = [
+    'typeDescKey',
+    'timeRemaining',
+    'timeInPeriod',
+    'periodNumber',
+    'periodType',
+    'xCoord',
+    'yCoord',
+    'zoneCode',
+    'shotType',
+    'goalieInNetId',
+    'shootingPlayerId'
+    ]
+FLOAT_PLAY_COLUMNS = ['xCoord', 'yCoord']
 
-EVENT_COMMON_COLUMNS = ['xCoord', 'yCoord']
-SHOT_AND_GOAL_COMMON_COLUMNS = ['shotType', 'goalieInNetId']
-PERIOD_COMMON_COLUMNS = ['number', 'periodType']
+# Columns read as is from the top level of a play or from its details, the others are derived (see __extract_play_columns)
+TOP_LEVEL_PLAY_KEYS = ['eventId', 'sortOrder', 'typeDescKey', 'timeInPeriod', 'situationCode', 'homeTeamDefendingSide']
+DETAIL_PLAY_KEYS = [
+    'eventOwnerTeamId',
+    'xCoord',
+    'yCoord',
+    'zoneCode',
+    'shotType',
+    'scoringPlayerId',
+    'assist1PlayerId',
+    'assist2PlayerId',
+    'goalieInNetId',
+    'blockingPlayerId',
+    'hittingPlayerId',
+    'hitteePlayerId',
+    'winningPlayerId',
+    'losingPlayerId',
+    'playerId',
+    'committedByPlayerId',
+    'drawnByPlayerId',
+    'typeCode',
+    'descKey',
+    'duration',
+    'reason',
+    'awayScore',
+    'homeScore',
+    'awaySOG',
+    'homeSOG'
+    ]
+
+# Columns of every event of the event store (see NHLDataParser.raw_game_data_to_event_store)
+EVENT_COLUMNS = [col for col in EVENT_STORE_DTYPES['events'] if col != 'gameId']
+
+# Event stores of seasons are cached under NHL_DATA_PATH/events/
+EVENT_STORE_DIR = 'events'
+
+# Parsed seasons are cached as Parquet (zstd compressed) when pyarrow is installed, as CSV otherwise
+SEASON_FILE_EXTENSION = '.parquet' if pyarrow is not None else '.csv'
+PARQUET_COMPRESSION = 'zstd'
+# Rows per Parquet row group, so filtered queries can skip the row groups whose statistics don't match
+PARQUET_ROW_GROUP_SIZE = 10000
+
+# Operators of the row filters of NHLDataParser.query_shots, as (column, operator, value) tuples
+FILTER_OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda column, values: column.isin(values),
+    'not in': lambda column, values: ~column.isin(values)
+    }
+
+# Types of the columns of the cached files. Only the IDs of the players and teams are cached, their names are kept
+# in the catalog's dimension tables and resolved when the files are read (see NAME_ID_COLUMNS)
+SEASON_COLUMN_DTYPES = {
+    'gameId': 'object',
+    'timeRemaining': 'int64',
+    'periodNumber': 'int64',
+    'timeInPeriod': 'object',
+    'isGoal': 'int64',
+    'shotType': 'object',
+    'emptyNet': 'int64',
+    'xCoord': 'float64',
+    'yCoord': 'float64',
+    'zoneCode': 'object',
+    'shootingTeamId': 'Int64',
+    'shotDistance': 'float64',
+    'shotAngle': 'float64',
+    'shootingTeamSide': 'int64',
+    'shootingPlayerId': 'Int64',
+    'goalieInNetId': 'Int64',
+    'previousEvent': 'object',
+    'timeDiff': 'float64',
+    'previousEventX': 'float64',
+    'previousEventY': 'float64',
+    'rebound': 'int64',
+    'distanceDiff': 'float64',
+    'shotAngleDiff': 'float64',
+    'speed': 'float64'
+    }
+
+# Arrow types of the pandas types of SEASON_COLUMN_DTYPES, so every Parquet file has the same schema
+ARROW_TYPES = {'object': 'string', 'int64': 'int64', 'Int64': 'int64', 'float64': 'double'}
+SEASON_ARROW_SCHEMA = pyarrow.schema([
+    (col, pyarrow.type_for_alias(ARROW_TYPES[dtype])) for col, dtype in SEASON_COLUMN_DTYPES.items()
+    ]) if pyarrow is not None else None
+
+# Parsed games are cached one file per game under NHL_DATA_PATH/parsed/{season}/
+# Bump PARSER_VERSION whenever the parsed features change, so every cached game is parsed again
+PARSED_GAMES_DIR = 'parsed'
+PARSER_VERSION = 4
+
+# Compact types of the columns, see NHLDataParser.to_compact_df
+COMPACT_COLUMN_DTYPES = {
+    'gameId': 'int64',
+    'timeRemaining': 'int16',
+    'periodNumber': 'int8',
+    'timeInPeriod': 'category',
+    'isGoal': 'int8',
+    'shotType': 'category',
+    'emptyNet': 'int8',
+    'xCoord': 'float32',
+    'yCoord': 'float32',
+    'zoneCode': 'category',
+    'shootingTeam': 'category',
+    'shootingTeamId': 'Int16',
+    'shotDistance': 'float32',
+    'shotAngle': 'float32',
+    'shootingTeamSide': 'int8',
+    'shootingPlayer': 'category',
+    'shootingPlayerId': 'Int32',
+    'goalieInNet': 'category',
+    'goalieInNetId': 'Int32',
+    'previousEvent': 'category',
+    'timeDiff': 'float32',
+    'previousEventX': 'float32',
+    'previousEventY': 'float32',
+    'rebound': 'int8',
+    'distanceDiff': 'float32',
+    'shotAngleDiff': 'float32',
+    'speed': 'float32'
+    }
+
+# Player name columns and the player ID columns that replace them in compact DataFrames
+PLAYER_NAME_ID_COLUMNS = {'shootingPlayer': 'shootingPlayerId', 'goalieInNet': 'goalieInNetId'}
+TEAM_NAME_ID_COLUMNS = {'shootingTeam': 'shootingTeamId'}
+
+# Name columns resolved from the catalog's dimension tables when cached files are read, with their ID column and dimension table
+NAME_ID_COLUMNS = {**PLAYER_NAME_ID_COLUMNS, **TEAM_NAME_ID_COLUMNS}
+NAME_DIMENSION_TABLES = {
+    **{name_col: 'players' for name_col in PLAYER_NAME_ID_COLUMNS},
+    **{name_col: 'teams' for name_col in TEAM_NAME_ID_COLUMNS}
+    }
+
+DEFAULT_PARSE_WORKERS = 1
+PARSE_CHUNK_SIZE = 16
+PARSE_CHUNKS_PER_WORKER = 2
 
 COLUMNS_TO_DROP_IF_NAN = ['shotType', 'xCoord', 'yCoord', 'zoneCode']
 
@@ -29,11 +191,14 @@ FINAL_COLUMN_ORDER = [
     'yCoord',
     'zoneCode',
     'shootingTeam',
+    'shootingTeamId',
     'shotDistance',
     'shotAngle',
     'shootingTeamSide',
     'shootingPlayer',
+    'shootingPlayerId',
     'goalieInNet',
+    'goalieInNetId',
     'previousEvent',
     'timeDiff',
     'previousEventX',
@@ -44,23 +209,181 @@ FINAL_COLUMN_ORDER = [
     'speed'
     ]
 
+# Player and team ID columns, only part of parsed play-by-play data when they are requested (or in compact DataFrames,
+# see NHLDataParser.query_shots). The other columns of FINAL_COLUMN_ORDER are the columns parsed by default
+ID_COLUMNS = ['shootingTeamId', 'shootingPlayerId', 'goalieInNetId']
+DEFAULT_COLUMNS = [col for col in FINAL_COLUMN_ORDER if col not in ID_COLUMNS]
+
+# Parser of the current worker process when season games are parsed in parallel
+_worker_parser = None
+
+def _init_parse_worker():
+    """Creates the parser used by a worker process of the season parsing pool."""
+    global _worker_parser
+    _worker_parser = NHLDataParser()
+
+
+def _parse_game_chunk(game_ids: list) -> list:
+    """Parses a chunk of games in a worker process of the season parsing pool.
+
+    Args:
+        game_ids (list): Game IDs to parse.
+
+    Returns:
+        list: Result of each game, in order (see NHLDataParser.parse_game_or_error)
+    """
+    return [_worker_parser.parse_game_or_error(game_id) for game_id in game_ids]
+
+
 class NHLDataParser:
-    def __init__(self):
-        self.data_fetcher = NHLDataFetcher()
-        self.helper = NHLHelper()
+    def __init__(self, workers: int = DEFAULT_PARSE_WORKERS, profiler: NHLStageProfiler = None):
+        """
+        Initialize the parser of play-by-play data.
+
+        Args:
+            workers (int, optional): Number of processes used to parse the games of a season. Defaults to DEFAULT_PARSE_WORKERS.
+            profiler (NHLStageProfiler, optional): Profiler of the stages of the fetch and parse pipeline, shared with the
+                fetcher and the feature registry. Games parsed in worker processes aren't profiled. Defaults to a disabled profiler.
+        """
+        self.profiler = profiler or NHLStageProfiler(enabled=False)
+        self.data_fetcher = NHLDataFetcher(profiler=self.profiler)
+        self.helper = self.data_fetcher.helper
+        self.workers = workers
+        self.parse_failures = {}
+        self.feature_registry = NHLFeatureRegistry(PLAY_COLUMNS + ['gameId'], profiler=self.profiler)
+        self.player_lookup = self.get_player_lookup(pd.DataFrame())
+
+        if pyarrow is None:
+            warnings.warn(
+                "pyarrow isn't installed: parsed games and seasons are cached as CSV, and queries can't push their "
+                "filters down to the cached files. Install pyarrow (see requirements.txt) to use the Parquet cache.",
+                stacklevel=2
+            )
 
     
-    def raw_season_data_to_df(self, season_file: str) -> pd.DataFrame:
-        """Turns CSV of raw season data into DataFrame.
+    def raw_season_data_to_df(self, season_file: str, columns: list = None, filters: list = None) -> pd.DataFrame:
+        """Reads the cached file of an already parsed season into a DataFrame with the types of SEASON_COLUMN_DTYPES.
+        Parquet files are read with the projection and the filters pushed down to pyarrow, so only the requested
+        columns of the matching row groups are loaded.
 
         Args:
             season_file (str): System path for the parsed local season data.
+            columns (list, optional): Columns to read, the other columns aren't loaded. Defaults to None (all columns).
+            filters (list, optional): Row filters as (column, operator, value) tuples that must all match (see FILTER_OPERATORS). Defaults to None.
 
         Returns:
             pd.DataFrame: DataFrame containing the already parsed season.
         """
         full_local_data_path = os.path.join(self.data_fetcher.local_data_path, season_file)
-        return pd.read_csv(full_local_data_path, index_col=False)
+
+        if season_file.endswith('.parquet'):
+            return pd.read_parquet(full_local_data_path, columns=columns, filters=filters or None)
+
+        filter_columns = [col for col, _, _ in filters or []]
+        read_columns = list(dict.fromkeys(columns + filter_columns)) if columns is not None else None
+        season_df = pd.read_csv(full_local_data_path, index_col=False, usecols=read_columns, dtype=SEASON_COLUMN_DTYPES)
+
+        return self.__filter_df(season_df, columns, filters)
+
+
+    def __filter_df(self, df: pd.DataFrame, columns: list = None, filters: list = None) -> pd.DataFrame:
+        """Applies row filters and a projection to a DataFrame read without pushdown (CSV cache files).
+
+        Args:
+            df (pd.DataFrame): DataFrame with the projected columns and the filtered columns.
+            columns (list, optional): Columns to keep. Defaults to None (all columns).
+            filters (list, optional): Row filters as (column, operator, value) tuples that must all match (see FILTER_OPERATORS). Defaults to None.
+
+        Returns:
+            pd.DataFrame: Rows of the DataFrame that match the filters, with the requested columns.
+        """
+        if filters:
+            mask = np.logical_and.reduce([FILTER_OPERATORS[op](df[col], value) for col, op, value in filters])
+            df = df[mask].reset_index(drop=True)
+
+        return df[columns] if columns is not None else df
+
+
+    def __iter_parsed_file_batches(self, parsed_file: str, columns: list, filters: list, batch_size: int):
+        """Reads a cache file of parsed play-by-play data in batches, without loading the whole file in memory.
+
+        Args:
+            parsed_file (str): Path of the cache file, relative to NHL_DATA_PATH.
+            columns (list): Columns to read, None for all columns.
+            filters (list): Row filters as (column, operator, value) tuples that must all match (see FILTER_OPERATORS), None for no filter.
+            batch_size (int): Maximum number of rows of a batch.
+
+        Yields:
+            pd.DataFrame: Batches of rows of the file that match the filters.
+        """
+        full_local_data_path = os.path.join(self.data_fetcher.local_data_path, parsed_file)
+
+        if parsed_file.endswith('.parquet'):
+            dataset = pyarrow.dataset.dataset(full_local_data_path, format='parquet')
+            expression = pyarrow.parquet.filters_to_expression(filters) if filters else None
+
+            for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=batch_size):
+                if batch.num_rows > 0:
+                    yield batch.to_pandas()
+            return
+
+        filter_columns = [col for col, _, _ in filters or []]
+        read_columns = list(dict.fromkeys(columns + filter_columns)) if columns is not None else None
+
+        for chunk in pd.read_csv(full_local_data_path, usecols=read_columns, dtype=SEASON_COLUMN_DTYPES, chunksize=batch_size):
+            chunk = self.__filter_df(chunk, columns, filters)
+
+            if not chunk.empty:
+                yield chunk
+
+
+    def __write_parsed_dfs(self, parsed_dfs, parsed_file: str):
+        """Writes parsed play-by-play data (of a game or a season) to its cache file, with the columns and types of
+        SEASON_COLUMN_DTYPES: the player and team names are left out, only their IDs are cached.
+        The DataFrames are consumed one at a time and only PARQUET_ROW_GROUP_SIZE rows are buffered, so a season can be
+        written from its games without being held in memory. The file is replaced atomically once complete.
+
+        Args:
+            parsed_dfs (iterable): DataFrames of parsed play-by-play data, written in order.
+            parsed_file (str): Path of the cache file, relative to NHL_DATA_PATH.
+        """
+        full_local_data_path = os.path.join(self.data_fetcher.local_data_path, parsed_file)
+        temp_path = f'{full_local_data_path}.tmp'
+        is_parquet = parsed_file.endswith('.parquet')
+        writer = None
+        flushed_batches = 0
+        buffer = []
+
+        def flush():
+            nonlocal writer, flushed_batches
+            parsed_df = pd.concat(buffer, ignore_index=True)[list(SEASON_COLUMN_DTYPES)].astype(SEASON_COLUMN_DTYPES)
+
+            if is_parquet:
+                table = pyarrow.Table.from_pandas(parsed_df, schema=SEASON_ARROW_SCHEMA, preserve_index=False)
+                writer = writer or pyarrow.parquet.ParquetWriter(temp_path, table.schema, compression=PARQUET_COMPRESSION)
+                writer.write_table(table, row_group_size=PARQUET_ROW_GROUP_SIZE)
+            else:
+                parsed_df.to_csv(temp_path, mode='a' if flushed_batches else 'w', header=not flushed_batches, index=False)
+
+            flushed_batches += 1
+            buffer.clear()
+
+        try:
+            for parsed_df in parsed_dfs:
+                buffer.append(parsed_df)
+
+                if sum(len(df) for df in buffer) >= PARQUET_ROW_GROUP_SIZE:
+                    flush()
+
+            # The last rows, or an empty file with the columns if there were no rows at all
+            if buffer or not flushed_batches:
+                buffer = buffer or [pd.DataFrame(columns=list(SEASON_COLUMN_DTYPES))]
+                flush()
+        finally:
+            if is_parquet and writer is not None:
+                writer.close()
+
+        os.replace(temp_path, full_local_data_path)
 
 
     def __get_season_file_name(self, season: int, with_regular_season: bool = True, with_playoff_season: bool = True) -> str:
@@ -75,11 +398,11 @@ class NHLDataParser:
             str: Season file name.
         """
         if with_regular_season and not with_playoff_season:
-            return f'season_{season}_reg.csv'
+            return f'season_{season}_reg{SEASON_FILE_EXTENSION}'
         elif with_playoff_season and not with_regular_season:
-            return f'season_{season}_playoffs.csv'
+            return f'season_{season}_playoffs{SEASON_FILE_EXTENSION}'
         
-        return f'season_{season}.csv'
+        return f'season_{season}{SEASON_FILE_EXTENSION}'
 
 
     def season_already_parsed(self, season: int, with_regular_season: bool = True, with_playoff_season: bool = True) -> bool:
@@ -113,336 +436,1117 @@ class NHLDataParser:
         return {game_data['homeTeam']['id']: home_team, game_data['awayTeam']['id']: away_team}
 
 
-    def __try_extract_info(self, x: object, info: str):
-        """Helper function that tries to extract a specific string from an object.
+    def __get_season_game_ids_to_parse(self, season: int, for_regular_season: bool, refresh: bool = False) -> list:
+        """Plans the games to parse for a season from the games fetched in the catalog, without any request. The season's
+        games are only discovered and fetched (the games that aren't stored locally yet, in one batch) when a refresh is
+        requested or when no game of the season was ever fetched.
 
         Args:
-            x (object): Object to extract from.
-            info (str): String to extract value for.
+            season (int): Season year.
+            for_regular_season (bool): Regular season: True or playoff season: False
+            refresh (bool, optional): If the season's games should be discovered and fetched first. Defaults to False.
 
         Returns:
-            any: If string exists in the object and could be extracted then the value for that string, else None.
+            list: Game IDs of the season that can be parsed, in game order.
         """
-        try:
-            return x.get(info)
-        except:
-            return None 
-        
+        catalog = self.data_fetcher.catalog
+        game_type = REGULAR_SEASON_GAME_TYPE if for_regular_season else PLAYOFF_GAME_TYPE
 
-    def __extract_info_to_columns(self, columns: list, source: str, df: pd.DataFrame) -> pd.DataFrame:
-        """Extract useful info from the raw game data.
+        if refresh or not catalog.get_game_ids(int(season), status=GAME_STATUS_FETCHED):
+            game_ids = self.helper.discover_game_ids_for_season(season, for_regular_season)
+            self.data_fetcher.fetch_raw_games_data(game_ids, description=f'Season {season}')
+
+        return sorted(catalog.get_game_ids(int(season), game_type, GAME_STATUS_FETCHED))
+
+
+    def get_shot_and_goal_pbp_df(self, game_id: str, features: list = None) -> pd.DataFrame:
+        """Converts the JSON play-by-play game data to a pandas DataFrame containing shots-on-net and goals.
+        If the game isn't already fetched, or if it is a live game that is out of date, the NHLDataFetcher will fetch it
+        using the API, then convert the JSON.
 
         Args:
-            columns (list): List of columns to create in the DataFrame.
-            source (str): Source of the info in the raw game data.
-            df (pd.DataFrame): Raw game DataFrame.
+            game_id (str): Game ID of the game we want to convert to a DataFrame 
+            features (list, optional): Features (columns) to compute, only their computations run. Defaults to None (all of them).
 
         Returns:
-            pd.DataFrame: DataFrame that contains the useful info as columns.
+            pd.DataFrame: Dataframe of the play-by-play data for shots-on-net and goals of a specific game
+
+        DataFrame contents:
+        - Game ID
+        - Game time (s)
+        - Period info (time, number, type)
+        - Shot or goal (0: shot, 1: goal)
+        - Shot type
+        - Empty net (0: goalie present, 1: empty)
+        - On-ice coords
+        - Zone code
+        - Distance from net (ft)
+        - Shot angle (°)
+        - Shooter team
+        - Shooter name and ID
+        - Goalie name and ID (None if empty net)
+        - Previous event info (type, coords, time since, distance from, angle difference)
+        - Rebound (0: no rebound, 1: rebound)
+        - Speed (ft/s)
         """
-        for col in columns:
-            df[col] = df[source].apply(lambda x: self.__try_extract_info(x, col))
-        
-        return df
-    
+        with self.profiler.stage('parse_game') as stage:
+            game_df = self.raw_game_data_to_df(self.__load_game_data(game_id), game_id, features)
+            stage['rows'] = len(game_df)
+
+        return game_df
 
-    def __get_shooting_team_side_during_p1(self, df: pd.DataFrame) -> tuple:
-        """Gets the shooting team and their side (left or right) during the first period of play
+
+    def __load_game_data(self, game_id: str) -> dict:
+        """Loads the raw data of a game, fetching it first if it isn't already fetched or if it is an out of date live game.
 
         Args:
-            df (pd.DataFrame): The play-by-play shot DataFrame
+            game_id (str): Game ID of the game
 
         Returns:
-            tuple: The shooting team's name and their starting side (shooting team: str, side: {0, 1})
-        """
-        period1_df = df[df['periodNumber'] == 1]
+            dict: Raw game data JSON
 
-        offensive_zone_events = period1_df[period1_df['zoneCode'] == 'O']
+        Raises:
+            FileNotFoundError: If the game could not be fetched, or if its data is empty.
+        """
+        self.data_fetcher.fetch_raw_game_data(game_id)
+        game = self.data_fetcher.catalog.get_game(game_id)
 
-        if not offensive_zone_events.empty:
-            first_offense = offensive_zone_events.iloc[0]
-            shooting_team_net_side_p1 = 1 if first_offense['xCoord'] < 0 else 0
-            return first_offense['shootingTeam'], shooting_team_net_side_p1
+        if game is None or game['status'] != GAME_STATUS_FETCHED:
+            raise FileNotFoundError(f"Game data file for game_id {game_id} could not be fetched.")
 
-        defensive_zone_events = period1_df[period1_df['zoneCode'] == 'D']
+        if game['byte_size'] == 0:
+            raise FileNotFoundError(f"Game data file for game_id {game_id} is empty.")
 
-        if not defensive_zone_events.empty:
-            first_defense = defensive_zone_events.iloc[0]
-            shooting_team_net_side_p1 = 0 if first_defense['xCoord'] < 0 else 1
-            return first_defense['shootingTeam'], shooting_team_net_side_p1
-        
-        return None, None
+        return self.data_fetcher.load_raw_game_data(game_id)
 
 
-    def __set_shooting_team_side(self, first_shooting_team: str, side: int, df: pd.DataFrame) -> pd.DataFrame:
-        """Sets the shooting team side based on the first shooting team's side in period 1.
+    def __extract_play_columns(self, plays: list, columns: list = PLAY_COLUMNS) -> pd.DataFrame:
+        """Reads the plays of a game straight into typed columns, in a single pass over the plays.
+        Missing coordinates become NaN and other missing details become None.
+        The time remaining is converted to seconds, and the shooter of a goal (shootingPlayerId) is its scorer.
 
         Args:
-            first_shooting_team (str): First team to shoot in the offensive/defensive zone in period 1.
-            side (int): Side which the team was on: {left: 0, right: 1}.
-            df (pd.DataFrame): DataFrame to add the shooting team side column to.
+            plays (list): Plays of the raw game data.
+            columns (list, optional): Columns to read, from PLAY_COLUMNS and EVENT_COLUMNS. Defaults to PLAY_COLUMNS.
 
         Returns:
-            pd.DataFrame: DataFrame that contains a column for what side of the rink the shooting team's net is.
+            pd.DataFrame: One row per play with the columns.
         """
-        isPeriodOdd = df['periodNumber'] % 2 == 1
+        values = {col: [] for col in columns}
+        top_level_keys = [key for key in TOP_LEVEL_PLAY_KEYS if key in values]
+        detail_keys = [key for key in DETAIL_PLAY_KEYS if key in values]
 
-        df['shootingTeamSide'] = np.where(
-            (df['shootingTeam'] == first_shooting_team) & isPeriodOdd, side,
-            np.where(
-                (df['shootingTeam'] != first_shooting_team) & isPeriodOdd, 1 - side,
-                np.where(
-                    (df['shootingTeam'] == first_shooting_team) & ~isPeriodOdd, 1 - side, side
-                )
+        with self.profiler.stage('extract_plays') as stage:
+            stage['rows'] = len(plays)
+            self.__extract_play_values(plays, values, top_level_keys, detail_keys)
+
+        with self.profiler.stage('build_frame') as stage:
+            stage['rows'] = len(plays)
+
+            return pd.DataFrame({
+                col: np.array(col_values, dtype=float) if col in FLOAT_PLAY_COLUMNS else col_values
+                for col, col_values in values.items()
+            })
+
+
+    def __extract_play_values(self, plays: list, values: dict, top_level_keys: list, detail_keys: list):
+        """Appends the values of each play to the lists of its columns (see __extract_play_columns).
+
+        Args:
+            plays (list): Plays of the raw game data.
+            values (dict): List of values by column, appended in place.
+            top_level_keys (list): Columns read from the play itself.
+            detail_keys (list): Columns read from the details of the play.
+        """
+        for play in plays:
+            details = play.get('details') or {}
+            period = play.get('periodDescriptor') or {}
+            minutes, seconds = play['timeRemaining'].split(':')
+
+            values['timeRemaining'].append(int(minutes) * 60 + int(seconds))
+            values['periodNumber'].append(period.get('number'))
+
+            if 'periodType' in values:
+                values['periodType'].append(period.get('periodType'))
+
+            for key in top_level_keys:
+                values[key].append(play.get(key))
+
+            for key in detail_keys:
+                values[key].append(details.get(key))
+
+            values['shootingPlayerId'].append(
+                details.get('scoringPlayerId') if play.get('typeDescKey') == 'goal' else details.get('shootingPlayerId')
             )
-        )
 
-        return df
 
+    def __get_player_maps(self, game_data: dict) -> tuple:
+        """Creates the dicts that map the player IDs of the game's rosters to their names and team IDs
 
-    def __calculate_distance(self, x1: int, y1: int, x2: int, y2: int) -> float:
-        """Calculates the euclidian distance between (xCoord, yCoord) and net_coords
+        Args:
+            game_data (dict): Raw game data JSON
+
+        Returns:
+            tuple: Map for player ID to player name and map for player ID to team ID (names: dict, team IDs: dict)
+        """
+        player_name_map = {}
+        player_team_map = {}
+
+        for player in game_data.get('rosterSpots', []):
+            player_name_map[player['playerId']] = f"{player['firstName']['default']} {player['lastName']['default']}"
+            player_team_map[player['playerId']] = player['teamId']
+
+        return player_name_map, player_team_map
+
+
+    def raw_game_data_to_df(self, game_data: dict, game_id: str, features: list = None) -> pd.DataFrame:
+        """Converts raw play-by-play game data to a DataFrame containing shots-on-net and goals (see get_shot_and_goal_pbp_df).
 
         Args:
-            x1 (int): The x coordinate of the first point
-            y1 (int): The y coordinate of the first point
-            x2 (int): The x coordinate of the second point
-            y2 (int): The y coordinate of the second point
+            game_data (dict): Raw game data JSON
+            game_id (str): Game ID of the game
+            features (list, optional): Features (columns) to compute. Defaults to None (every column of DEFAULT_COLUMNS).
 
         Returns:
-            float: The floating value distance between the first point and the second point coordinates
+            pd.DataFrame: Dataframe of the play-by-play data for shots-on-net and goals of the game
+
+        Raises:
+            ValueError: If a feature is unknown, or if the side of the teams can't be determined.
         """
-        return math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
+        return self.parse_plays(game_data.get('plays', []), game_id, self.new_game_state(game_data), features=features)
 
 
-    def __calculate_angle(self, x1: int, y1: int, x2: int, y2: int) -> float:
-        """Calculates the angle between two points, considering a right triangle.
+    def new_game_state(self, game_data: dict) -> dict:
+        """Creates the parsing state of a game, which carries what parse_plays needs to know about the plays that
+        were already parsed: the roster maps, the previous play, the previous shot's angle, the side of the teams
+        and the running speed mean.
 
         Args:
-            x1 (int): The x coordinate of the first point
-            y1 (int): The y coordinate of the first point
-            x2 (int): The x coordinate of the second point
-            y2 (int): The y coordinate of the second point
+            game_data (dict): Raw game data JSON
 
         Returns:
-            float: The floating value angle between the two points
+            dict: Parsing state of the game before its first play.
         """
-        return math.degrees(math.atan2(abs(y2 - y1), abs(x2 - x1)))
+        with self.profiler.stage('roster_mapping') as stage:
+            player_name_map, player_team_map = self.__get_player_maps(game_data)
+            stage['rows'] = len(player_name_map)
 
+        return self.__new_game_state(player_name_map, player_team_map, self.__get_team_id_name_map(game_data))
 
-    def get_shot_and_goal_pbp_df(self, game_id: str) -> pd.DataFrame:
-        """Converts the JSON play-by-play game data to a pandas DataFrame containing shots-on-net and goals.
-        If the game isn't already fetched, the NHLDataFetcher will fetch it using the API, then convert the JSON.
+
+    def __new_game_state(self, player_name_map: dict, player_team_map: dict, team_id_map: dict) -> dict:
+        """Creates the parsing state of a game from its roster and team maps (see new_game_state).
 
         Args:
-            game_id (str): Game ID of the game we want to convert to a DataFrame 
+            player_name_map (dict): Map for player ID to player name.
+            player_team_map (dict): Map for player ID to team ID.
+            team_id_map (dict): Map for team ID to team name.
 
         Returns:
-            pd.DataFrame: Dataframe of the play-by-play data for shots-on-net and goals of a specific game
+            dict: Parsing state of the game before its first play.
+        """
+        return {
+            'player_name_map': player_name_map,
+            'player_team_map': player_team_map,
+            'team_id_map': team_id_map,
+            'previous_event': None,
+            'previous_time_remaining': np.nan,
+            'previous_x': np.nan,
+            'previous_y': np.nan,
+            'previous_shot_angle': np.nan,
+            'first_shooting_team': None,
+            'first_shooting_team_side': None,
+            'speed_sum': 0.0,
+            'speed_count': 0
+        }
+
+
+    def __get_output_columns(self, features: list) -> list:
+        """Gets the columns of parsed play-by-play data with a subset of features, in the order of FINAL_COLUMN_ORDER
+        followed by the features that aren't part of it.
 
-        DataFrame contents:
-        - Game ID
-        - Game time (s)
-        - Period info (time, number, type)
-        - Shot or goal (0: shot, 1: goal)
-        - Shot type
-        - Empty net (0: goalie present, 1: empty)
-        - On-ice coords
-        - Zone code
-        - Distance from net (ft)
-        - Shot angle (°)
-        - Shooter team
-        - Shooter name
-        - Goalie name (None if empty net)
-        - Previous event info (type, coords, time since, distance from, angle difference)
-        - Rebound (0: no rebound, 1: rebound)
-        - Speed (ft/s)
+        Args:
+            features (list): Requested features, None for every column of DEFAULT_COLUMNS.
+
+        Returns:
+            list: Output columns.
         """
-        if not self.data_fetcher.game_already_fetched(game_id):
-            self.data_fetcher.fetch_raw_game_data(game_id)
+        if features is None:
+            return DEFAULT_COLUMNS
 
-        if os.path.getsize(self.data_fetcher.get_game_local_path(game_id)) == 0:
-            raise FileNotFoundError(f"Game data file for game_id {game_id} is empty.")
+        return (
+            [col for col in FINAL_COLUMN_ORDER if col in features]
+            + [col for col in dict.fromkeys(features) if col not in FINAL_COLUMN_ORDER]
+        )
 
-        with open(self.data_fetcher.get_game_local_path(game_id), 'r') as file:
-            game_data = json.load(file)
 
-        all_plays = pd.DataFrame(game_data.get('plays', []))
-        rosters = pd.DataFrame(game_data.get('rosterSpots', []))
+    def parse_plays(self, plays: list, game_id: str, game_state: dict, partial: bool = False, features: list = None) -> pd.DataFrame:
+        """Computes the shots-on-net and goals of consecutive plays of a game, continuing from a parsing state
+        (see new_game_state). The features that depend on earlier plays (previous event, rebound, speed, team side,
+        angle difference) are taken from the state, so the plays of a live game can be parsed batch by batch,
+        each batch costing only its own plays. The state is updated once the plays are parsed.
+        The plays are read once into typed columns, then only the requested features and the features they depend on
+        are computed, on whole columns at once (see NHLFeatureRegistry). A game's plays must always be parsed with the
+        same features, since the state is only kept up to date for the computed features.
 
-        all_plays['timeRemaining'] = all_plays['timeRemaining'].apply(lambda t: int(t.split(':')[0]) * 60 + int(t.split(':')[1]))
-        
-        all_plays['previousEvent'] = all_plays['typeDescKey'].shift(1)
-        all_plays['timeDiff'] = all_plays['timeRemaining'].shift(1) - all_plays['timeRemaining']
+        Args:
+            plays (list): Plays of the raw game data that follow the plays already parsed with the state.
+            game_id (str): Game ID of the game
+            game_state (dict): Parsing state of the game, updated in place.
+            partial (bool, optional): If more plays of the game may follow (live game). A defensive zone shot then only
+                sets the side of the teams once period 1 is over, since a later offensive zone shot of period 1 takes
+                precedence. Defaults to False.
+            features (list, optional): Features (columns) to compute. Defaults to None (every column of DEFAULT_COLUMNS).
 
+        Returns:
+            pd.DataFrame: Dataframe of the play-by-play data for shots-on-net and goals of the plays
 
-        all_plays = self.__extract_info_to_columns(
-            columns=EVENT_COMMON_COLUMNS,
-            source='details',
-            df=all_plays
-        )
+        Raises:
+            ValueError: If a feature is unknown, or if the side of the teams can't be determined yet; the state is then left unchanged.
+        """
+        events = self.__extract_play_columns(plays)
+        events['gameId'] = game_id
 
-        all_plays['previousEventX'] = all_plays['xCoord'].shift(1)
-        all_plays['previousEventY'] = all_plays['yCoord'].shift(1)
+        return self.events_to_shot_df(events, game_id, game_state, partial, features)
 
-        all_plays['distanceDiff'] = all_plays.apply(
-            lambda row: self.__calculate_distance(row['xCoord'], row['yCoord'], row['previousEventX'], row['previousEventY']),
-            axis=1
-        )
 
+    def events_to_shot_df(
+            self,
+            events: pd.DataFrame,
+            game_id: str,
+            game_state: dict,
+            partial: bool = False,
+            features: list = None
+        ) -> pd.DataFrame:
+        """Computes the shots-on-net and goals of consecutive plays of a game that are already read into columns
+        (see parse_plays). The feature columns are added to the events.
+
+        Args:
+            events (pd.DataFrame): One row per play with the columns of PLAY_COLUMNS and gameId, in the order of the plays.
+            game_id (str): Game ID of the game
+            game_state (dict): Parsing state of the game, updated in place.
+            partial (bool, optional): If more plays of the game may follow (live game). Defaults to False.
+            features (list, optional): Features (columns) to compute. Defaults to None (every column of DEFAULT_COLUMNS).
+
+        Returns:
+            pd.DataFrame: Dataframe of the play-by-play data for shots-on-net and goals of the plays
+
+        Raises:
+            ValueError: If a feature is unknown, or if the side of the teams can't be determined yet; the state is then left unchanged.
+        """
+        output_columns = self.__get_output_columns(features)
+        all_plays, shot_and_goal_plays, context = self.__compute_features(events, game_state, partial, output_columns)
+
+        if context.get('undetermined_side_game_ids'):
+            raise ValueError(f"The side of the teams can't be determined yet for game_id {game_id}.")
+
+        if not all_plays.empty:
+            last_play = all_plays.iloc[-1]
+            game_state.update(
+                previous_event=last_play['typeDescKey'],
+                previous_time_remaining=last_play['timeRemaining'],
+                previous_x=last_play['xCoord'],
+                previous_y=last_play['yCoord']
+            )
+
+        game_state.update(context['state_updates'])
+
+        if shot_and_goal_plays.empty:
+            return pd.DataFrame(columns=output_columns)
+
+        # Over all seasons (around 400 000 shot/goal events), there's only about 100 events that contain missing or NaN info
+        # Drop all rows that contain missing values, except for the 'goalieInNet' column (indicating an empty net)
+        shot_and_goal_plays = shot_and_goal_plays.dropna(subset=COLUMNS_TO_DROP_IF_NAN)
+
+        return shot_and_goal_plays[output_columns]
+
+
+    def __compute_features(self, events: pd.DataFrame, game_state: dict, partial: bool, output_columns: list) -> tuple:
+        """Computes the features of the plays of one or several games, and of their shots-on-net and goals.
+        The features already present in the events aren't computed again.
+
+        Args:
+            events (pd.DataFrame): One row per play, with a gameId column, in the order of the plays.
+            game_state (dict): Parsing state of the game, not updated.
+            partial (bool): If more plays of the game may follow (live game).
+            output_columns (list): Features to compute, with the features they depend on.
+
+        Returns:
+            tuple: Plays, shots-on-net and goals with their features, and the context of the computation
+                (plays: pd.DataFrame, shots and goals: pd.DataFrame, context: dict)
+        """
+        computed_features = self.feature_registry.resolve(output_columns, list(events.columns))
+        context = {
+            'game_state': game_state,
+            'state_updates': {},
+            'is_period1_over': not partial or (events['periodNumber'] > 1).any()
+        }
+
+        all_plays = self.feature_registry.compute_features(events, computed_features, PLAY_SCOPE, context)
         shot_and_goal_plays = all_plays[all_plays['typeDescKey'].isin(RELEVANT_EVENT_TYPES)].copy()
-        shot_and_goal_plays['rebound'] = shot_and_goal_plays['previousEvent'].apply(lambda x: 1 if x == 'shot-on-goal' else 0)
 
-        shot_and_goal_plays['speed'] = shot_and_goal_plays.apply(
-            lambda row: row['distanceDiff'] / row['timeDiff']
-                if pd.notna(row['timeDiff']) and row['timeDiff'] > 0
-                else -1,
-            axis=1
-        )
+        if not shot_and_goal_plays.empty:
+            shot_and_goal_plays = self.feature_registry.compute_features(shot_and_goal_plays, computed_features, SHOT_SCOPE, context)
 
-        mean_speed = shot_and_goal_plays[shot_and_goal_plays['speed'] != -1]['speed'].mean()
-        shot_and_goal_plays['speed'] = shot_and_goal_plays['speed'].replace(-1, mean_speed)
+        return all_plays, shot_and_goal_plays, context
 
-        shot_and_goal_plays.rename(columns={'typeDescKey': 'isGoal'}, inplace=True)
-        shot_and_goal_plays['isGoal'] = shot_and_goal_plays['isGoal'].map({'shot-on-goal': 0, 'goal': 1})
 
-        shot_and_goal_plays = self.__extract_info_to_columns(
-            columns=PERIOD_COMMON_COLUMNS,
-            source='periodDescriptor',
-            df=shot_and_goal_plays
-        ).rename(columns={'number': 'periodNumber'})
-        
-        shot_and_goal_plays = self.__extract_info_to_columns(
-            columns=SHOT_AND_GOAL_COMMON_COLUMNS,
-            source='details',
-            df=shot_and_goal_plays
-        )
+    def raw_game_data_to_event_store(self, game_data: dict, game_id: str) -> NHLEventStore:
+        """Decodes every play of raw game data, whatever its type, into an event store (see NHLEventStore).
 
-        shot_and_goal_plays['zoneCode'] = shot_and_goal_plays['details'].apply(lambda x: x.get('zoneCode'))
+        Args:
+            game_data (dict): Raw game data JSON
+            game_id (str): Game ID of the game
 
-        shot_and_goal_plays['shootingPlayerId'] = shot_and_goal_plays.apply(
-            lambda event: event['details'].get('scoringPlayerId') if event['isGoal'] == 1
-                else event['details'].get('shootingPlayerId'),
-            axis=1
-        )
+        Returns:
+            NHLEventStore: Event store of the game.
+        """
+        return NHLEventStore(**self.__raw_game_data_to_event_tables(game_data, game_id))
 
-        player_name_map = rosters.set_index('playerId').apply(
-            lambda p: f"{p['firstName']['default']} {p['lastName']['default']}",
-            axis=1
-        ).to_dict()
 
-        shot_and_goal_plays['teamId'] = shot_and_goal_plays['shootingPlayerId'].map(
-            rosters.set_index('playerId')['teamId'].to_dict()
-        )
+    def __raw_game_data_to_event_tables(self, game_data: dict, game_id: str) -> dict:
+        """Decodes every play of raw game data into the tables of an event store, before their types are set.
 
-        team_id_map = self.__get_team_id_name_map(game_data)
-        shot_and_goal_plays['teamId'] = shot_and_goal_plays['teamId'].map(team_id_map)
-        shot_and_goal_plays.rename(columns={'teamId': 'shootingTeam'}, inplace=True)
+        Args:
+            game_data (dict): Raw game data JSON
+            game_id (str): Game ID of the game
 
-        shot_and_goal_plays['shootingPlayerId'] = shot_and_goal_plays['shootingPlayerId'].map(player_name_map)
-        shot_and_goal_plays['goalieInNetId'] = shot_and_goal_plays['goalieInNetId'].map(player_name_map)
+        Returns:
+            dict: Tables of the event store by name (games, periods, rosters, events).
+        """
+        events = self.__extract_play_columns(game_data.get('plays', []), EVENT_COLUMNS + ['periodType'])
+        events.insert(0, 'gameId', int(game_id))
+
+        periods = events[['gameId', 'periodNumber', 'periodType']].drop_duplicates('periodNumber')
+        events = events.drop(columns='periodType')
+
+        games = pd.DataFrame([{
+            'gameId': int(game_id),
+            'season': int(game_id[:4]),
+            'gameType': int(game_id[4:6]),
+            'gameState': game_data.get('gameState'),
+            'homeTeamId': game_data['homeTeam']['id'],
+            'homeTeam': game_data['homeTeam']['commonName']['default'],
+            'awayTeamId': game_data['awayTeam']['id'],
+            'awayTeam': game_data['awayTeam']['commonName']['default']
+        }])
+
+        rosters = pd.DataFrame([
+            {
+                'gameId': int(game_id),
+                'playerId': player['playerId'],
+                'teamId': player['teamId'],
+                'playerName': f"{player['firstName']['default']} {player['lastName']['default']}",
+                'positionCode': player.get('positionCode'),
+                'sweaterNumber': player.get('sweaterNumber')
+            }
+            for player in game_data.get('rosterSpots', [])
+        ])
+
+        return {'games': games, 'periods': periods, 'rosters': rosters, 'events': events}
+
+
+    def get_event_store(self, game_ids: list, description: str = None) -> NHLEventStore:
+        """Fetches games that aren't stored locally yet, then decodes each of them once into a single event store.
+        Games that can't be fetched or decoded are skipped and recorded in self.parse_failures.
 
-        shot_and_goal_plays.rename(columns={'shootingPlayerId': 'shootingPlayer', 'goalieInNetId': 'goalieInNet'}, inplace=True)
-        shot_and_goal_plays['emptyNet'] = np.where(shot_and_goal_plays['goalieInNet'].isna(), 1, 0)
+        Args:
+            game_ids (list): Game IDs of the games.
+            description (str, optional): Description of the fetch progress. Defaults to None.
 
-        shot_and_goal_plays['shootingTeamSide'] = None
-        first_shooting_team, first_shooting_team_net_side_p1 = self.__get_shooting_team_side_during_p1(shot_and_goal_plays)
+        Returns:
+            NHLEventStore: Event store of the games.
+        """
+        self.data_fetcher.fetch_raw_games_data(game_ids, description=description)
+        self.parse_failures = {}
+        tables = {table: [] for table in EVENT_STORE_TABLES}
 
-        shot_and_goal_plays = self.__set_shooting_team_side(
-            first_shooting_team=first_shooting_team,
-            side=first_shooting_team_net_side_p1,
-            df=shot_and_goal_plays
-        )
+        for game_id in game_ids:
+            try:
+                game_tables = self.__raw_game_data_to_event_tables(self.data_fetcher.load_raw_game_data(game_id), game_id)
+            except (FileNotFoundError, KeyError, ValueError) as e:
+                self.parse_failures[game_id] = f"{type(e).__name__} for game_id {game_id}: {e}"
+                print(self.parse_failures[game_id])
+                continue
 
-        shot_and_goal_plays['shotDistance'] = None
-        shot_and_goal_plays['shotAngle'] = None
+            for table, df in game_tables.items():
+                tables[table].append(df)
 
-        for index, row in shot_and_goal_plays.iterrows():
-            shooting_on_net_side = 1 - row['shootingTeamSide'] # the side of the rink the where the net is
-            net_coords = None
+        # The types are set once on the concatenated tables, so categories are shared by every game
+        return NHLEventStore(**{table: pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame() for table, dfs in tables.items()})
 
-            if shooting_on_net_side == 0:
-                net_coords = (-89, 0)
-            else:
-                net_coords = (89, 0)
-            
-            x_coord = row['xCoord']
-            y_coord = row['yCoord']
-
-            shot_and_goal_plays.at[index, 'shotDistance'] = self.__calculate_distance(x_coord, y_coord, net_coords[0], net_coords[1])
-            shot_and_goal_plays.at[index, 'shotAngle'] = self.__calculate_angle(x_coord, y_coord, net_coords[0], net_coords[1])
-
-        shot_and_goal_plays['previousShotAngle'] = shot_and_goal_plays['shotAngle'].shift(1)
-        shot_and_goal_plays['shotAngleDiff'] = shot_and_goal_plays.apply(
-            lambda shot: abs(shot['shotAngle'] - shot['previousShotAngle']) 
-                if shot['rebound'] == 1 and pd.notna(row['previousEventX']) and pd.notna(row['previousEventY'])
-                else 0,
-            axis=1
+
+    def get_event_store_for_season(
+            self,
+            season: int,
+            with_regular_season: bool = True,
+            with_playoff_season: bool = True,
+            refresh: bool = False
+        ) -> NHLEventStore:
+        """Gets the event store of every game of a season. The store is cached under NHL_DATA_PATH/events/ and is decoded
+        again only when a game of the season was fetched after it was saved.
+
+        Args:
+            season (int): Season year.
+            with_regular_season (bool, optional): If the store should contain regular season games. Defaults to True.
+            with_playoff_season (bool, optional): If the store should contain playoff season games. Defaults to True.
+            refresh (bool, optional): If the season's games should be discovered and fetched first. Defaults to False
+                (only the games already fetched are read, see fetch_raw_season_data).
+
+        Returns:
+            NHLEventStore: Event store of the season.
+        """
+        game_type = self.__get_game_type(with_regular_season, with_playoff_season)
+        game_ids = []
+
+        if with_regular_season:
+            game_ids += self.__get_season_game_ids_to_parse(season, True, refresh)
+
+        if with_playoff_season:
+            game_ids += self.__get_season_game_ids_to_parse(season, False, refresh)
+
+        season_name = os.path.splitext(self.__get_season_file_name(season, with_regular_season, with_playoff_season))[0]
+        store_path = os.path.join(self.data_fetcher.local_data_path, EVENT_STORE_DIR, season_name)
+        events_file = os.path.join(store_path, f'events{EVENT_STORE_FILE_EXTENSION}')
+        last_fetched_at = self.data_fetcher.catalog.get_last_fetched_at(int(season), game_type)
+
+        if os.path.exists(events_file) and os.path.getmtime(events_file) >= (last_fetched_at or 0):
+            return load_event_store(store_path)
+
+        store = self.get_event_store(game_ids)
+        store.save(store_path)
+
+        return store
+
+
+    def event_store_to_shot_df(self, store: NHLEventStore, features: list = None) -> pd.DataFrame:
+        """Computes the shots-on-net and goals of the games of an event store, as get_shot_and_goal_pbp_df does
+        from their raw data, without decoding the games again. Every game is computed at once: the player and team names
+        are joined from the store's dimensions, and the features start over at the first play of each game.
+        Games whose team sides can't be determined are skipped and recorded in self.parse_failures.
+
+        Args:
+            store (NHLEventStore): Event store of the games.
+            features (list, optional): Features (columns) to compute. Defaults to None (every column of DEFAULT_COLUMNS).
+
+        Returns:
+            pd.DataFrame: Dataframe of the play-by-play data for shots-on-net and goals of the games
+        """
+        output_columns = self.__get_output_columns(features)
+        events = store.get_events(columns=['gameId'] + [col for col in PLAY_COLUMNS if col in store.events.columns]).copy()
+
+        rosters = store.rosters.drop_duplicates(['gameId', 'playerId']).set_index(['gameId', 'playerId'])
+        teams = pd.concat([
+            store.games[['gameId', f'{side}TeamId', f'{side}Team']].set_axis(['gameId', 'teamId', 'teamName'], axis=1)
+            for side in ('home', 'away')
+        ]).drop_duplicates(['gameId', 'teamId']).set_index(['gameId', 'teamId'])['teamName']
+
+        shooter_keys = pd.MultiIndex.from_arrays([events['gameId'], events['shootingPlayerId']])
+        goalie_keys = pd.MultiIndex.from_arrays([events['gameId'], events['goalieInNetId']])
+        events['shootingTeamId'] = rosters['teamId'].reindex(shooter_keys).astype(float).to_numpy()
+        shooting_team_keys = pd.MultiIndex.from_arrays([events['gameId'], events['shootingTeamId']])
+
+        events['shootingPlayer'] = rosters['playerName'].astype(object).reindex(shooter_keys).to_numpy()
+        events['goalieInNet'] = rosters['playerName'].astype(object).reindex(goalie_keys).to_numpy()
+        events['shootingTeam'] = teams.astype(object).reindex(shooting_team_keys).to_numpy()
+
+        _, shot_and_goal_plays, context = self.__compute_features(
+            events,
+            self.__new_game_state({}, {}, {}),
+            partial=False,
+            output_columns=output_columns
         )
 
-        # Over all seasons (around 400 000 shot/goal events), there's only about 100 events that contain missing or NaN info
-        # Drop all rows that contain missing values, except for the 'goalieInNet' column (indicating an empty net)
+        for game_id in context.get('undetermined_side_game_ids', []):
+            self.parse_failures[str(game_id)] = f"ValueError for game_id {game_id}: The side of the teams can't be determined."
+            print(self.parse_failures[str(game_id)])
+
+        if context.get('undetermined_side_game_ids'):
+            shot_and_goal_plays = shot_and_goal_plays[~shot_and_goal_plays['gameId'].isin(context['undetermined_side_game_ids'])]
+            shot_and_goal_plays = shot_and_goal_plays.astype({'shootingTeamSide': int})
+
+        if shot_and_goal_plays.empty:
+            return pd.DataFrame(columns=output_columns)
+
         shot_and_goal_plays = shot_and_goal_plays.dropna(subset=COLUMNS_TO_DROP_IF_NAN)
+        shot_and_goal_plays['gameId'] = shot_and_goal_plays['gameId'].astype(str)
+
+        return shot_and_goal_plays[output_columns].reset_index(drop=True)
+
+
+    def get_player_lookup(self, df: pd.DataFrame) -> pd.Series:
+        """Gets the names of the players of parsed play-by-play data by player ID.
+
+        Args:
+            df (pd.DataFrame): Parsed play-by-play data, with player name and player ID columns.
+
+        Returns:
+            pd.Series: Player names (playerName) indexed by player ID (playerId).
+        """
+        pairs = [
+            df[[id_col, name_col]].set_axis(['playerId', 'playerName'], axis=1)
+            for name_col, id_col in PLAYER_NAME_ID_COLUMNS.items()
+            if name_col in df.columns and id_col in df.columns
+        ]
+
+        if not pairs:
+            return pd.Series(dtype='object', name='playerName', index=pd.Index([], dtype='Int32', name='playerId'))
+
+        players = pd.concat(pairs).dropna().drop_duplicates('playerId')
+        players['playerId'] = players['playerId'].astype('Int32')
+
+        return players.set_index('playerId')['playerName'].sort_index()
+
+
+    def to_compact_df(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Converts parsed play-by-play data to the compact types of COMPACT_COLUMN_DTYPES: categoricals for the
+        repeated strings, small integers for the flags and float32 for the coordinates and features. Game IDs are
+        encoded as int64 (see NHLHelper.decode_game_ids).
+        The player name columns are replaced by their player ID columns when both are present; the names are then
+        kept in self.player_lookup (see get_player_lookup), which accumulates the players of every compacted DataFrame.
+
+        Args:
+            df (pd.DataFrame): Parsed play-by-play data.
+
+        Returns:
+            pd.DataFrame: Same data with compact column types.
+        """
+        players = self.get_player_lookup(df)
+        self.player_lookup = pd.concat([self.player_lookup, players[~players.index.isin(self.player_lookup.index)]]).sort_index()
+
+        name_columns = [
+            name_col for name_col, id_col in PLAYER_NAME_ID_COLUMNS.items()
+            if name_col in df.columns and id_col in df.columns
+        ]
+        df = df.drop(columns=name_columns)
+
+        if 'gameId' in df.columns:
+            df['gameId'] = self.helper.encode_game_ids(df['gameId'])
+
+        return df.astype({col: dtype for col, dtype in COMPACT_COLUMN_DTYPES.items() if col in df.columns})
+
+
+    def parse_game_or_error(self, game_id: str) -> tuple:
+        """Parses a game into the cached columns of SEASON_COLUMN_DTYPES, turning the errors that make a game skipped
+        during a season parse into an error message. The player and team name columns aren't computed, the names of
+        the game's players and teams are taken from its rosters instead (see __get_game_names).
+
+        Args:
+            game_id (str): Game ID to parse.
+
+        Returns:
+            tuple: Game ID, its DataFrame (None if it failed), its names by dimension table (None if it failed) and the
+                error message (None if it succeeded)
+        """
+        try:
+            with self.profiler.stage('parse_game') as stage:
+                game_data = self.__load_game_data(game_id)
+                game_state = self.new_game_state(game_data)
+                game_df = self.parse_plays(game_data.get('plays', []), game_id, game_state, features=list(SEASON_COLUMN_DTYPES))
+                stage['rows'] = len(game_df)
+
+            return game_id, game_df, self.__get_game_names(game_df, game_state), None
+        except FileNotFoundError:
+            return game_id, None, None, f"File not found for game_id: {game_id}, skipping."
+        except ValueError as e:
+            return game_id, None, None, f"ValueError for game_id {game_id}: {e}"
+
+
+    def __get_game_names(self, game_df: pd.DataFrame, game_state: dict) -> dict:
+        """Gets the names of the players and teams of the ID columns of a parsed game, from the game's roster and team maps.
+
+        Args:
+            game_df (pd.DataFrame): Parsed play-by-play data of the game, with the ID columns of NAME_ID_COLUMNS.
+            game_state (dict): Parsing state of the game (see new_game_state).
+
+        Returns:
+            dict: Name by player or team ID, by dimension table (see DIMENSION_TABLES).
+        """
+        name_maps = {'players': game_state['player_name_map'], 'teams': game_state['team_id_map']}
+        game_names = {table: {} for table in DIMENSION_TABLES}
+
+        for name_col, id_col in NAME_ID_COLUMNS.items():
+            table = NAME_DIMENSION_TABLES[name_col]
+            game_names[table].update(
+                (int(id), name_maps[table][id]) for id in game_df[id_col].dropna().unique() if id in name_maps[table]
+            )
+
+        return game_names
+
+
+    def __parse_games(self, game_ids: list, workers: int):
+        """Lazily parses games, sequentially or with a pool of processes that each parse chunks of PARSE_CHUNK_SIZE games.
+        The results are yielded in the same order as the game IDs whatever the number of workers. Sequentially, a single
+        game is held in memory at a time; with a pool, at most PARSE_CHUNKS_PER_WORKER chunks per worker are submitted
+        ahead of the chunk being yielded.
+
+        Args:
+            game_ids (list): Game IDs to parse.
+            workers (int): Number of processes, 1 parses the games in the current process.
+
+        Yields:
+            tuple: Result of each game (see parse_game_or_error)
+        """
+        if workers <= 1 or len(game_ids) <= PARSE_CHUNK_SIZE:
+            for game_id in game_ids:
+                yield self.parse_game_or_error(game_id)
+
+            return
+
+        chunk_list = [game_ids[i:i + PARSE_CHUNK_SIZE] for i in range(0, len(game_ids), PARSE_CHUNK_SIZE)]
+        workers = min(workers, len(chunk_list))
+        chunks = iter(chunk_list)
+
+        # Chunks are submitted as the results are consumed, so finished chunks don't pile up in memory
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker) as executor:
+            pending = deque(executor.submit(_parse_game_chunk, chunk) for chunk in islice(chunks, workers * PARSE_CHUNKS_PER_WORKER))
+
+            while pending:
+                chunk_results = pending.popleft().result()
+                next_chunk = next(chunks, None)
+
+                if next_chunk is not None:
+                    pending.append(executor.submit(_parse_game_chunk, next_chunk))
+
+                yield from chunk_results
+
+
+    def __get_parsed_game_path(self, game_id: str) -> str:
+        """Gets the path of the cached parsed data of a game.
+
+        Args:
+            game_id (str): Game ID.
+
+        Returns:
+            str: Path of the game's parsed data file, relative to NHL_DATA_PATH.
+        """
+        return os.path.join(PARSED_GAMES_DIR, game_id[:4], f'game_{game_id}{SEASON_FILE_EXTENSION}')
+
+
+    def __parsed_file_exists(self, parsed_file: str) -> bool:
+        """Checks if a cache file of parsed play-by-play data exists.
+
+        Args:
+            parsed_file (str): Path of the cache file, relative to NHL_DATA_PATH.
+
+        Returns:
+            bool: True if the file exists.
+        """
+        return os.path.exists(os.path.join(self.data_fetcher.local_data_path, parsed_file))
+
+
+    def __parse_changed_games(self, season: int, game_ids: list, workers: int) -> list:
+        """Parses the games whose raw data changed, that were parsed by another parser version, or whose cached
+        parsed data is missing, and caches each parsed game in its own file as soon as it is parsed. The names of the games' players and teams
+        are recorded in the catalog's dimension tables. Games that fail are reported.
+
+        Args:
+            season (int): Season year.
+            game_ids (list): Game IDs of the season to bring up to date.
+            workers (int): Number of processes used to parse the games.
+
+        Returns:
+            list: Game IDs that were parsed.
+        """
+        changed_game_ids = self.data_fetcher.catalog.get_changed_game_ids(int(season), parser_version=PARSER_VERSION)
+        game_ids_to_parse = [
+            game_id for game_id in game_ids
+            if game_id in changed_game_ids or not self.__parsed_file_exists(self.__get_parsed_game_path(game_id))
+        ]
+
+        if not game_ids_to_parse:
+            return []
+
+        parsed_games_path = os.path.join(self.data_fetcher.local_data_path, PARSED_GAMES_DIR, str(season))
+        os.makedirs(parsed_games_path, exist_ok=True)
+        parsed_game_ids = []
+        dimension_names = {table: {} for table in DIMENSION_TABLES}
+
+        for game_id, game_df, game_names, error in self.__parse_games(game_ids_to_parse, workers):
+            if error is not None:
+                print(error)
+                self.parse_failures[game_id] = error
+                continue
+
+            for table, names in game_names.items():
+                dimension_names[table].update(names)
+
+            with self.profiler.stage('write_game_file') as stage:
+                self.__write_parsed_dfs([game_df], self.__get_parsed_game_path(game_id))
+                stage['rows'] = len(game_df)
+
+            parsed_game_ids.append(game_id)
+
+        # The names are recorded before the games, so a game marked as parsed always has the names of its players and teams
+        for table, names in dimension_names.items():
+            self.data_fetcher.catalog.record_names(table, names)
+
+        self.data_fetcher.catalog.record_parsed(parsed_game_ids, PARSER_VERSION)
+
+        return parsed_game_ids
+
+
+    def __update_season_file(
+            self,
+            season: int,
+            with_regular_season: bool,
+            with_playoff_season: bool,
+            workers: int,
+            refresh: bool = False
+        ) -> tuple:
+        """Brings the cached file of a season up to date. The season's games are fetched if requested, and only the games
+        that changed since they were last parsed (new raw data or new PARSER_VERSION) are parsed again. Each parsed game
+        is cached on its own, and the season file is assembled from those games. The season file is reused as long as
+        none of its games is parsed again. Games that can't be parsed are skipped and reported in self.parse_failures.
+
+        Args:
+            season (int): Season year.
+            with_regular_season (bool): If the season should contain regular season games.
+            with_playoff_season (bool): If the season should contain playoff season games.
+            workers (int): Number of processes used to parse the games.
+            refresh (bool, optional): If the season's games should be discovered and fetched first. Defaults to False.
+
+        Returns:
+            tuple: Name of the season file in NHL_DATA_PATH and IDs of the season's parsed games (season_file: str, parsed_game_ids: list)
+        """
+        game_ids = []
+
+        if with_regular_season:
+            game_ids += self.__get_season_game_ids_to_parse(season, True, refresh)
+
+        if with_playoff_season:
+            game_ids += self.__get_season_game_ids_to_parse(season, False, refresh)
+
+        self.__parse_changed_games(season, game_ids, workers)
+        season_failures = [game_id for game_id in self.parse_failures if game_id[:4] == str(season)]
+
+        if season_failures:
+            print(f"Season {season}: {len(season_failures)} game(s) could not be parsed.")
+
+        season_file = self.__get_season_file_name(season, with_regular_season, with_playoff_season)
+        season_file_path = os.path.join(self.data_fetcher.local_data_path, season_file)
+        game_type = None if with_regular_season and with_playoff_season else \
+            REGULAR_SEASON_GAME_TYPE if with_regular_season else PLAYOFF_GAME_TYPE
+        last_parsed_at = self.data_fetcher.catalog.get_last_parsed_at(int(season), game_type)
+
+        parsed_game_ids = [game_id for game_id in game_ids if self.__parsed_file_exists(self.__get_parsed_game_path(game_id))]
 
-        shot_and_goal_plays['gameId'] = game_id
+        if self.season_already_parsed(season, with_regular_season, with_playoff_season) and \
+                (last_parsed_at is None or os.path.getmtime(season_file_path) >= last_parsed_at):
+            return season_file, parsed_game_ids
 
-        return shot_and_goal_plays.drop(UNECESSARY_PBP_COLUMNS + UNECESSARY_EXTRA_COLUMNS, axis=1)[FINAL_COLUMN_ORDER]
+        if not parsed_game_ids:
+            raise ValueError(f"No valid game data found for season {season}.")
+
+        # The season file is streamed from the games' files, so the season is never fully held in memory
+        with self.profiler.stage('write_season_file'):
+            self.__write_parsed_dfs(
+                (self.raw_season_data_to_df(self.__get_parsed_game_path(game_id)) for game_id in parsed_game_ids),
+                season_file
+            )
+
+        return season_file, parsed_game_ids
+
+
+    def __get_dimension_names(self) -> dict:
+        """Gets the names of the players and teams of the catalog's dimension tables.
+
+        Returns:
+            dict: Names (pd.Series indexed by player or team ID) by dimension table.
+        """
+        return {table: pd.Series(self.data_fetcher.catalog.get_names(table), dtype='object') for table in DIMENSION_TABLES}
+
+
+    def __to_cached_query(self, columns: list, filters: list, dimension_names: dict) -> tuple:
+        """Translates a query on parsed play-by-play data to a query on its cached files, where the player and team name
+        columns are replaced by their ID columns. A filter on a name column becomes a filter on the IDs with those names.
+
+        Args:
+            columns (list): Columns of the query, None for all columns.
+            filters (list): Row filters of the query as (column, operator, value) tuples, None for no filter.
+            dimension_names (dict): Names of the dimension tables (see __get_dimension_names).
+
+        Returns:
+            tuple: Columns and filters of the query on the cached files (columns: list, filters: list)
+
+        Raises:
+            ValueError: If a name column is filtered with an operator other than ==, !=, in and not in.
+        """
+        cached_columns = list(dict.fromkeys(NAME_ID_COLUMNS.get(col, col) for col in columns)) if columns is not None else None
+        cached_filters = []
+
+        for col, op, value in filters or []:
+            if col not in NAME_ID_COLUMNS:
+                cached_filters.append((col, op, value))
+                continue
+
+            if op not in ('==', '!=', 'in', 'not in'):
+                raise ValueError(f"Operator {op} is not supported on the name column {col}.")
+
+            # Several players or teams can share a name, so a name is matched against every ID it has
+            names = dimension_names[NAME_DIMENSION_TABLES[col]]
+            ids = names.index[names.isin(value if op in ('in', 'not in') else [value])].tolist()
+            cached_filters.append((NAME_ID_COLUMNS[col], 'in' if op in ('==', 'in') else 'not in', ids))
+
+        return cached_columns, cached_filters or filters
+
+
+    def __resolve_names(self, df: pd.DataFrame, columns: list, dimension_names: dict) -> pd.DataFrame:
+        """Adds the requested player and team name columns to parsed play-by-play data read from its cached files,
+        from their ID columns and the dimension tables, and keeps the requested columns only.
+
+        Args:
+            df (pd.DataFrame): Parsed play-by-play data read from its cached files.
+            columns (list): Requested columns, None for every column of DEFAULT_COLUMNS.
+            dimension_names (dict): Names of the dimension tables (see __get_dimension_names).
+
+        Returns:
+            pd.DataFrame: Parsed play-by-play data with the requested columns.
+        """
+        columns = columns if columns is not None else DEFAULT_COLUMNS
+        names = {
+            name_col: df[id_col].map(dimension_names[NAME_DIMENSION_TABLES[name_col]])
+            for name_col, id_col in NAME_ID_COLUMNS.items() if name_col in columns
+        }
+
+        return df.assign(**names)[columns]
+
+
+    def iter_shots(
+            self,
+            start_season: int,
+            end_season: int = 0,
+            game_type: int = None,
+            columns: list = None,
+            filters: list = None,
+            batch_size: int = None,
+            workers: int = None,
+            refresh: bool = False
+        ):
+        """Lazily reads the shots and goals of a range of seasons, one season at a time, so that aggregations, scoring
+        or training over many seasons only hold one season (or one batch) in memory. Each season is brought up to date
+        right before it is read (see get_shot_and_goal_pbp_df_for_season). The player and team names are only resolved
+        for the requested name columns, filters on them are pushed down as filters on the IDs. The games of every season
+        that can't be parsed are reported in self.parse_failures.
+
+        Args:
+            start_season (int): First season to read.
+            end_season (int, optional): Last season to read. Defaults to 0 (only the first season).
+            game_type (int, optional): Game type: regular season (2) or playoffs (3). Defaults to None (both).
+            columns (list, optional): Columns of the DataFrames. Defaults to None (every column of DEFAULT_COLUMNS).
+            filters (list, optional): Row filters as (column, operator, value) tuples that must all match (see FILTER_OPERATORS). Defaults to None.
+            batch_size (int, optional): Maximum number of rows of a batch. Defaults to None (one DataFrame per season).
+            workers (int, optional): Number of processes used to parse the games. Defaults to the parser's workers.
+            refresh (bool, optional): If the seasons' games should be discovered and fetched first. Defaults to False
+                (only the games already fetched are read, see NHLDataFetcher.fetch_raw_season_data).
+
+        Yields:
+            pd.DataFrame: Shots and goals of a season, or a batch of at most batch_size of them.
+        """
+        workers = workers or self.workers
+        self.parse_failures = {}
+
+        for season in range(start_season, (end_season or start_season) + 1):
+            season_file, _ = self.__update_season_file(
+                season,
+                with_regular_season=game_type != PLAYOFF_GAME_TYPE,
+                with_playoff_season=game_type != REGULAR_SEASON_GAME_TYPE,
+                workers=workers,
+                refresh=refresh
+            )
+            dimension_names = self.__get_dimension_names()
+            cached_columns, cached_filters = self.__to_cached_query(columns, filters, dimension_names)
+
+            if batch_size is None:
+                with self.profiler.stage('read_season_file') as stage:
+                    season_df = self.__resolve_names(self.raw_season_data_to_df(season_file, cached_columns, cached_filters), columns, dimension_names)
+                    stage['rows'] = len(season_df)
+
+                yield season_df
+            else:
+                for batch in self.__iter_parsed_file_batches(season_file, cached_columns, cached_filters, batch_size):
+                    yield self.__resolve_names(batch, columns, dimension_names)
+
+
+    def iter_games(
+            self,
+            start_season: int,
+            end_season: int = 0,
+            game_type: int = None,
+            columns: list = None,
+            filters: list = None,
+            workers: int = None,
+            refresh: bool = False
+        ):
+        """Lazily reads the shots and goals of a range of seasons one game at a time, from the games' cached files.
+        The games of every season that can't be parsed are reported in self.parse_failures.
+
+        Args:
+            start_season (int): First season to read.
+            end_season (int, optional): Last season to read. Defaults to 0 (only the first season).
+            game_type (int, optional): Game type: regular season (2) or playoffs (3). Defaults to None (both).
+            columns (list, optional): Columns of the DataFrames. Defaults to None (every column of DEFAULT_COLUMNS).
+            filters (list, optional): Row filters as (column, operator, value) tuples that must all match (see FILTER_OPERATORS). Defaults to None.
+            workers (int, optional): Number of processes used to parse the games. Defaults to the parser's workers.
+            refresh (bool, optional): If the seasons' games should be discovered and fetched first. Defaults to False
+                (only the games already fetched are read, see NHLDataFetcher.fetch_raw_season_data).
+
+        Yields:
+            tuple: Game ID and shots and goals of each game, in game order (game ID: str, DataFrame)
+        """
+        workers = workers or self.workers
+        self.parse_failures = {}
+
+        for season in range(start_season, (end_season or start_season) + 1):
+            _, game_ids = self.__update_season_file(
+                season,
+                with_regular_season=game_type != PLAYOFF_GAME_TYPE,
+                with_playoff_season=game_type != REGULAR_SEASON_GAME_TYPE,
+                workers=workers,
+                refresh=refresh
+            )
+            dimension_names = self.__get_dimension_names()
+            cached_columns, cached_filters = self.__to_cached_query(columns, filters, dimension_names)
+
+            for game_id in game_ids:
+                game_df = self.raw_season_data_to_df(self.__get_parsed_game_path(game_id), cached_columns, cached_filters)
+                yield game_id, self.__resolve_names(game_df, columns, dimension_names)
+
+
+    def query_shots(
+            self,
+            start_season: int,
+            end_season: int = 0,
+            game_type: int = None,
+            columns: list = None,
+            filters: list = None,
+            compact: bool = False,
+            workers: int = None,
+            refresh: bool = False
+        ) -> pd.DataFrame:
+        """Queries the shots and goals of a range of seasons. The game type selects the season files to read, and the
+        projection and row filters are pushed down to the cached season files, so only the requested columns of the
+        matching rows are loaded in memory. The seasons are parsed first if needed (see get_shot_and_goal_pbp_df_for_season).
+
+        Example:
+            parser.query_shots(2016, 2023, game_type=REGULAR_SEASON_GAME_TYPE, columns=['xCoord', 'yCoord'],
+                               filters=[('zoneCode', 'in', ['O', 'N']), ('shootingTeam', '==', 'Canadiens')])
+
+        Args:
+            start_season (int): First season of the query.
+            end_season (int, optional): Last season of the query. Defaults to 0 (only the first season).
+            game_type (int, optional): Game type: regular season (2) or playoffs (3). Defaults to None (both).
+            columns (list, optional): Columns of the DataFrame. Defaults to None (every column of DEFAULT_COLUMNS).
+            filters (list, optional): Row filters as (column, operator, value) tuples that must all match (see FILTER_OPERATORS). Defaults to None.
+            compact (bool, optional): If the DataFrame should have compact column types (see to_compact_df), with player
+                IDs instead of player names; the names are then in self.player_lookup. Defaults to False.
+            workers (int, optional): Number of processes used to parse the games. Defaults to the parser's workers.
+            refresh (bool, optional): If the seasons' games should be discovered and fetched first. Defaults to False
+                (only the games already fetched are read, see NHLDataFetcher.fetch_raw_season_data).
+
+        Returns:
+            pd.DataFrame: Shots and goals of the seasons that match the filters.
+        """
+        # Compact DataFrames keep the player IDs, so the player names don't have to be resolved
+        if compact:
+            columns = list(dict.fromkeys(PLAYER_NAME_ID_COLUMNS.get(col, col) for col in columns or DEFAULT_COLUMNS))
+            players = self.__get_dimension_names()['players']
+            self.player_lookup = players.set_axis(players.index.astype('Int32')).rename_axis('playerId').rename('playerName').sort_index()
+
+        season_dfs = self.iter_shots(start_season, end_season, game_type, columns, filters, workers=workers, refresh=refresh)
+
+        # Each season is compacted as soon as it is read, so a single season is ever held with the wide column types
+        if compact:
+            season_dfs = self.__unify_categories([self.to_compact_df(season_df) for season_df in season_dfs])
+        else:
+            season_dfs = list(season_dfs)
+
+        if not season_dfs:
+            raise ValueError(f"No valid game data found for seasons {start_season} to {end_season}.")
+
+        return pd.concat(season_dfs, ignore_index=True)
+
+
+    def __unify_categories(self, dfs: list) -> list:
+        """Gives the categorical columns of DataFrames the union of their categories, so they stay categorical once
+        the DataFrames are concatenated.
+
+        Args:
+            dfs (list): DataFrames with the same columns.
+
+        Returns:
+            list: DataFrames whose categorical columns share the same categories.
+        """
+        if not dfs:
+            return dfs
+
+        category_columns = [col for col, dtype in dfs[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+        categories = {
+            col: pd.Index([]).append([df[col].cat.categories for df in dfs]).unique().sort_values()
+            for col in category_columns
+        }
+
+        return [df.assign(**{col: df[col].cat.set_categories(categories[col]) for col in category_columns}) for df in dfs]
+
+
+    def __get_game_type(self, with_regular_season: bool, with_playoff_season: bool) -> int:
+        """Gets the game type to query for a selection of regular season and playoff games.
+
+        Args:
+            with_regular_season (bool): If regular season games are selected.
+            with_playoff_season (bool): If playoff season games are selected.
+
+        Returns:
+            int: Game type, None for both.
+
+        Raises:
+            ValueError: If neither regular season nor playoff games are selected.
+        """
+        if with_regular_season and with_playoff_season:
+            return None
+        elif with_regular_season:
+            return REGULAR_SEASON_GAME_TYPE
+        elif with_playoff_season:
+            return PLAYOFF_GAME_TYPE
+
+        raise ValueError("Either regular season or playoff season games must be selected.")
 
 
     def get_shot_and_goal_pbp_df_for_season(
             self, 
             season: int, 
             with_regular_season: bool = True, 
-            with_playoff_season: bool = True
+            with_playoff_season: bool = True,
+            workers: int = None,
+            columns: list = None,
+            compact: bool = False,
+            refresh: bool = False
         ) -> pd.DataFrame:
         """Transforms the raw JSON data for play-by-play events of a particular season into a tidied DataFrame.
+        Only the games that changed since they were last parsed are parsed again, then the season is read from its
+        cached file (see query_shots). Games that can't be parsed are skipped and reported in self.parse_failures.
         
         Args:
             season (int): Season year.
             with_regular_season (bool, optional): If the season should contain regular season games. Defaults to True.
             with_playoff_season (bool, optional): If the season should contain playoff season games. Defaults to True.
+            workers (int, optional): Number of processes used to parse the games. Defaults to the parser's workers.
+            columns (list, optional): Columns of the DataFrame. Defaults to None (every column of DEFAULT_COLUMNS).
+            compact (bool, optional): If the DataFrame should have compact column types (see to_compact_df). Defaults to False.
+            refresh (bool, optional): If the season's games should be discovered and fetched first. Defaults to False
+                (only the games already fetched are read, see NHLDataFetcher.fetch_raw_season_data).
         
         Returns:
             pd.DataFrame: DataFrame that contains tidied play-by-play data for the season specified.
         """
-        if self.season_already_parsed(season, with_regular_season, with_playoff_season):
-            return self.raw_season_data_to_df(self.__get_season_file_name(season, with_regular_season, with_playoff_season))
-        
-        season_dfs = []
-
-        # Process regular season games
-        if with_regular_season:
-            for game_id in self.helper.get_game_ids_for_season(season, True):
-                try:
-                    season_dfs.append(self.get_shot_and_goal_pbp_df(game_id))
-                except FileNotFoundError:
-                    print(f"File not found for game_id: {game_id}, skipping.")
-                    continue
-                except ValueError as e:
-                    print(f"ValueError for game_id {game_id}: {e}")
-                    continue
-
-        # Process playoff games
-        if with_playoff_season:
-            for game_id in self.helper.get_game_ids_for_season(season, False):
-                try:
-                    season_dfs.append(self.get_shot_and_goal_pbp_df(game_id))
-                except FileNotFoundError:
-                    continue
-                except ValueError as e:
-                    continue
-
-        # Concatenate all game DataFrames
-        if not season_dfs:
-            raise ValueError(f"No valid game data found for season {season}.")
-
-        season_df = pd.concat(season_dfs, ignore_index=True)
-        season_file = self.__get_season_file_name(season, with_regular_season, with_playoff_season)
-        
-        full_local_data_path = os.path.join(self.data_fetcher.local_data_path, season_file)
-        season_df.to_csv(full_local_data_path, index=False)
-
-        return season_df
+        return self.query_shots(
+            season,
+            game_type=self.__get_game_type(with_regular_season, with_playoff_season),
+            columns=columns,
+            compact=compact,
+            workers=workers,
+            refresh=refresh
+        )
 
 
     def get_shot_and_goal_pbp_df_for_seasons(
@@ -450,7 +1554,11 @@ class NHLDataParser:
             start_season: int,
             end_season: int = 0,
             with_regular_season: bool = True,
-            with_playoff_season: bool = True
+            with_playoff_season: bool = True,
+            workers: int = None,
+            columns: list = None,
+            compact: bool = False,
+            refresh: bool = False
         ) -> pd.DataFrame:
         """Transforms the raw JSON data for play-by-play events across a range of seasons into a tidied DataFrame.
         
@@ -459,30 +1567,21 @@ class NHLDataParser:
             end_season (int, optional): Last season to start getting the play-by-play data for. Defaults to 0.
             with_regular_season (bool, optional): If the season should contain regular season games. Defaults to True.
             with_playoff_season (bool, optional): If the season should contain playoff season games. Defaults to True.
+            workers (int, optional): Number of processes used to parse the games. Defaults to the parser's workers.
+            columns (list, optional): Columns of the DataFrame. Defaults to None (every column of DEFAULT_COLUMNS).
+            compact (bool, optional): If the DataFrame should have compact column types (see to_compact_df). Defaults to False.
+            refresh (bool, optional): If the season's games should be discovered and fetched first. Defaults to False
+                (only the games already fetched are read, see NHLDataFetcher.fetch_raw_season_data).
         
         Returns:
             pd.DataFrame: DataFrame that contains tidied play-by-play data for range of seasons specified.
         """
-        all_seasons_dfs = []
-
-        if end_season == 0:
-            return self.get_shot_and_goal_pbp_df_for_season(
-                start_season,
-                with_regular_season=with_regular_season,
-                with_playoff_season=with_playoff_season
-            )
-        else:
-            for season in range(start_season, end_season + 1):
-                season_df = self.get_shot_and_goal_pbp_df_for_season(
-                    season,
-                    with_regular_season=with_regular_season,
-                    with_playoff_season=with_playoff_season
-                )
-                all_seasons_dfs.append(season_df)
-
-
-        # Ensure we have data to concatenate
-        if not all_seasons_dfs:
-            raise ValueError(f"No valid game data found for seasons {start_season} to {end_season}.")
-
-        return pd.concat(all_seasons_dfs, ignore_index=True)
\ No newline at end of file
+        return self.query_shots(
+            start_season,
+            end_season,
+            game_type=self.__get_game_type(with_regular_season, with_playoff_season),
+            columns=columns,
+            compact=compact,
+            workers=workers,
+            refresh=refresh
+        )
\ No newline at end of file
@@ -0,0 +1,218 @@
+import os
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Tables of an event store: the events of the games and the dimensions they share
+EVENT_STORE_TABLES = ['games', 'periods', 'rosters', 'events']
+
+# Tables are saved as Parquet when pyarrow is installed, as CSV otherwise
+EVENT_STORE_FILE_EXTENSION = '.parquet' if pyarrow is not None else '.csv'
+
+# Types of the columns of each table. Repeated strings are categoricals and IDs are nullable integers
+EVENT_STORE_DTYPES = {
+    'games': {
+        'gameId': 'int64',
+        'season': 'int16',
+        'gameType': 'int8',
+        'gameState': 'category',
+        'homeTeamId': 'Int32',
+        'homeTeam': 'category',
+        'awayTeamId': 'Int32',
+        'awayTeam': 'category'
+    },
+    'periods': {
+        'gameId': 'int64',
+        'periodNumber': 'int8',
+        'periodType': 'category'
+    },
+    'rosters': {
+        'gameId': 'int64',
+        'playerId': 'Int32',
+        'teamId': 'Int32',
+        'playerName': 'category',
+        'positionCode': 'category',
+        'sweaterNumber': 'Int16'
+    },
+    'events': {
+        'gameId': 'int64',
+        'eventId': 'Int32',
+        'sortOrder': 'Int32',
+        'typeDescKey': 'category',
+        'periodNumber': 'int8',
+        'timeInPeriod': 'category',
+        'timeRemaining': 'int16',
+        'situationCode': 'category',
+        'homeTeamDefendingSide': 'category',
+        'eventOwnerTeamId': 'Int32',
+        'xCoord': 'float32',
+        'yCoord': 'float32',
+        'zoneCode': 'category',
+        'shotType': 'category',
+        'shootingPlayerId': 'Int32',
+        'scoringPlayerId': 'Int32',
+        'assist1PlayerId': 'Int32',
+        'assist2PlayerId': 'Int32',
+        'goalieInNetId': 'Int32',
+        'blockingPlayerId': 'Int32',
+        'hittingPlayerId': 'Int32',
+        'hitteePlayerId': 'Int32',
+        'winningPlayerId': 'Int32',
+        'losingPlayerId': 'Int32',
+        'playerId': 'Int32',
+        'committedByPlayerId': 'Int32',
+        'drawnByPlayerId': 'Int32',
+        'typeCode': 'category',
+        'descKey': 'category',
+        'duration': 'Int16',
+        'reason': 'category',
+        'awayScore': 'Int16',
+        'homeScore': 'Int16',
+        'awaySOG': 'Int16',
+        'homeSOG': 'Int16'
+    }
+}
+
+# Columns of the dimensions that can be joined to the events, with the keys they are joined on
+EVENT_DIMENSION_KEYS = {'periods': ['gameId', 'periodNumber'], 'games': ['gameId']}
+
+class NHLEventStore:
+    def __init__(self, games: pd.DataFrame, periods: pd.DataFrame, rosters: pd.DataFrame, events: pd.DataFrame):
+        """
+        Initialize a columnar store of every event (play) of a set of games, with the dimensions the events share:
+        one row per game (teams, state), per period of a game (period type) and per player of a game's rosters.
+        Each table has the compact types of EVENT_STORE_DTYPES. Event-specific tables (shots, hits, penalties...)
+        are views over the events, so the raw games only have to be decoded once.
+
+        Args:
+            games (pd.DataFrame): One row per game.
+            periods (pd.DataFrame): One row per period of a game.
+            rosters (pd.DataFrame): One row per player of a game's rosters.
+            events (pd.DataFrame): One row per play of a game, in the order of the plays.
+        """
+        tables = {'games': games, 'periods': periods, 'rosters': rosters, 'events': events}
+
+        for table, df in tables.items():
+            dtypes = EVENT_STORE_DTYPES[table]
+            setattr(self, table, df.reindex(columns=list(dtypes)).astype(dtypes).reset_index(drop=True))
+
+
+    def get_events(self, event_types: list = None, columns: list = None) -> pd.DataFrame:
+        """Gets the events, optionally of some types only. Columns of the period and game dimensions
+        (e.g. periodType, season, homeTeam) can be requested along with the event columns, they are joined on demand.
+
+        Args:
+            event_types (list, optional): Types of events to keep (typeDescKey, e.g. ['hit', 'penalty']). Defaults to None (all).
+            columns (list, optional): Columns to return. Defaults to None (every event column).
+
+        Returns:
+            pd.DataFrame: Events in the order of the plays.
+
+        Raises:
+            ValueError: If a column is neither an event column nor a dimension column.
+        """
+        events = self.events
+
+        if event_types is not None:
+            events = events[events['typeDescKey'].isin(event_types)]
+
+        if columns is None:
+            return events
+
+        event_columns = [col for col in columns if col in events.columns]
+        missing_columns = [col for col in columns if col not in events.columns]
+
+        for table, keys in EVENT_DIMENSION_KEYS.items():
+            dimension = getattr(self, table)
+            dimension_columns = [col for col in missing_columns if col in dimension.columns]
+
+            if dimension_columns:
+                events = events.merge(dimension[keys + dimension_columns], on=keys, how='left').set_axis(events.index)
+                missing_columns = [col for col in missing_columns if col not in dimension_columns]
+
+        if missing_columns:
+            raise ValueError(f"Unknown columns: {missing_columns}")
+
+        return events[event_columns + [col for col in columns if col not in event_columns]]
+
+
+    def iter_game_events(self, event_types: list = None):
+        """Iterates over the events of each game.
+
+        Args:
+            event_types (list, optional): Types of events to keep. Defaults to None (all).
+
+        Yields:
+            tuple: Game ID and the events of the game (game_id: int, pd.DataFrame)
+        """
+        events = self.get_events(event_types)
+
+        for game_id, game_events in events.groupby('gameId', sort=False, observed=True):
+            yield game_id, game_events
+
+
+    def get_game_maps(self) -> dict:
+        """Gets the maps of each game's rosters and teams, as used to name the players and teams of its events.
+
+        Returns:
+            dict: For each game ID: map for player ID to player name, map for player ID to team ID and map for
+                team ID to team name (names: dict, team IDs: dict, team names: dict)
+        """
+        game_maps = {
+            game['gameId']: ({}, {}, {game['homeTeamId']: game['homeTeam'], game['awayTeamId']: game['awayTeam']})
+            for game in self.games.to_dict('records')
+        }
+
+        for player in self.rosters.to_dict('records'):
+            player_name_map, player_team_map, _ = game_maps[player['gameId']]
+            player_name_map[player['playerId']] = player['playerName']
+            player_team_map[player['playerId']] = player['teamId']
+
+        return game_maps
+
+
+    def save(self, path: str):
+        """Saves every table of the store in a directory, one file per table.
+
+        Args:
+            path (str): Directory of the store.
+        """
+        os.makedirs(path, exist_ok=True)
+
+        for table in EVENT_STORE_TABLES:
+            file_path = os.path.join(path, f'{table}{EVENT_STORE_FILE_EXTENSION}')
+            temp_path = f'{file_path}.tmp'
+
+            if pyarrow is not None:
+                getattr(self, table).to_parquet(temp_path, index=False, compression='zstd')
+            else:
+                getattr(self, table).to_csv(temp_path, index=False)
+
+            os.replace(temp_path, file_path)
+
+
+def load_event_store(path: str) -> NHLEventStore:
+    """Loads an event store saved with NHLEventStore.save.
+
+    Args:
+        path (str): Directory of the store.
+
+    Returns:
+        NHLEventStore: Loaded store.
+    """
+    tables = {}
+
+    for table in EVENT_STORE_TABLES:
+        file_path = os.path.join(path, f'{table}{EVENT_STORE_FILE_EXTENSION}')
+
+        if pyarrow is not None:
+            tables[table] = pd.read_parquet(file_path)
+        else:
+            tables[table] = pd.read_csv(file_path, dtype={col: 'object' for col, dtype in EVENT_STORE_DTYPES[table].items() if dtype == 'category'})
+
+    return NHLEventStore(**tables)
+
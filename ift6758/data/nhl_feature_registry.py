@@ -0,0 +1,346 @@
+from ift6758.data.nhl_profiler import NHLStageProfiler
+import numpy as np
+import pandas as pd
+
+# Play features are computed on every play of a game, shot features only on its shots-on-net and goals
+PLAY_SCOPE = 'play'
+SHOT_SCOPE = 'shot'
+
+# The net the team shoots on: left (-89, 0) or right (89, 0)
+NET_X = 89
+
+class NHLFeatureRegistry:
+    def __init__(self, source_columns: list, profiler: NHLStageProfiler = None):
+        """
+        Initialize the registry of the features computed from the plays of a game. Each feature declares the columns
+        it is computed from, so a subset of features only runs the computations it depends on.
+        The features of the parsed play-by-play data are registered, more can be added with register.
+        The plays of several games can be computed at once when they have a gameId column: the features that depend
+        on earlier plays start over at the first play of each game.
+
+        Args:
+            source_columns (list): Columns read from the raw plays, available without any computation.
+            profiler (NHLStageProfiler, optional): Profiler recording each feature's computation as a stage
+                (feature:{name}). Defaults to a disabled profiler.
+        """
+        self.source_columns = list(source_columns)
+        self.profiler = profiler or NHLStageProfiler(enabled=False)
+        self.features = {}
+
+        self.__register_default_features()
+
+
+    def register(self, name: str, inputs: list, compute, scope: str = SHOT_SCOPE):
+        """Registers a feature.
+
+        Args:
+            name (str): Name of the feature, which is also its column name.
+            inputs (list): Source columns and features the feature is computed from.
+            compute (callable): Function (df: pd.DataFrame, context: dict) -> pd.Series computing the feature for the
+                rows of df. The context holds the parsing state of the game (read only), the state updates to apply once
+                the plays are parsed, if period 1 is over, the game of each row as codes of the game IDs (game_codes,
+                game_ids) and which rows are the first of their game (is_game_start).
+            scope (str, optional): PLAY_SCOPE to compute the feature on every play, SHOT_SCOPE on the shots and goals only.
+                Defaults to SHOT_SCOPE.
+
+        Raises:
+            ValueError: If an input is unknown, or if a play feature depends on a shot feature.
+        """
+        for input_name in inputs:
+            if input_name not in self.source_columns and input_name not in self.features:
+                raise ValueError(f"Unknown input {input_name} of feature {name}.")
+
+            if scope == PLAY_SCOPE and self.features.get(input_name, {}).get('scope') == SHOT_SCOPE:
+                raise ValueError(f"Play feature {name} can't depend on shot feature {input_name}.")
+
+        self.features[name] = {'inputs': list(inputs), 'compute': compute, 'scope': scope}
+
+
+    def resolve(self, features: list, available_columns: list = None) -> list:
+        """Gets the features to compute for requested features: the requested features and every feature they
+        depend on, in an order where each feature comes after its inputs.
+
+        Args:
+            features (list): Requested features or source columns.
+            available_columns (list, optional): Features already computed, which are neither computed again nor
+                need their inputs. Defaults to None.
+
+        Returns:
+            list: Names of the features to compute, in computation order.
+
+        Raises:
+            ValueError: If a requested feature is unknown.
+        """
+        ordered_features = []
+        visited = set(available_columns or [])
+
+        def visit(name: str):
+            if name in visited or name in self.source_columns:
+                return
+
+            if name not in self.features:
+                raise ValueError(f"Unknown feature {name}.")
+
+            visited.add(name)
+
+            for input_name in self.features[name]['inputs']:
+                visit(input_name)
+
+            ordered_features.append(name)
+
+        for name in features:
+            visit(name)
+
+        return ordered_features
+
+
+    def compute_features(self, df: pd.DataFrame, features: list, scope: str, context: dict) -> pd.DataFrame:
+        """Adds the features of a scope to a DataFrame, in order.
+
+        Args:
+            df (pd.DataFrame): Plays (PLAY_SCOPE) or shots and goals (SHOT_SCOPE) of a game.
+            features (list): Features to compute, as returned by resolve.
+            scope (str): Scope of the features to compute, the others are skipped.
+            context (dict): Context of the computation (see register).
+
+        Returns:
+            pd.DataFrame: The DataFrame with the feature columns.
+        """
+        game_codes, game_ids = pd.factorize(df['gameId'], sort=False)
+        context['game_codes'] = game_codes
+        context['game_ids'] = game_ids
+        context['is_game_start'] = np.r_[True, game_codes[1:] != game_codes[:-1]][:len(game_codes)]
+
+        for name in features:
+            feature = self.features[name]
+
+            if feature['scope'] == scope:
+                with self.profiler.stage(f'feature:{name}') as stage:
+                    df[name] = feature['compute'](df, context)
+                    stage['rows'] = len(df)
+
+        return df
+
+
+    def __register_default_features(self):
+        """Registers the features of the parsed play-by-play data (see NHLDataParser.get_shot_and_goal_pbp_df)."""
+        self.register('previousEvent', ['typeDescKey'], self.__compute_previous_event, PLAY_SCOPE)
+        self.register('timeDiff', ['timeRemaining'], self.__compute_time_diff, PLAY_SCOPE)
+        self.register('previousEventX', ['xCoord'], self.__compute_previous_event_x, PLAY_SCOPE)
+        self.register('previousEventY', ['yCoord'], self.__compute_previous_event_y, PLAY_SCOPE)
+        self.register(
+            'distanceDiff', ['xCoord', 'yCoord', 'previousEventX', 'previousEventY'], self.__compute_distance_diff, PLAY_SCOPE
+        )
+
+        self.register('isGoal', ['typeDescKey'], lambda df, context: (df['typeDescKey'] == 'goal').astype(int))
+        self.register('rebound', ['previousEvent'], lambda df, context: (df['previousEvent'] == 'shot-on-goal').astype(int))
+        self.register('speed', ['distanceDiff', 'timeDiff'], self.__compute_speed)
+
+        self.register('shootingTeamId', ['shootingPlayerId'], self.__compute_shooting_team_id)
+        self.register('shootingTeam', ['shootingTeamId'], self.__compute_shooting_team)
+        self.register('shootingPlayer', ['shootingPlayerId'], self.__compute_shooting_player)
+        self.register('goalieInNet', ['goalieInNetId'], self.__compute_goalie_in_net)
+        self.register('emptyNet', ['goalieInNetId'], lambda df, context: np.where(df['goalieInNetId'].isna(), 1, 0))
+
+        self.register(
+            'shootingTeamSide', ['shootingTeamId', 'periodNumber', 'zoneCode', 'xCoord'], self.__compute_shooting_team_side
+        )
+        self.register('shotDistance', ['xCoord', 'yCoord', 'shootingTeamSide'], self.__compute_shot_distance)
+        self.register('shotAngle', ['xCoord', 'yCoord', 'shootingTeamSide'], self.__compute_shot_angle)
+        self.register(
+            'shotAngleDiff', ['shotAngle', 'rebound', 'previousEventX', 'previousEventY'], self.__compute_shot_angle_diff
+        )
+
+
+    def __shift_with_previous(self, column: pd.Series, previous, context: dict) -> pd.Series:
+        """Shifts a column by one row within each game, filling the first row of each game with the value that preceded it.
+
+        Args:
+            column (pd.Series): Column to shift.
+            previous (any): Value of the row before the first row of a game.
+            context (dict): Context of the computation.
+
+        Returns:
+            pd.Series: Shifted column.
+        """
+        return column.shift(1).mask(context['is_game_start'], previous)
+
+
+    def __calculate_distance(self, x1: pd.Series, y1: pd.Series, x2: pd.Series, y2: pd.Series) -> pd.Series:
+        """Calculates the euclidian distance between (x1, y1) and (x2, y2) for whole columns at once
+
+        Args:
+            x1 (pd.Series): The x coordinates of the first points
+            y1 (pd.Series): The y coordinates of the first points
+            x2 (pd.Series): The x coordinates of the second points
+            y2 (pd.Series): The y coordinates of the second points
+
+        Returns:
+            pd.Series: The floating value distances between the first points and the second points (NaN if a coordinate is missing)
+        """
+        return np.sqrt((x1 - x2).astype(float) ** 2 + (y1 - y2).astype(float) ** 2)
+
+
+    def __calculate_angle(self, x1: pd.Series, y1: pd.Series, x2: pd.Series, y2: pd.Series) -> pd.Series:
+        """Calculates the angles between two sets of points, considering right triangles, for whole columns at once.
+
+        Args:
+            x1 (pd.Series): The x coordinates of the first points
+            y1 (pd.Series): The y coordinates of the first points
+            x2 (pd.Series): The x coordinates of the second points
+            y2 (pd.Series): The y coordinates of the second points
+
+        Returns:
+            pd.Series: The floating value angles between the two sets of points
+        """
+        return np.degrees(np.arctan2((y2 - y1).astype(float).abs(), (x2 - x1).astype(float).abs()))
+
+
+    def __compute_previous_event(self, df: pd.DataFrame, context: dict) -> pd.Series:
+        return self.__shift_with_previous(df['typeDescKey'], context['game_state']['previous_event'], context)
+
+
+    def __compute_time_diff(self, df: pd.DataFrame, context: dict) -> pd.Series:
+        return self.__shift_with_previous(df['timeRemaining'], context['game_state']['previous_time_remaining'], context) - df['timeRemaining']
+
+
+    def __compute_previous_event_x(self, df: pd.DataFrame, context: dict) -> pd.Series:
+        return self.__shift_with_previous(df['xCoord'], context['game_state']['previous_x'], context)
+
+
+    def __compute_previous_event_y(self, df: pd.DataFrame, context: dict) -> pd.Series:
+        return self.__shift_with_previous(df['yCoord'], context['game_state']['previous_y'], context)
+
+
+    def __compute_distance_diff(self, df: pd.DataFrame, context: dict) -> pd.Series:
+        return self.__calculate_distance(df['xCoord'], df['yCoord'], df['previousEventX'], df['previousEventY'])
+
+
+    def __compute_speed(self, df: pd.DataFrame, context: dict) -> pd.Series:
+        """Speed is only defined when time passed since the previous event, otherwise the game's running mean speed is used."""
+        game_state = context['game_state']
+
+        has_time_diff = df['timeDiff'] > 0
+        speed = df['distanceDiff'] / df['timeDiff'].where(has_time_diff)
+
+        is_defined = speed.notna().to_numpy()
+        game_codes = context['game_codes']
+        game_count = len(context['game_ids'])
+        speed_sum = np.bincount(game_codes, weights=np.where(is_defined, speed, 0), minlength=game_count) + game_state['speed_sum']
+        speed_count = np.bincount(game_codes, weights=is_defined, minlength=game_count) + game_state['speed_count']
+        context['state_updates'].update(speed_sum=speed_sum[-1], speed_count=int(speed_count[-1]))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_speed = np.where(speed_count > 0, speed_sum / speed_count, np.nan)
+
+        return speed.where(has_time_diff, mean_speed[game_codes])
+
+
+    def __compute_shooting_team_id(self, df: pd.DataFrame, context: dict) -> pd.Series:
+        return df['shootingPlayerId'].map(context['game_state']['player_team_map'])
+
+
+    def __compute_shooting_team(self, df: pd.DataFrame, context: dict) -> pd.Series:
+        return df['shootingTeamId'].map(context['game_state']['team_id_map'])
+
+
+    def __compute_shooting_player(self, df: pd.DataFrame, context: dict) -> pd.Series:
+        return df['shootingPlayerId'].map(context['game_state']['player_name_map'])
+
+
+    def __compute_goalie_in_net(self, df: pd.DataFrame, context: dict) -> pd.Series:
+        return df['goalieInNetId'].map(context['game_state']['player_name_map'])
+
+
+    def __get_shooting_team_side_during_p1(self, df: pd.DataFrame, context: dict) -> tuple:
+        """Gets the shooting team and their side (left or right) during the first period of play of each game.
+        The first offensive zone shot of period 1 sets the sides, or the first defensive zone shot when there's none
+        and period 1 is over.
+
+        Args:
+            df (pd.DataFrame): The play-by-play shot DataFrame
+            context (dict): Context of the computation.
+
+        Returns:
+            tuple: The shooting team's ID and their starting side {0, 1, NaN if unknown}, for each game code
+                (shooting teams: np.ndarray, sides: np.ndarray)
+        """
+        game_count = len(context['game_ids'])
+        first_shooting_teams = np.full(game_count, None, dtype=object)
+        sides = np.full(game_count, np.nan)
+
+        is_period1 = df['periodNumber'].to_numpy() == 1
+        zone_codes = df['zoneCode'].to_numpy()
+        x_coords = df['xCoord'].to_numpy()
+        shooting_teams = df['shootingTeamId'].to_numpy()
+
+        # Side of the shooting team's net when the shot is on the left side of the rink, in the offensive or defensive zone
+        zone_sides = [('O', 1)] + ([('D', 0)] if context['is_period1_over'] else [])
+
+        for zone_code, side_if_left in zone_sides:
+            positions = np.flatnonzero(is_period1 & (zone_codes == zone_code))
+            game_codes, first_positions = np.unique(context['game_codes'][positions], return_index=True)
+            positions = positions[first_positions]
+
+            is_unknown = np.isnan(sides[game_codes])
+            game_codes, positions = game_codes[is_unknown], positions[is_unknown]
+
+            first_shooting_teams[game_codes] = shooting_teams[positions]
+            sides[game_codes] = np.where(x_coords[positions] < 0, side_if_left, 1 - side_if_left)
+
+        return first_shooting_teams, sides
+
+
+    def __compute_shooting_team_side(self, df: pd.DataFrame, context: dict) -> pd.Series:
+        """Sets the shooting team side based on the first shooting team's side in period 1, taken from the parsing state
+        or determined from the shots. In a live game, a defensive zone shot only sets the sides once period 1 is over,
+        since a later offensive zone shot of period 1 takes precedence.
+        The side is NaN for the games where it can't be determined yet, their game IDs are put in the context
+        (undetermined_side_game_ids).
+        """
+        game_state = context['game_state']
+
+        if game_state['first_shooting_team_side'] is not None:
+            first_shooting_teams = np.array([game_state['first_shooting_team']], dtype=object)
+            sides = np.array([game_state['first_shooting_team_side']], dtype=float)
+        else:
+            first_shooting_teams, sides = self.__get_shooting_team_side_during_p1(df, context)
+
+            if not np.isnan(sides[-1]):
+                context['state_updates'].update(first_shooting_team=first_shooting_teams[-1], first_shooting_team_side=int(sides[-1]))
+
+        context['undetermined_side_game_ids'] = list(context['game_ids'][np.isnan(sides)])
+
+        game_codes = context['game_codes']
+        side = sides[game_codes]
+        is_first_shooting_team = df['shootingTeamId'].to_numpy() == first_shooting_teams[game_codes]
+        is_period_odd = df['periodNumber'].to_numpy() % 2 == 1
+
+        # The first shooting team keeps its side in odd periods, the other team has the other side, and they switch every period
+        shooting_team_side = pd.Series(np.where(is_first_shooting_team == is_period_odd, side, 1 - side), index=df.index)
+
+        return shooting_team_side if context['undetermined_side_game_ids'] else shooting_team_side.astype(int)
+
+
+    def __get_net_x(self, df: pd.DataFrame) -> pd.Series:
+        """The net the team shoots on is on the opposite side of the rink from its own net."""
+        shooting_on_net_side = 1 - df['shootingTeamSide']
+        return pd.Series(np.where(shooting_on_net_side == 0, -NET_X, NET_X), index=df.index)
+
+
+    def __compute_shot_distance(self, df: pd.DataFrame, context: dict) -> pd.Series:
+        return self.__calculate_distance(df['xCoord'], df['yCoord'], self.__get_net_x(df), 0)
+
+
+    def __compute_shot_angle(self, df: pd.DataFrame, context: dict) -> pd.Series:
+        return self.__calculate_angle(df['xCoord'], df['yCoord'], self.__get_net_x(df), 0)
+
+
+    def __compute_shot_angle_diff(self, df: pd.DataFrame, context: dict) -> pd.Series:
+        """The angle difference with the previous shot, for rebounds whose previous event has coordinates."""
+        previous_shot_angle = self.__shift_with_previous(df['shotAngle'], context['game_state']['previous_shot_angle'], context)
+        context['state_updates']['previous_shot_angle'] = df['shotAngle'].iloc[-1]
+
+        is_rebound_with_coords = df['rebound'].eq(1) & df['previousEventX'].notna() & df['previousEventY'].notna()
+
+        return (df['shotAngle'] - previous_shot_angle).abs().where(is_rebound_with_coords, 0)
@@ -0,0 +1,438 @@
+from ift6758.data.nhl_game_store import NHLGameStore
+from ift6758.data.shared_constants import FINAL_GAME_STATES, SCHEDULED_GAME_STATES
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+CATALOG_FILE = 'catalog.sqlite'
+
+GAME_STATUS_FETCHED = 'fetched'
+GAME_STATUS_MISSING = 'missing'
+GAME_STATUS_ERROR = 'error'
+
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    season INTEGER NOT NULL,
+    game_type INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    http_status INTEGER,
+    byte_size INTEGER,
+    content_hash TEXT,
+    fetched_at REAL,
+    parsed_hash TEXT,
+    parsed_at REAL,
+    game_state TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    parser_version INTEGER,
+    start_time REAL
+);
+CREATE INDEX IF NOT EXISTS games_season_type_status ON games (season, game_type, status);
+CREATE TABLE IF NOT EXISTS players (
+    player_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS teams (
+    team_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    updated_at REAL
+);
+"""
+
+# Dimension tables of the names of the players and teams of the parsed games, with their ID column
+DIMENSION_TABLES = {'players': 'player_id', 'teams': 'team_id'}
+
+# Columns added after the first version of the catalog, with their types
+CATALOG_ADDED_COLUMNS = {
+    'game_state': 'TEXT',
+    'etag': 'TEXT',
+    'last_modified': 'TEXT',
+    'parser_version': 'INTEGER',
+    'start_time': 'REAL'
+}
+
+# Scheduled games whose start time is unknown are requested again after this many seconds
+SCHEDULED_GAME_TTL = 3600
+
+class NHLGameCatalog:
+    def __init__(self, store: NHLGameStore = None):
+        """
+        Initialize the catalog of raw games stored in a SQLite database under NHL_DATA_PATH.
+        The game files present in NHL_DATA_PATH that the catalog doesn't know yet are registered (see sync_with_local_files).
+
+        Args:
+            store (NHLGameStore, optional): Store of the raw game files. Defaults to a new store.
+        """
+        self.local_data_path = os.getenv('NHL_DATA_PATH')
+        os.makedirs(self.local_data_path, exist_ok=True)
+
+        self.store = store or NHLGameStore()
+
+        catalog_path = os.path.join(self.local_data_path, CATALOG_FILE)
+
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(catalog_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+
+        with self.lock, self.connection:
+            self.connection.executescript(CATALOG_SCHEMA)
+
+            columns = {row['name'] for row in self.connection.execute("PRAGMA table_info(games)")}
+            for column, column_type in CATALOG_ADDED_COLUMNS.items():
+                if column not in columns:
+                    self.connection.execute(f"ALTER TABLE games ADD COLUMN {column} {column_type}")
+
+        # Game files copied into NHL_DATA_PATH since the last run are registered, so they aren't fetched again
+        self.sync_with_local_files()
+
+
+    def __split_game_id(self, game_id: str) -> tuple:
+        """Gets the season and game type encoded in a game ID.
+
+        Args:
+            game_id (str): Game ID to split.
+
+        Returns:
+            tuple: Season year and game type (season: int, game type: int)
+        """
+        return int(game_id[:4]), int(game_id[4:6])
+
+
+    def sync_with_local_files(self):
+        """Registers every game of NHL_DATA_PATH (loose file or season archive) that isn't in the catalog yet.
+        Useful when the catalog is created over an existing dataset or when game files are copied in by hand.
+        Known games only cost a directory listing and a single query, each new file is read once to compute the hash
+        of its uncompressed content.
+        """
+        known_game_ids = self.get_game_ids()
+        rows = []
+
+        for game_id, byte_size in self.store.list_games():
+            if game_id in known_game_ids:
+                continue
+
+            known_game_ids.add(game_id)
+            season, game_type = self.__split_game_id(game_id)
+            content = self.store.read_game_bytes(game_id)
+            content_hash = hashlib.sha256(content).hexdigest()
+            game_state = self.store.extract_game_state(content)
+            start_time = self.store.extract_start_time(content)
+
+            rows.append((game_id, season, game_type, GAME_STATUS_FETCHED, None, byte_size, content_hash, time.time(),
+                         game_state, start_time))
+
+        with self.lock, self.connection:
+            self.connection.executemany(
+                """INSERT OR IGNORE INTO games
+                   (game_id, season, game_type, status, http_status, byte_size, content_hash, fetched_at, game_state,
+                    start_time)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                rows
+            )
+
+
+    def record_fetch(
+            self,
+            game_id: str,
+            status: str,
+            http_status: int = None,
+            byte_size: int = None,
+            content_hash: str = None,
+            game_state: str = None,
+            etag: str = None,
+            last_modified: str = None,
+            start_time: float = None
+        ):
+        """Records the result of fetching a game from the API.
+
+        Args:
+            game_id (str): Game ID that was fetched.
+            status (str): Status of the game: 'fetched', 'missing' or 'error'.
+            http_status (int, optional): HTTP status code returned by the API. Defaults to None.
+            byte_size (int, optional): Size of the stored (compressed) game file in bytes. Defaults to None.
+            content_hash (str, optional): Hash of the game's uncompressed content. Defaults to None.
+            game_state (str, optional): State of the game in the payload (e.g. 'LIVE', 'OFF'). Defaults to None.
+            etag (str, optional): ETag header of the response, used for conditional requests. Defaults to None.
+            last_modified (str, optional): Last-Modified header of the response, used for conditional requests. Defaults to None.
+            start_time (float, optional): Timestamp of the scheduled start of the game. Defaults to None.
+        """
+        season, game_type = self.__split_game_id(game_id)
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                """INSERT INTO games
+                   (game_id, season, game_type, status, http_status, byte_size, content_hash, fetched_at,
+                    game_state, etag, last_modified, start_time)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (game_id) DO UPDATE SET
+                       status = excluded.status,
+                       http_status = excluded.http_status,
+                       byte_size = excluded.byte_size,
+                       content_hash = excluded.content_hash,
+                       fetched_at = excluded.fetched_at,
+                       game_state = excluded.game_state,
+                       etag = excluded.etag,
+                       last_modified = excluded.last_modified,
+                       start_time = excluded.start_time""",
+                (game_id, season, game_type, status, http_status, byte_size, content_hash, time.time(),
+                 game_state, etag, last_modified, start_time)
+            )
+
+
+    def record_not_modified(self, game_id: str):
+        """Records that a conditional request confirmed the stored game is still up to date (HTTP 304).
+        The fetch time is refreshed so the game is considered fresh again.
+
+        Args:
+            game_id (str): Game ID that was checked.
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE games SET http_status = 304, fetched_at = ? WHERE game_id = ?",
+                (time.time(), game_id)
+            )
+
+
+    def is_game_up_to_date(self, game: dict, live_game_ttl: float) -> bool:
+        """Checks if a catalog entry doesn't need to be requested again.
+        Missing games and final games are immutable, live games are up to date for live_game_ttl seconds.
+        Scheduled games can't change before they start, so they are up to date until their start time
+        (or for SCHEDULED_GAME_TTL seconds when it is unknown). Games with an unknown state are considered immutable.
+
+        Args:
+            game (dict): Catalog entry of the game.
+            live_game_ttl (float): Number of seconds a live game stays fresh after being fetched.
+
+        Returns:
+            bool: True if the game doesn't need to be requested again.
+        """
+        if game['status'] == GAME_STATUS_MISSING:
+            return True
+
+        if game['status'] != GAME_STATUS_FETCHED:
+            return False
+
+        if game['game_state'] is None or game['game_state'] in FINAL_GAME_STATES:
+            return True
+
+        now = time.time()
+
+        if game['game_state'] in SCHEDULED_GAME_STATES:
+            if game['start_time'] is not None:
+                return now < game['start_time'] or now - game['fetched_at'] < live_game_ttl
+            return now - game['fetched_at'] < SCHEDULED_GAME_TTL
+
+        return now - game['fetched_at'] < live_game_ttl
+
+
+    def get_up_to_date_game_ids(self, live_game_ttl: float) -> set:
+        """Gets the IDs of the games that don't need to be requested again (see is_game_up_to_date).
+
+        Args:
+            live_game_ttl (float): Number of seconds a live game stays fresh after being fetched.
+
+        Returns:
+            set: Game IDs that don't need to be requested again.
+        """
+        now = time.time()
+        final_states = ', '.join('?' for _ in FINAL_GAME_STATES)
+        scheduled_states = ', '.join('?' for _ in SCHEDULED_GAME_STATES)
+        query = f"""SELECT game_id FROM games
+                    WHERE status = ?
+                       OR (status = ? AND (game_state IS NULL OR game_state IN ({final_states}) OR fetched_at >= ?
+                           OR (game_state IN ({scheduled_states})
+                               AND (start_time > ? OR (start_time IS NULL AND fetched_at >= ?)))))"""
+
+        with self.lock:
+            rows = self.connection.execute(
+                query,
+                [GAME_STATUS_MISSING, GAME_STATUS_FETCHED, *FINAL_GAME_STATES, now - live_game_ttl,
+                 *SCHEDULED_GAME_STATES, now, now - SCHEDULED_GAME_TTL]
+            ).fetchall()
+
+        return {row['game_id'] for row in rows}
+
+
+    def record_byte_sizes(self, byte_sizes: dict):
+        """Records the new size of game files that were rewritten or packed without being fetched again.
+
+        Args:
+            byte_sizes (dict): Size of the stored (compressed) game data in bytes by game ID.
+        """
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "UPDATE games SET byte_size = ? WHERE game_id = ?",
+                [(byte_size, game_id) for game_id, byte_size in byte_sizes.items()]
+            )
+
+
+    def record_parsed(self, game_ids: list, parser_version: int = None):
+        """Marks the current content of games as parsed, so they aren't reported as changed anymore.
+
+        Args:
+            game_ids (list): Game IDs that were parsed.
+            parser_version (int, optional): Version of the parser that parsed the games. Defaults to None.
+        """
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "UPDATE games SET parsed_hash = COALESCE(content_hash, ''), parsed_at = ?, parser_version = ? WHERE game_id = ?",
+                [(time.time(), parser_version, game_id) for game_id in game_ids]
+            )
+
+
+    def record_names(self, table: str, names: dict):
+        """Records the names of players or teams in a dimension table, replacing the names that changed.
+        A player or team has a single name whatever the season: the name recorded last wins, so a team renamed under
+        the same ID is shown with the name of the last parsed game in every season, older seasons included.
+
+        Args:
+            table (str): Dimension table: players or teams (see DIMENSION_TABLES).
+            names (dict): Name by player or team ID.
+        """
+        id_column = DIMENSION_TABLES[table]
+
+        with self.lock, self.connection:
+            self.connection.executemany(
+                f"INSERT INTO {table} ({id_column}, name, updated_at) VALUES (?, ?, ?) "
+                f"ON CONFLICT({id_column}) DO UPDATE SET name = excluded.name, updated_at = excluded.updated_at "
+                f"WHERE name != excluded.name",
+                [(int(id), name, time.time()) for id, name in names.items()]
+            )
+
+
+    def get_names(self, table: str) -> dict:
+        """Gets the names of a dimension table.
+
+        Args:
+            table (str): Dimension table: players or teams (see DIMENSION_TABLES).
+
+        Returns:
+            dict: Name by player or team ID.
+        """
+        with self.lock:
+            rows = self.connection.execute(f"SELECT {DIMENSION_TABLES[table]} AS id, name FROM {table}").fetchall()
+
+        return {row['id']: row['name'] for row in rows}
+
+
+    def get_last_parsed_at(self, season: int, game_type: int = None) -> float:
+        """Gets when a game of a season was parsed for the last time.
+
+        Args:
+            season (int): Season year.
+            game_type (int, optional): Game type: regular season (2) or playoffs (3). Defaults to None (all types).
+
+        Returns:
+            float: Timestamp of the last parse, None if no game of the season was parsed.
+        """
+        query = "SELECT MAX(parsed_at) AS parsed_at FROM games WHERE season = ?"
+        params = [season]
+
+        if game_type is not None:
+            query += " AND game_type = ?"
+            params.append(game_type)
+
+        with self.lock:
+            row = self.connection.execute(query, params).fetchone()
+
+        return row['parsed_at']
+
+
+    def get_last_fetched_at(self, season: int, game_type: int = None) -> float:
+        """Gets when a game of a season was fetched for the last time.
+
+        Args:
+            season (int): Season year.
+            game_type (int, optional): Game type: regular season (2) or playoffs (3). Defaults to None (all types).
+
+        Returns:
+            float: Timestamp of the last fetch, None if no game of the season was fetched.
+        """
+        query = "SELECT MAX(fetched_at) AS fetched_at FROM games WHERE season = ? AND status = ?"
+        params = [season, GAME_STATUS_FETCHED]
+
+        if game_type is not None:
+            query += " AND game_type = ?"
+            params.append(game_type)
+
+        with self.lock:
+            row = self.connection.execute(query, params).fetchone()
+
+        return row['fetched_at']
+
+
+    def get_game(self, game_id: str) -> dict:
+        """Gets the catalog entry of a game.
+
+        Args:
+            game_id (str): Game ID to get the entry for.
+
+        Returns:
+            dict: Catalog entry of the game, None if the game isn't in the catalog.
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT * FROM games WHERE game_id = ?", (game_id,)).fetchone()
+
+        return dict(row) if row is not None else None
+
+
+    def get_game_ids(self, season: int = None, game_type: int = None, status: str = None) -> set:
+        """Gets the IDs of the games in the catalog, optionally filtered by season, game type and status.
+
+        Args:
+            season (int, optional): Season year. Defaults to None (all seasons).
+            game_type (int, optional): Game type: regular season (2) or playoffs (3). Defaults to None (all types).
+            status (str, optional): Status of the games: 'fetched', 'missing' or 'error'. Defaults to None (all statuses).
+
+        Returns:
+            set: Game IDs matching the filters.
+        """
+        query = "SELECT game_id FROM games WHERE 1 = 1"
+        params = []
+
+        for column, value in (('season', season), ('game_type', game_type), ('status', status)):
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(value)
+
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+
+        return {row['game_id'] for row in rows}
+
+
+    def get_changed_game_ids(self, season: int = None, game_type: int = None, parser_version: int = None) -> set:
+        """Gets the IDs of the fetched games whose content changed (or that were never parsed) since the last parse.
+        When a parser version is given, the games parsed by another version of the parser are included too.
+
+        Args:
+            season (int, optional): Season year. Defaults to None (all seasons).
+            game_type (int, optional): Game type: regular season (2) or playoffs (3). Defaults to None (all types).
+            parser_version (int, optional): Current version of the parser. Defaults to None (any version).
+
+        Returns:
+            set: Game IDs that need to be parsed again.
+        """
+        query = """SELECT game_id FROM games
+                   WHERE status = ? AND (parsed_hash IS NULL OR parsed_hash != COALESCE(content_hash, '')"""
+        params = [GAME_STATUS_FETCHED]
+
+        if parser_version is not None:
+            query += " OR parser_version IS NOT ?"
+            params.append(parser_version)
+
+        query += ")"
+
+        for column, value in (('season', season), ('game_type', game_type)):
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(value)
+
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+
+        return {row['game_id'] for row in rows}
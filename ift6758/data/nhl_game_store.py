@@ -0,0 +1,517 @@
+from datetime import datetime
+import gzip
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CODEC_ZSTD = 'zstd'
+CODEC_GZIP = 'gzip'
+CODEC_JSON = 'json'
+
+CODEC_EXTENSIONS = {
+    CODEC_ZSTD: '.json.zst',
+    CODEC_GZIP: '.json.gz',
+    CODEC_JSON: '.json'
+}
+
+ZSTD_LEVEL = 9
+GZIP_LEVEL = 6
+
+DICTIONARY_FILE = 'raw_games.dict'
+DICTIONARY_SIZE = 112640
+
+GAME_FILE_PATTERN = re.compile(r'^game_(\d{10})\.json(\.gz|\.zst)?$')
+EXTENSION_CODECS = {None: CODEC_JSON, '.gz': CODEC_GZIP, '.zst': CODEC_ZSTD}
+
+GAME_STATE_PATTERN = re.compile(rb'"gameState"\s*:\s*"([A-Z]+)"')
+START_TIME_PATTERN = re.compile(rb'"startTimeUTC"\s*:\s*"([^"]+)"')
+
+PACK_MAGIC = b'NHLPACK1'
+PACK_FOOTER = struct.Struct('<Q8s')
+
+class NHLGameStore:
+    def __init__(self, codec: str = None, local_data_path: str = None):
+        """
+        Initialize the store of raw game files under NHL_DATA_PATH.
+        New games are written with zstd when the zstandard package is installed, with gzip otherwise.
+        Reads are transparent: uncompressed, gzip and zstd game files can all be read back, as well as games packed
+        into per-season archives.
+
+        A season archive (season_{year}.pack) holds every game payload of the season back to back, followed by a
+        JSON index of the games' offsets, lengths and codecs, then a footer with the index offset and a magic number.
+        Archives are read through a memory map, so reading a game doesn't open any file once the archive is loaded.
+
+        Args:
+            codec (str, optional): Codec used to write new games: 'zstd', 'gzip' or 'json'. Defaults to the best available.
+            local_data_path (str, optional): Directory of the game files. Defaults to NHL_DATA_PATH.
+        """
+        if codec is None:
+            codec = CODEC_ZSTD if zstandard is not None else CODEC_GZIP
+
+        if codec == CODEC_ZSTD and zstandard is None:
+            raise ValueError("The zstd codec requires the zstandard package.")
+
+        self.codec = codec
+        self.local_data_path = local_data_path or os.getenv('NHL_DATA_PATH')
+        os.makedirs(self.local_data_path, exist_ok=True)
+
+        self.dictionary_path = os.path.join(self.local_data_path, DICTIONARY_FILE)
+        self.dictionary = self.__load_dictionary()
+
+        self.packs_lock = threading.RLock()
+        self.packs = {}
+        self.loose_game_ids = None
+
+
+    def __load_dictionary(self):
+        """Loads the trained zstd dictionary if there is one.
+
+        Returns:
+            zstandard.ZstdCompressionDict: The trained dictionary, None if there isn't one or if zstd isn't available.
+        """
+        if zstandard is None or not os.path.exists(self.dictionary_path):
+            return None
+
+        with open(self.dictionary_path, 'rb') as f:
+            return zstandard.ZstdCompressionDict(f.read())
+
+
+    def get_game_path(self, game_id: str, codec: str = None) -> str:
+        """Gets the local path of a game file for a codec.
+
+        Args:
+            game_id (str): Game ID to get the local path for.
+            codec (str, optional): Codec of the game file. Defaults to the store's codec.
+
+        Returns:
+            str: Local path of the game's data file.
+        """
+        return os.path.join(self.local_data_path, f'game_{game_id}{CODEC_EXTENSIONS[codec or self.codec]}')
+
+
+    def list_game_files(self):
+        """Lists the game files stored in NHL_DATA_PATH, whatever their codec.
+
+        Yields:
+            tuple: Game ID and directory entry of each game file (game ID: str, entry: os.DirEntry)
+        """
+        for entry in os.scandir(self.local_data_path):
+            match = GAME_FILE_PATTERN.match(entry.name)
+
+            if match is not None:
+                yield match.group(1), entry
+
+
+    def list_games(self):
+        """Lists every game stored in NHL_DATA_PATH, as a loose file or in a season archive.
+
+        Yields:
+            tuple: Game ID and stored size in bytes of each game (game ID: str, byte size: int)
+        """
+        listed_game_ids = set()
+
+        for game_id, entry in self.list_game_files():
+            listed_game_ids.add(game_id)
+            yield game_id, entry.stat().st_size
+
+        for season in self.list_packed_seasons():
+            for game_id, (offset, length, codec) in self.__get_pack(season)['index'].items():
+                if game_id not in listed_game_ids:
+                    yield game_id, length
+
+
+    def extract_game_state(self, content: bytes) -> str:
+        """Extracts the state of a game (e.g. 'LIVE', 'FINAL', 'OFF') from its raw payload without decoding the JSON.
+
+        Args:
+            content (bytes): Raw JSON payload of the game.
+
+        Returns:
+            str: State of the game, None if the payload doesn't contain one.
+        """
+        match = GAME_STATE_PATTERN.search(content)
+        return match.group(1).decode('ascii') if match is not None else None
+
+
+    def extract_start_time(self, content: bytes) -> float:
+        """Extracts the scheduled start time of a game (startTimeUTC) from its raw payload without decoding the JSON.
+
+        Args:
+            content (bytes): Raw JSON payload of the game.
+
+        Returns:
+            float: Timestamp of the start of the game, None if the payload doesn't contain a valid one.
+        """
+        match = START_TIME_PATTERN.search(content)
+
+        if match is None:
+            return None
+
+        try:
+            return datetime.fromisoformat(match.group(1).decode('ascii').replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+
+
+    def compress(self, content: bytes, codec: str = None) -> bytes:
+        """Compresses a raw game payload.
+
+        Args:
+            content (bytes): Raw JSON payload of the game.
+            codec (str, optional): Codec to compress with. Defaults to the store's codec.
+
+        Returns:
+            bytes: Compressed payload.
+        """
+        codec = codec or self.codec
+
+        if codec == CODEC_ZSTD:
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=self.dictionary).compress(content)
+        elif codec == CODEC_GZIP:
+            return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+
+        return content
+
+
+    def decompress(self, data: bytes, codec: str) -> bytes:
+        """Decompresses a stored game payload.
+
+        Args:
+            data (bytes): Stored payload.
+            codec (str): Codec the payload was compressed with.
+
+        Returns:
+            bytes: Raw JSON payload of the game.
+        """
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise ValueError("Reading zstd game files requires the zstandard package.")
+            return zstandard.ZstdDecompressor(dict_data=self.dictionary).decompress(data)
+        elif codec == CODEC_GZIP:
+            return gzip.decompress(data)
+
+        return data
+
+
+    def write_game(self, game_id: str, content: bytes) -> int:
+        """Compresses and writes the raw payload of a game. Copies of the game stored with another codec are removed.
+
+        Args:
+            game_id (str): Game ID of the payload.
+            content (bytes): Raw JSON payload of the game.
+
+        Returns:
+            int: Size of the written file in bytes.
+        """
+        data = self.compress(content)
+
+        game_path = self.get_game_path(game_id)
+        temp_path = game_path + '.tmp'
+
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+
+        os.replace(temp_path, game_path)
+
+        for codec in CODEC_EXTENSIONS:
+            if codec != self.codec and os.path.exists(self.get_game_path(game_id, codec)):
+                os.remove(self.get_game_path(game_id, codec))
+
+        with self.packs_lock:
+            if self.loose_game_ids is not None:
+                self.loose_game_ids[game_id] = self.codec
+
+        return len(data)
+
+
+    def read_game_bytes(self, game_id: str) -> bytes:
+        """Reads the raw JSON payload of a game, whatever the codec it is stored with.
+        A loose game file takes precedence over the season archive since it is more recent.
+        Otherwise, when the game is in its season's archive, it is read from the memory map without opening any file.
+        For other games, the store's codec is tried first so the common case only opens one file. Games written or
+        packed by another store after this one listed its files are found too.
+
+        Args:
+            game_id (str): Game ID to read.
+
+        Returns:
+            bytes: Raw JSON payload of the game.
+
+        Raises:
+            FileNotFoundError: If the game isn't stored locally.
+        """
+        pack = self.__get_pack(int(game_id[:4]))
+        codecs = [self.codec] + [codec for codec in CODEC_EXTENSIONS if codec != self.codec]
+
+        if pack is not None:
+            loose_codec = self.__get_loose_game_ids().get(game_id)
+
+            if loose_codec is None and game_id in pack['index']:
+                return self.__read_packed_game(pack, game_id)
+
+            # Another store (another fetcher or a worker process) may have written the game since the loose files
+            # were listed, so every codec is probed when the listing misses
+            if loose_codec is not None:
+                codecs = [loose_codec] + [codec for codec in codecs if codec != loose_codec]
+
+        for codec in codecs:
+            try:
+                with open(self.get_game_path(game_id, codec), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+
+            if pack is not None:
+                with self.packs_lock:
+                    self.loose_game_ids[game_id] = codec
+
+            return self.decompress(data, codec)
+
+        # The loose file may have been packed by another store since it was listed
+        if pack is not None and game_id in pack['index']:
+            return self.__read_packed_game(pack, game_id)
+
+        raise FileNotFoundError(f"Game data file for game_id {game_id} not found.")
+
+
+    def __read_packed_game(self, pack: dict, game_id: str) -> bytes:
+        """Reads the raw JSON payload of a game from its season archive.
+
+        Args:
+            pack (dict): Season archive (see __get_pack).
+            game_id (str): Game ID to read, in the archive's index.
+
+        Returns:
+            bytes: Raw JSON payload of the game.
+        """
+        offset, length, codec = pack['index'][game_id]
+        return self.decompress(pack['mmap'][offset:offset + length], codec)
+
+
+    def decode_game(self, content: bytes) -> dict:
+        """Decodes the raw JSON payload of a game, with orjson when it is installed.
+
+        Args:
+            content (bytes): Raw JSON payload.
+
+        Returns:
+            dict: Raw game data.
+        """
+        if orjson is not None:
+            return orjson.loads(content)
+
+        return json.loads(content)
+
+
+    def read_game(self, game_id: str) -> dict:
+        """Reads and decodes the raw JSON data of a game.
+
+        Args:
+            game_id (str): Game ID to read.
+
+        Returns:
+            dict: Raw game data.
+        """
+        return self.decode_game(self.read_game_bytes(game_id))
+
+
+    def train_dictionary(self, game_ids: list, dictionary_size: int = DICTIONARY_SIZE):
+        """Trains a zstd dictionary on stored games, then uses it to compress new games.
+        Play-by-play payloads share most of their keys and values, so a dictionary noticeably improves the ratio.
+        Only one dictionary can exist since the games compressed with it need it to be read back.
+
+        Args:
+            game_ids (list): Game IDs to use as training samples (a few hundred games is plenty).
+            dictionary_size (int, optional): Maximum size of the dictionary in bytes. Defaults to DICTIONARY_SIZE.
+        """
+        if zstandard is None:
+            raise ValueError("Training a dictionary requires the zstandard package.")
+
+        if self.dictionary is not None:
+            raise ValueError(f"A dictionary already exists at {self.dictionary_path}.")
+
+        samples = [self.read_game_bytes(game_id) for game_id in game_ids]
+        dictionary = zstandard.train_dictionary(dictionary_size, samples)
+
+        with open(self.dictionary_path, 'wb') as f:
+            f.write(dictionary.as_bytes())
+
+        self.dictionary = dictionary
+
+
+    def __get_pack_path(self, season: int) -> str:
+        """Gets the local path of a season archive.
+
+        Args:
+            season (int): Season year.
+
+        Returns:
+            str: Local path of the season archive.
+        """
+        return os.path.join(self.local_data_path, f'season_{season}.pack')
+
+
+    def list_packed_seasons(self) -> list:
+        """Lists the seasons that have an archive in NHL_DATA_PATH.
+
+        Returns:
+            list: Season years with an archive.
+        """
+        return sorted(
+            int(name[len('season_'):-len('.pack')])
+            for name in os.listdir(self.local_data_path)
+            if re.match(r'^season_\d{4}\.pack$', name)
+        )
+
+
+    def __get_loose_game_ids(self) -> dict:
+        """Lists the loose game files once with a single directory scan, then keeps the list up to date on writes.
+
+        Returns:
+            dict: Codec of every loose game file by game ID.
+        """
+        with self.packs_lock:
+            if self.loose_game_ids is None:
+                self.loose_game_ids = {
+                    game_id: EXTENSION_CODECS[GAME_FILE_PATTERN.match(entry.name).group(2)]
+                    for game_id, entry in self.list_game_files()
+                }
+
+            return self.loose_game_ids
+
+
+    def __get_pack(self, season: int) -> dict:
+        """Opens a season archive as a memory map and loads its index. Archives stay open for the store's lifetime,
+        and seasons without an archive are checked again on every call.
+
+        Args:
+            season (int): Season year.
+
+        Returns:
+            dict: Memory map ('mmap') and index ('index') of the archive, None if the season has no archive.
+        """
+        with self.packs_lock:
+            if self.packs.get(season) is not None:
+                return self.packs[season]
+
+            # Seasons without an archive are checked again, another store may have packed them since
+            pack_path = self.__get_pack_path(season)
+
+            if not os.path.exists(pack_path):
+                return None
+
+            with open(pack_path, 'rb') as f:
+                pack_mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            index_offset, magic = PACK_FOOTER.unpack(pack_mmap[-PACK_FOOTER.size:])
+
+            if magic != PACK_MAGIC or pack_mmap[:len(PACK_MAGIC)] != PACK_MAGIC:
+                pack_mmap.close()
+                raise ValueError(f"{pack_path} is not a valid season archive.")
+
+            index = json.loads(pack_mmap[index_offset:-PACK_FOOTER.size])
+            self.packs[season] = {'mmap': pack_mmap, 'index': index}
+
+            return self.packs[season]
+
+
+    def __close_pack(self, season: int):
+        """Closes the memory map of a season archive so the archive file can be replaced.
+
+        Args:
+            season (int): Season year.
+        """
+        with self.packs_lock:
+            pack = self.packs.pop(season, None)
+
+            if pack is not None:
+                pack['mmap'].close()
+
+
+    def iter_season_games(self, season: int):
+        """Reads every game of a season archive in one sequential pass over the memory map.
+
+        Args:
+            season (int): Season year.
+
+        Yields:
+            tuple: Game ID and raw JSON payload of each game, in archive order (game ID: str, payload: bytes)
+        """
+        pack = self.__get_pack(season)
+
+        if pack is None:
+            return
+
+        if hasattr(pack['mmap'], 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            pack['mmap'].madvise(mmap.MADV_SEQUENTIAL)
+
+        for game_id, (offset, length, codec) in sorted(pack['index'].items(), key=lambda item: item[1][0]):
+            yield game_id, self.decompress(pack['mmap'][offset:offset + length], codec)
+
+
+    def pack_season(self, season: int) -> dict:
+        """Packs the games of a season into a single archive with an offset index, then removes their loose files.
+        Games already in the archive are kept, and loose files replace their archived version.
+        Uncompressed games are compressed with the store's codec on the way in.
+
+        Args:
+            season (int): Season year.
+
+        Returns:
+            dict: Stored size in bytes of every game in the archive by game ID.
+        """
+        with self.packs_lock:
+            loose_game_ids = self.__get_loose_game_ids()
+            season_loose_game_ids = sorted(game_id for game_id in loose_game_ids if int(game_id[:4]) == season)
+
+            pack = self.__get_pack(season)
+            packed_game_ids = pack['index'].keys() if pack is not None else []
+            game_ids = sorted(set(packed_game_ids) | set(season_loose_game_ids))
+
+            pack_path = self.__get_pack_path(season)
+            temp_path = pack_path + '.tmp'
+            index = {}
+
+            with open(temp_path, 'wb') as f:
+                f.write(PACK_MAGIC)
+
+                for game_id in game_ids:
+                    if game_id in loose_game_ids:
+                        codec = loose_game_ids[game_id]
+
+                        with open(self.get_game_path(game_id, codec), 'rb') as game_file:
+                            data = game_file.read()
+                    else:
+                        offset, length, codec = pack['index'][game_id]
+                        data = pack['mmap'][offset:offset + length]
+
+                    if codec == CODEC_JSON and self.codec != CODEC_JSON:
+                        data, codec = self.compress(data), self.codec
+
+                    index[game_id] = [f.tell(), len(data), codec]
+                    f.write(data)
+
+                index_offset = f.tell()
+                f.write(json.dumps(index).encode('utf-8'))
+                f.write(PACK_FOOTER.pack(index_offset, PACK_MAGIC))
+
+            self.__close_pack(season)
+            os.replace(temp_path, pack_path)
+
+            for game_id in season_loose_game_ids:
+                os.remove(self.get_game_path(game_id, loose_game_ids.pop(game_id)))
+
+        return {game_id: length for game_id, (offset, length, codec) in index.items()}
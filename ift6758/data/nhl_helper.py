@@ -1,10 +1,39 @@
 from ift6758.data.shared_constants import (
     MAX_GAMES_PER_REGULAR_SEASON,
     MATCHUPS_PER_PLAYOFF_ROUND,
-    MAX_GAMES_PER_PLAYOFF_ROUND
+    MAX_GAMES_PER_PLAYOFF_ROUND,
+    REGULAR_SEASON_GAME_TYPE,
+    PLAYOFF_GAME_TYPE
 )
+from ift6758.data.nhl_game_catalog import NHLGameCatalog, GAME_STATUS_MISSING
+from datetime import datetime
+import json
+import numpy as np
+import os
+import pandas as pd
+import requests
+import time
+
+SCHEDULE_API_URL = 'https://api.nhle.com/stats/rest/en/game'
+SCHEDULE_REQUEST_TIMEOUT = 30
+
+# Schedules of unfinished seasons gain games (e.g. the playoffs) and are requested again once older than SCHEDULE_TTL
+# seconds. A schedule fetched after July 1st following its season is final
+SCHEDULE_TTL = 6 * 3600
+SEASON_END_MONTH = 7
+
+# Game IDs are SSSSTTNNNN: season year, game type and game number. The game number of a playoff game is 0RMG:
+# round, matchup and game of the matchup
+GAME_ID_SEASON_FACTOR = 1000000
+GAME_ID_GAME_TYPE_FACTOR = 10000
 
 class NHLHelper:
+    def __init__(self, catalog: NHLGameCatalog = None):
+        self.local_data_path = os.getenv('NHL_DATA_PATH')
+        self.catalog = catalog or NHLGameCatalog()
+        self.schedules = {}
+
+
     def get_game_ids_for_season(self, season: str, for_regular_season: bool) -> list:
         """Generates a list of game IDs for a season in the NHL
 
@@ -15,25 +44,190 @@ class NHLHelper:
         Returns:
             list: List of all the game IDs for a regular season or playoff season
         """
-        game_ids = []
-
         if for_regular_season:
-            for game_number in range(1, MAX_GAMES_PER_REGULAR_SEASON):
-                game_ids.append(self.construct_regular_season_game_id(season, game_number))
+            game_numbers = np.arange(1, MAX_GAMES_PER_REGULAR_SEASON)
+            game_type = REGULAR_SEASON_GAME_TYPE
         else:
-            for round_num in range(0, 4):
-                matchups = MATCHUPS_PER_PLAYOFF_ROUND[round_num]
-                for match_num in range(1, matchups + 1):
-                    for game_num in range(1, MAX_GAMES_PER_PLAYOFF_ROUND + 1):
-                        game_ids.append(self.construct_playoff_season_game_id(
-                            season,
-                            round=round_num+1,
-                            matchup=match_num,
-                            game=game_num
-                        ))
-
-        return game_ids
-    
+            rounds = np.repeat(np.arange(1, 5), MATCHUPS_PER_PLAYOFF_ROUND)
+            matchups = np.concatenate([np.arange(1, matchups + 1) for matchups in MATCHUPS_PER_PLAYOFF_ROUND])
+            games = np.arange(1, MAX_GAMES_PER_PLAYOFF_ROUND + 1)
+            game_numbers = (100 * rounds[:, None] + 10 * matchups[:, None] + games).ravel()
+            game_type = PLAYOFF_GAME_TYPE
+
+        return self.format_game_ids(self.construct_game_ids(season, game_type, game_numbers)).tolist()
+
+
+    def discover_game_ids_for_season(self, season: str, for_regular_season: bool) -> list:
+        """Lists the game IDs that actually exist for a season in the NHL.
+        The season's schedule is used when it is available, otherwise every candidate game ID is generated.
+        In both cases, the game IDs that the catalog knows are missing from the API are skipped.
+
+        Args:
+            season (str): Season year
+            for_regular_season (bool): Regular season: True or playoff season: False
+
+        Returns:
+            list: List of the existing game IDs for a regular season or playoff season
+        """
+        game_type = REGULAR_SEASON_GAME_TYPE if for_regular_season else PLAYOFF_GAME_TYPE
+        schedule = self.get_season_schedule(season)
+
+        if schedule is not None:
+            game_ids = sorted(str(game['id']) for game in schedule if game.get('gameType') == game_type)
+        else:
+            game_ids = self.get_game_ids_for_season(season, for_regular_season)
+
+        missing_game_ids = self.catalog.get_game_ids(int(season), game_type, GAME_STATUS_MISSING)
+
+        return [game_id for game_id in game_ids if game_id not in missing_game_ids]
+
+
+    def __get_schedule_local_path(self, season: str) -> str:
+        """Gets the local path of a season's schedule.
+
+        Args:
+            season (str): Season year
+
+        Returns:
+            str: Local path of the season's schedule file.
+        """
+        return os.path.join(self.local_data_path, f'schedule_{season}.json')
+
+
+    def __is_schedule_up_to_date(self, season: str, fetched_at: float) -> bool:
+        """Checks if a schedule fetched at some time can still be used. Schedules of finished seasons never change,
+        the schedule of an unfinished season is up to date for SCHEDULE_TTL seconds.
+
+        Args:
+            season (str): Season year
+            fetched_at (float): Timestamp of when the schedule was fetched.
+
+        Returns:
+            bool: True if the schedule doesn't need to be requested again.
+        """
+        season_end = datetime(int(season) + 1, SEASON_END_MONTH, 1).timestamp()
+        return fetched_at >= season_end or time.time() - fetched_at < SCHEDULE_TTL
+
+
+    def get_season_schedule(self, season: str) -> list:
+        """Gets the list of games scheduled for a season.
+        A local schedule file (schedule_{season}.json in NHL_DATA_PATH) is used as a stand-in for the API when it is up
+        to date (see __is_schedule_up_to_date), otherwise the schedule is requested from the stats API and stored locally.
+        When the API can't be reached, an outdated local schedule is used rather than none.
+
+        Args:
+            season (str): Season year
+
+        Returns:
+            list: Games of the season (each containing at least 'id' and 'gameType'), None if the schedule is unavailable.
+        """
+        if int(season) in self.schedules:
+            fetched_at, games = self.schedules[int(season)]
+
+            if self.__is_schedule_up_to_date(season, fetched_at):
+                return games
+
+        schedule_path = self.__get_schedule_local_path(season)
+        local_games = None
+
+        if os.path.exists(schedule_path):
+            fetched_at = os.path.getmtime(schedule_path)
+
+            with open(schedule_path, 'r') as f:
+                local_games = json.load(f).get('data', [])
+
+            if self.__is_schedule_up_to_date(season, fetched_at):
+                self.schedules[int(season)] = (fetched_at, local_games)
+                return local_games
+
+        try:
+            response = requests.get(
+                SCHEDULE_API_URL,
+                params={'cayenneExp': f'season={season}{int(season) + 1}'},
+                timeout=SCHEDULE_REQUEST_TIMEOUT
+            )
+        except requests.exceptions.RequestException:
+            return local_games
+
+        schedule_data = response.json() if response.status_code == 200 else {}
+
+        if not schedule_data.get('data'):
+            return local_games
+
+        # Written to a temporary file first, so a partial schedule is never read
+        with open(f'{schedule_path}.tmp', 'w') as f:
+            json.dump(schedule_data, f)
+        os.replace(f'{schedule_path}.tmp', schedule_path)
+
+        self.schedules[int(season)] = (time.time(), schedule_data['data'])
+
+        return self.schedules[int(season)][1]
+
+
+    def construct_game_ids(self, seasons, game_types, game_numbers) -> np.ndarray:
+        """Generates encoded game IDs (see encode_game_ids) for whole arrays of seasons, game types and game numbers at once.
+
+        Args:
+            seasons (array-like or int): Season years
+            game_types (array-like or int): Game types: regular season (2) or playoffs (3)
+            game_numbers (array-like or int): Game numbers (0RMG for playoff games: round, matchup and game)
+
+        Returns:
+            np.ndarray: Game IDs as int64
+        """
+        return np.asarray(seasons, dtype=np.int64) * GAME_ID_SEASON_FACTOR + \
+            np.asarray(game_types, dtype=np.int64) * GAME_ID_GAME_TYPE_FACTOR + np.asarray(game_numbers, dtype=np.int64)
+
+
+    def encode_game_ids(self, game_ids) -> np.ndarray:
+        """Encodes game IDs as int64, from which their season, game type and game number are decoded with arithmetic
+        over whole arrays instead of string slicing on each game ID.
+
+        Args:
+            game_ids (array-like): Game IDs, as strings or integers
+
+        Returns:
+            np.ndarray: Game IDs as int64
+        """
+        game_ids = game_ids.to_numpy() if isinstance(game_ids, pd.Series) else np.asarray(game_ids)
+        return game_ids.astype(np.int64, copy=False)
+
+
+    def format_game_ids(self, game_ids) -> np.ndarray:
+        """Formats encoded game IDs back to the game ID strings of the NHL API.
+
+        Args:
+            game_ids (array-like): Game IDs as integers
+
+        Returns:
+            np.ndarray: Game IDs as strings
+        """
+        return self.encode_game_ids(game_ids).astype(str).astype(object)
+
+
+    def decode_game_ids(self, game_ids) -> pd.DataFrame:
+        """Decodes the season, game type, playoff round, playoff matchup and game number of whole arrays of game IDs at once.
+        The round and matchup of regular season games are 0, and their game number is the game of the season.
+
+        Args:
+            game_ids (array-like): Game IDs, as strings or integers
+
+        Returns:
+            pd.DataFrame: One row per game ID, with season, gameType, round, matchup and gameNumber columns
+        """
+        game_ids = self.encode_game_ids(game_ids)
+        game_types = game_ids // GAME_ID_GAME_TYPE_FACTOR % 100
+        game_numbers = game_ids % GAME_ID_GAME_TYPE_FACTOR
+        is_playoff = game_types == PLAYOFF_GAME_TYPE
+
+        return pd.DataFrame({
+            'season': game_ids // GAME_ID_SEASON_FACTOR,
+            'gameType': game_types,
+            'round': np.where(is_playoff, game_numbers // 100 % 10, 0),
+            'matchup': np.where(is_playoff, game_numbers // 10 % 10, 0),
+            'gameNumber': np.where(is_playoff, game_numbers % 10, game_numbers)
+        })
+
 
     def construct_regular_season_game_id(self, season: str, game: int) -> str:
         """Generates game ID string for a regular season NHL game
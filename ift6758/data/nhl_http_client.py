@@ -0,0 +1,264 @@
+from requests.adapters import HTTPAdapter
+import random
+import requests
+import threading
+import time
+
+DEFAULT_REQUESTS_PER_SECOND = 20
+DEFAULT_BURST = 20
+
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+
+RETRYABLE_STATUS_CODES = [429, 500, 502, 503, 504]
+
+LATENCY_PERCENTILES = [50, 90, 99]
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        """
+        Initialize a token bucket that allows `rate` acquisitions per second on average,
+        with bursts of up to `capacity` acquisitions.
+
+        Args:
+            rate (float): Number of tokens added to the bucket per second.
+            capacity (int): Maximum number of tokens in the bucket.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+
+    def acquire(self):
+        """Takes one token from the bucket, waiting until one is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait_time = (1 - self.tokens) / self.rate
+
+            time.sleep(wait_time)
+
+
+class FetchMetrics:
+    def __init__(self):
+        """
+        Initialize the counters of the requests made by the HTTP client, grouped by label (e.g. season).
+        """
+        self.lock = threading.Lock()
+        self.counters = {}
+
+
+    def __get_counters(self, label: str) -> dict:
+        """Gets the counters of a label, creating them if needed. Must be called while holding the lock.
+
+        Args:
+            label (str): Label of the requests (e.g. season).
+
+        Returns:
+            dict: Counters of the label.
+        """
+        if label not in self.counters:
+            self.counters[label] = {'requests': 0, 'bytes': 0, 'retries': 0, 'failures': 0, 'latencies': [], 'status_codes': {}}
+
+        return self.counters[label]
+
+
+    def record_request(self, label: str, latency: float, byte_count: int, status_code: int):
+        """Records a completed HTTP request.
+
+        Args:
+            label (str): Label of the request (e.g. season).
+            latency (float): Duration of the request in seconds.
+            byte_count (int): Size of the response body in bytes.
+            status_code (int): HTTP status code of the response.
+        """
+        with self.lock:
+            counters = self.__get_counters(label)
+            counters['requests'] += 1
+            counters['bytes'] += byte_count
+            counters['latencies'].append(latency)
+            counters['status_codes'][status_code] = counters['status_codes'].get(status_code, 0) + 1
+
+
+    def record_retry(self, label: str):
+        """Records that a request is being retried.
+
+        Args:
+            label (str): Label of the request (e.g. season).
+        """
+        with self.lock:
+            self.__get_counters(label)['retries'] += 1
+
+
+    def record_failure(self, label: str):
+        """Records a request that failed even after its retries.
+
+        Args:
+            label (str): Label of the request (e.g. season).
+        """
+        with self.lock:
+            self.__get_counters(label)['failures'] += 1
+
+
+    def __percentile(self, sorted_values: list, percentile: float) -> float:
+        """Computes a percentile with the nearest-rank method.
+
+        Args:
+            sorted_values (list): Sorted values.
+            percentile (float): Percentile to compute, between 0 and 100.
+
+        Returns:
+            float: Value at the percentile, None if there are no values.
+        """
+        if not sorted_values:
+            return None
+
+        rank = max(0, int(round(percentile / 100 * len(sorted_values))) - 1)
+        return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+    def report(self) -> dict:
+        """Summarizes the counters of every label.
+
+        Returns:
+            dict: For each label: requests, bytes, retries, failures, status codes and latency percentiles (s).
+        """
+        report = {}
+
+        with self.lock:
+            for label, counters in self.counters.items():
+                latencies = sorted(counters['latencies'])
+                report[label] = {
+                    'requests': counters['requests'],
+                    'bytes': counters['bytes'],
+                    'retries': counters['retries'],
+                    'failures': counters['failures'],
+                    'status_codes': dict(counters['status_codes']),
+                    **{f'latency_p{p}': self.__percentile(latencies, p) for p in LATENCY_PERCENTILES}
+                }
+
+        return report
+
+
+    def reset(self):
+        """Clears every counter."""
+        with self.lock:
+            self.counters = {}
+
+
+class NHLHttpClient:
+    def __init__(
+            self,
+            workers: int = 1,
+            requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+            burst: int = DEFAULT_BURST,
+            timeout: tuple = (CONNECT_TIMEOUT, READ_TIMEOUT),
+            max_retries: int = MAX_RETRIES
+        ):
+        """
+        Initialize the HTTP client used to query the NHL API. Requests share a pooled keep-alive session,
+        are rate limited by a token bucket, time out, and are retried with exponential backoff and jitter
+        on connection errors, 429 and 5xx responses.
+
+        Args:
+            workers (int, optional): Number of concurrent workers that will use the client. Defaults to 1.
+            requests_per_second (float, optional): Average request rate allowed. Defaults to DEFAULT_REQUESTS_PER_SECOND.
+            burst (int, optional): Number of requests allowed in a burst. Defaults to DEFAULT_BURST.
+            timeout (tuple, optional): Connect and read timeouts in seconds. Defaults to (CONNECT_TIMEOUT, READ_TIMEOUT).
+            max_retries (int, optional): Number of retries before giving up on a request. Defaults to MAX_RETRIES.
+        """
+        self.session = self.__create_session(workers)
+        self.rate_limiter = TokenBucket(requests_per_second, burst)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.metrics = FetchMetrics()
+
+
+    def __create_session(self, workers: int) -> requests.Session:
+        """Creates an HTTP session shared by every request of the client.
+        The connection pool is sized to the number of workers so each of them can keep its connection alive.
+
+        Args:
+            workers (int): Number of concurrent workers that will use the session.
+
+        Returns:
+            requests.Session: Session with a pooled keep-alive adapter mounted for HTTP and HTTPS.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(workers, 1))
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        return session
+
+
+    def __get_backoff_delay(self, attempt: int, response: requests.Response = None) -> float:
+        """Gets how long to wait before retrying a request. A Retry-After header is honoured,
+        otherwise the delay is exponential in the attempt number with full jitter.
+
+        Args:
+            attempt (int): Number of the attempt that failed, starting at 0.
+            response (requests.Response, optional): Response of the failed attempt. Defaults to None.
+
+        Returns:
+            float: Delay in seconds.
+        """
+        if response is not None and response.headers.get('Retry-After', '').isdigit():
+            return min(float(response.headers['Retry-After']), BACKOFF_MAX)
+
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+    def get(self, url: str, headers: dict = None, label: str = 'default') -> requests.Response:
+        """Sends a rate limited GET request, retrying it on connection errors, timeouts, 429 and 5xx responses.
+
+        Args:
+            url (str): URL to request.
+            headers (dict, optional): Headers of the request. Defaults to None.
+            label (str, optional): Label under which the request is counted in the metrics (e.g. season). Defaults to 'default'.
+
+        Returns:
+            requests.Response: Response of the last attempt.
+
+        Raises:
+            requests.exceptions.RequestException: If the last attempt failed without a response.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            start = time.perf_counter()
+
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    self.metrics.record_failure(label)
+                    raise
+
+                self.metrics.record_retry(label)
+                time.sleep(self.__get_backoff_delay(attempt))
+                continue
+
+            self.metrics.record_request(label, time.perf_counter() - start, len(response.content), response.status_code)
+
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                return response
+
+            if attempt == self.max_retries:
+                self.metrics.record_failure(label)
+                return response
+
+            self.metrics.record_retry(label)
+            time.sleep(self.__get_backoff_delay(attempt, response))
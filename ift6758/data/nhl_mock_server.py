@@ -0,0 +1,205 @@
+from ift6758.data.nhl_game_store import NHLGameStore
+from ift6758.data.nhl_synthetic_games import NHLSyntheticGameGenerator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+
+PLAY_BY_PLAY_PATH_PATTERN = re.compile(r'^/v1/gamecenter/(\d{10})/play-by-play/?$')
+
+DEFAULT_SYNTHETIC_PLAYS = 300
+
+class NHLMockServer:
+    def __init__(
+            self,
+            host: str = '127.0.0.1',
+            port: int = 0,
+            recorded_data_path: str = None,
+            latency: float = 0.0,
+            latency_jitter: float = 0.0,
+            error_rate: float = 0.0,
+            missing_rate: float = 0.0,
+            missing_game_ids: list = None,
+            synthetic_plays: int = DEFAULT_SYNTHETIC_PLAYS,
+            seed: int = None
+        ):
+        """
+        Initialize a local stand-in for the NHL play-by-play endpoint (/v1/gamecenter/{game-id}/play-by-play).
+        Games are served from recorded game files when they exist, otherwise a synthetic payload is generated.
+        The server keeps connections alive, so it can be used to benchmark the fetcher's connection pooling.
+
+        Args:
+            host (str, optional): Host to listen on. Defaults to '127.0.0.1'.
+            port (int, optional): Port to listen on, 0 picks a free port. Defaults to 0.
+            recorded_data_path (str, optional): Directory of recorded game files (any format NHLGameStore reads). Defaults to None.
+            latency (float, optional): Delay added to every response in seconds. Defaults to 0.0.
+            latency_jitter (float, optional): Maximum random delay added on top of the latency in seconds. Defaults to 0.0.
+            error_rate (float, optional): Probability of answering a request with a 503. Defaults to 0.0.
+            missing_rate (float, optional): Share of game IDs answered with a 404, chosen deterministically by game ID. Defaults to 0.0.
+            missing_game_ids (list, optional): Game IDs always answered with a 404. Defaults to None.
+            synthetic_plays (int, optional): Number of plays in synthetic payloads. Defaults to DEFAULT_SYNTHETIC_PLAYS.
+            seed (int, optional): Seed of the random latency and errors. Defaults to None.
+        """
+        self.recorded_store = NHLGameStore(local_data_path=recorded_data_path) if recorded_data_path else None
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.missing_rate = missing_rate
+        self.missing_game_ids = set(missing_game_ids or [])
+        self.synthetic_plays = synthetic_plays
+        self.generator = NHLSyntheticGameGenerator(plays_per_game=synthetic_plays, seed=seed or 0)
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+
+        self.request_count = 0
+        self.server = ThreadingHTTPServer((host, port), self.__create_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server, to be used as the fetcher's API URL."""
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+    def start(self) -> 'NHLMockServer':
+        """Starts serving requests in a background thread.
+
+        Returns:
+            NHLMockServer: The server itself.
+        """
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+
+    def stop(self):
+        """Stops the server and releases its port."""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+    def __enter__(self):
+        return self.start()
+
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+    def is_game_missing(self, game_id: str) -> bool:
+        """Checks if the server answers a game ID with a 404.
+
+        Args:
+            game_id (str): Game ID to check.
+
+        Returns:
+            bool: True if the game is missing.
+        """
+        if game_id in self.missing_game_ids:
+            return True
+
+        return zlib.crc32(game_id.encode('ascii')) / 2 ** 32 < self.missing_rate
+
+
+    def get_synthetic_game(self, game_id: str) -> dict:
+        """Generates a synthetic play-by-play payload for a game (see NHLSyntheticGameGenerator). The payload follows
+        the schema of the API's payloads, so the served games can also be parsed.
+
+        Args:
+            game_id (str): Game ID of the payload.
+
+        Returns:
+            dict: Synthetic game data.
+        """
+        return self.generator.generate_game(game_id)
+
+
+    def get_game_payload(self, game_id: str) -> bytes:
+        """Gets the payload served for a game: the recorded game if there is one, a synthetic game otherwise.
+
+        Args:
+            game_id (str): Game ID of the payload.
+
+        Returns:
+            bytes: Raw JSON payload.
+        """
+        if self.recorded_store is not None:
+            try:
+                return self.recorded_store.read_game_bytes(game_id)
+            except FileNotFoundError:
+                pass
+
+        return json.dumps(self.get_synthetic_game(game_id)).encode('utf-8')
+
+
+    def __create_handler(self):
+        """Creates the request handler class bound to this server's settings.
+
+        Returns:
+            type: Request handler class.
+        """
+        mock_server = self
+
+        class PlayByPlayHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with mock_server.random_lock:
+                    mock_server.request_count += 1
+                    delay = mock_server.latency + mock_server.random.uniform(0, mock_server.latency_jitter)
+                    is_error = mock_server.random.random() < mock_server.error_rate
+
+                if delay > 0:
+                    time.sleep(delay)
+
+                match = PLAY_BY_PLAY_PATH_PATTERN.match(self.path)
+
+                if is_error:
+                    self.send_body(503, b'')
+                elif match is None or mock_server.is_game_missing(match.group(1)):
+                    self.send_body(404, b'')
+                else:
+                    self.send_body(200, mock_server.get_game_payload(match.group(1)))
+
+            def send_body(self, status_code: int, body: bytes):
+                self.send_response(status_code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return PlayByPlayHandler
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local stand-in for the NHL play-by-play API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--recorded-data-path', default=None)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--latency-jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--missing-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = NHLMockServer(
+        host=args.host,
+        port=args.port,
+        recorded_data_path=args.recorded_data_path,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        missing_rate=args.missing_rate
+    )
+    print(f"Serving the NHL play-by-play API on {server.url} (set NHL_API_URL to use it)")
+    server.server.serve_forever()
@@ -0,0 +1,188 @@
+from contextlib import contextmanager, nullcontext
+import json
+import threading
+import time
+import tracemalloc
+import pandas as pd
+
+# Columns of a profiler's report, one row per stage
+PROFILE_REPORT_COLUMNS = [
+    'stage',
+    'calls',
+    'total_seconds',
+    'mean_ms',
+    'max_ms',
+    'rows',
+    'rows_per_second',
+    'allocated_mb',
+    'peak_mb'
+]
+
+class NHLStageProfiler:
+    def __init__(self, enabled: bool = True, trace_memory: bool = False, sink=None):
+        """
+        Initialize a profiler of the named stages of the fetch and parse pipelines (request, JSON load, play extraction,
+        roster mapping, each feature...). Each stage records its wall time, the rows it processed and, when memory is
+        traced, the memory it allocated with tracemalloc. Stages are aggregated by name across games (see get_report).
+        Stages can be nested and recorded from several threads. Tracing memory slows the pipelines down noticeably, and
+        the allocations of concurrent stages are mixed together: close the profiler (or use it as a context manager) to
+        stop tracing once profiling is over.
+        A disabled profiler records nothing and costs next to nothing: it's what the fetcher and the parser use by default.
+
+        Args:
+            enabled (bool, optional): If stages are recorded. Defaults to True.
+            trace_memory (bool, optional): If the memory allocated by each stage is traced. Defaults to False.
+            sink (callable, optional): Metrics sink called with the record of each stage (dict with stage, seconds,
+                rows, allocated_bytes and peak_bytes), e.g. a logger or wandb.log. Defaults to None.
+        """
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.sink = sink
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.stages = {}
+        self.is_tracing = enabled and trace_memory
+        self.started_tracing = False
+
+        if enabled and trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+    def close(self):
+        """Stops tracing the memory allocations if this profiler started it, so the process isn't slowed down once
+        profiling is over. The recorded stages are kept, later stages only record their time and rows. Also called when the profiler is used as a context manager:
+
+            with NHLStageProfiler(trace_memory=True) as profiler:
+                parser = NHLDataParser(profiler=profiler)
+        """
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+        self.is_tracing = False
+
+
+    def stage(self, name: str):
+        """Records a stage of the pipeline, as a context manager around the stage's code:
+
+            with profiler.stage('extract_plays') as stage:
+                stage['rows'] = len(plays)
+
+        Args:
+            name (str): Name of the stage, stages with the same name are aggregated.
+
+        Returns:
+            contextmanager: Context manager yielding the record of the stage, in which the rows can be set.
+        """
+        if not self.enabled:
+            return nullcontext({})
+
+        return self.__record_stage(name)
+
+
+    @contextmanager
+    def __record_stage(self, name: str):
+        depth = getattr(self.local, 'depth', 0)
+        record = {'stage': name, 'seconds': None, 'rows': None, 'allocated_bytes': None, 'peak_bytes': None}
+
+        # The peak can only be reset once, so it is only measured for the outermost stages
+        is_tracing = self.is_tracing
+
+        if is_tracing:
+            if depth == 0:
+                tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+
+        self.local.depth = depth + 1
+        start = time.perf_counter()
+
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            self.local.depth = depth
+
+            if is_tracing:
+                current_memory, peak_memory = tracemalloc.get_traced_memory()
+                record['allocated_bytes'] = current_memory - start_memory
+                record['peak_bytes'] = peak_memory - start_memory if depth == 0 else None
+
+            self.__aggregate(record)
+
+            if self.sink is not None:
+                self.sink(record)
+
+
+    def __aggregate(self, record: dict):
+        """Adds the record of a stage to the aggregate of its name.
+
+        Args:
+            record (dict): Record of the stage.
+        """
+        with self.lock:
+            stage = self.stages.setdefault(record['stage'], {
+                'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0, 'allocated_bytes': 0, 'peak_bytes': None
+            })
+            stage['calls'] += 1
+            stage['seconds'] += record['seconds']
+            stage['max_seconds'] = max(stage['max_seconds'], record['seconds'])
+            stage['rows'] += record['rows'] or 0
+            stage['allocated_bytes'] += record['allocated_bytes'] or 0
+
+            if record['peak_bytes'] is not None:
+                stage['peak_bytes'] = max(stage['peak_bytes'] or 0, record['peak_bytes'])
+
+
+    def get_report(self) -> pd.DataFrame:
+        """Gets the stages aggregated by name, the slowest stages first. Nested stages are part of the time of the
+        stages that contain them, so the total times don't add up.
+
+        Returns:
+            pd.DataFrame: One row per stage with the columns of PROFILE_REPORT_COLUMNS.
+        """
+        with self.lock:
+            stages = {name: dict(stage) for name, stage in self.stages.items()}
+
+        report = pd.DataFrame([
+            {
+                'stage': name,
+                'calls': stage['calls'],
+                'total_seconds': stage['seconds'],
+                'mean_ms': stage['seconds'] / stage['calls'] * 1000,
+                'max_ms': stage['max_seconds'] * 1000,
+                'rows': stage['rows'],
+                'rows_per_second': stage['rows'] / stage['seconds'] if stage['rows'] and stage['seconds'] else None,
+                'allocated_mb': stage['allocated_bytes'] / 1e6 if self.trace_memory else None,
+                'peak_mb': stage['peak_bytes'] / 1e6 if stage['peak_bytes'] is not None else None
+            }
+            for name, stage in stages.items()
+        ], columns=PROFILE_REPORT_COLUMNS)
+
+        return report.sort_values('total_seconds', ascending=False, ignore_index=True)
+
+
+    def export(self, path: str):
+        """Exports the report of the stages as JSON (see get_report).
+
+        Args:
+            path (str): Path of the JSON file.
+        """
+        report = self.get_report().astype(object).where(lambda df: df.notna(), None)
+
+        with open(path, 'w') as f:
+            json.dump(report.to_dict('records'), f, indent=4)
+
+
+    def reset(self):
+        """Forgets every recorded stage."""
+        with self.lock:
+            self.stages = {}
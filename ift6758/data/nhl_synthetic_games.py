@@ -0,0 +1,272 @@
+import random
+
+# Plays of a synthetic game by type (typeDescKey), with their type code and relative frequency
+DEFAULT_EVENT_WEIGHTS = {
+    'faceoff': 10,
+    'hit': 12,
+    'giveaway': 4,
+    'takeaway': 4,
+    'blocked-shot': 8,
+    'missed-shot': 10,
+    'shot-on-goal': 14,
+    'goal': 1.5,
+    'stoppage': 8,
+    'penalty': 2
+}
+
+EVENT_TYPE_CODES = {
+    'faceoff': 502,
+    'hit': 503,
+    'giveaway': 504,
+    'goal': 505,
+    'shot-on-goal': 506,
+    'missed-shot': 507,
+    'blocked-shot': 508,
+    'penalty': 509,
+    'stoppage': 516,
+    'period-start': 520,
+    'period-end': 521,
+    'game-end': 524,
+    'takeaway': 525
+}
+
+SYNTHETIC_TEAM_COUNT = 32
+SYNTHETIC_PLAYERS_PER_TEAM = 20
+SYNTHETIC_GOALIES_PER_TEAM = 2
+SECONDS_PER_PERIOD = 1200
+REGULATION_PERIODS = 3
+SHOT_TYPES = ['wrist', 'snap', 'slap', 'backhand', 'tip-in', 'deflected', 'wrap-around']
+FIRST_NAMES = ['Alex', 'Sam', 'Nick', 'Ryan', 'Jake', 'Matt', 'Mark', 'Eric', 'Luke', 'Owen']
+LAST_NAMES = ['Smith', 'Brown', 'Tremblay', 'Martin', 'Roy', 'Wilson', 'Taylor', 'Gagnon', 'Lee', 'White']
+
+class NHLSyntheticGameGenerator:
+    def __init__(self, plays_per_game: int = 300, event_weights: dict = None, overtime_rate: float = 0.2, seed: int = 0):
+        """
+        Initialize a generator of synthetic play-by-play games that follow the schema of the NHL API's payloads
+        (plays with periodDescriptor and details, rosterSpots, homeTeam/awayTeam), so they can be parsed like real games.
+        Each game only depends on its game ID and the seed, so the same games are generated on every run.
+
+        Args:
+            plays_per_game (int, optional): Number of plays of a game, excluding the period starts and ends. Defaults to 300.
+            event_weights (dict, optional): Relative frequency of each type of play (see DEFAULT_EVENT_WEIGHTS). Defaults to None.
+            overtime_rate (float, optional): Share of games that go to overtime. Defaults to 0.2.
+            seed (int, optional): Seed of the generated games. Defaults to 0.
+        """
+        self.plays_per_game = plays_per_game
+        self.event_weights = event_weights or DEFAULT_EVENT_WEIGHTS
+        self.overtime_rate = overtime_rate
+        self.seed = seed
+
+
+    def get_season_game_ids(self, season: int, games: int) -> list:
+        """Gets the game IDs of the first regular season games of a season.
+
+        Args:
+            season (int): Season year.
+            games (int): Number of games.
+
+        Returns:
+            list: Game IDs
+        """
+        return [f'{season}02{str(game).zfill(4)}' for game in range(1, games + 1)]
+
+
+    def __get_team(self, team_id: int) -> dict:
+        """Gets the description of a team as found in the homeTeam and awayTeam fields of a payload.
+
+        Args:
+            team_id (int): Team ID.
+
+        Returns:
+            dict: Team description.
+        """
+        return {'id': team_id, 'commonName': {'default': f'Team {team_id}'}, 'abbrev': f'T{team_id:02d}'}
+
+
+    def __get_roster(self, team_id: int) -> list:
+        """Gets the roster spots of a team. Player IDs are unique across teams and the first players are the goalies.
+
+        Args:
+            team_id (int): Team ID.
+
+        Returns:
+            list: Roster spots of the team.
+        """
+        return [
+            {
+                'teamId': team_id,
+                'playerId': 8400000 + team_id * 100 + number,
+                'firstName': {'default': FIRST_NAMES[(team_id + number) % len(FIRST_NAMES)]},
+                'lastName': {'default': f'{LAST_NAMES[number % len(LAST_NAMES)]}-{team_id}'},
+                'sweaterNumber': number + 1,
+                'positionCode': 'G' if number < SYNTHETIC_GOALIES_PER_TEAM else 'CLRD'[number % 4]
+            }
+            for number in range(SYNTHETIC_PLAYERS_PER_TEAM)
+        ]
+
+
+    def __get_time(self, seconds: int) -> str:
+        return f'{seconds // 60:02d}:{seconds % 60:02d}'
+
+
+    def __get_play(self, rng: random.Random, play: dict, event_type: str, team_id: int, opponent_id: int,
+                   attacks_right: bool, goalies: dict, skaters: dict) -> dict:
+        """Adds the details of a play: its location, which is consistent with the side the team attacks, and the players
+        involved.
+
+        Args:
+            rng (random.Random): Random generator of the game.
+            play (dict): Play without details.
+            event_type (str): Type of the play.
+            team_id (int): Team that owns the play.
+            opponent_id (int): Other team.
+            attacks_right (bool): If the team attacks the net on the right side of the rink (positive x) in this period.
+            goalies (dict): Goalie in net by team ID, None for an empty net.
+            skaters (dict): Skater IDs by team ID.
+
+        Returns:
+            dict: Play with its details.
+        """
+        if event_type == 'stoppage':
+            play['details'] = {'reason': rng.choice(['icing', 'offside', 'puck-frozen', 'tv-timeout'])}
+            return play
+
+        zone_code = rng.choices(['O', 'N', 'D'], [6, 2, 2] if event_type in ('shot-on-goal', 'missed-shot', 'goal') else [1, 1, 1])[0]
+        distance_from_center = {'O': rng.randint(26, 99), 'N': rng.randint(0, 25), 'D': rng.randint(26, 99)}[zone_code]
+        is_right = attacks_right == (zone_code != 'D')
+        player_id = rng.choice(skaters[team_id])
+        details = {
+            'xCoord': distance_from_center if is_right else -distance_from_center,
+            'yCoord': rng.randint(-42, 42),
+            'zoneCode': zone_code,
+            'eventOwnerTeamId': team_id
+        }
+
+        if event_type in ('shot-on-goal', 'missed-shot', 'blocked-shot'):
+            details['shootingPlayerId'] = player_id
+
+        if event_type in ('shot-on-goal', 'missed-shot', 'goal'):
+            details['shotType'] = rng.choice(SHOT_TYPES)
+
+            if goalies[opponent_id] is not None:
+                details['goalieInNetId'] = goalies[opponent_id]
+
+        if event_type == 'goal':
+            details['scoringPlayerId'] = player_id
+            details['assist1PlayerId'] = rng.choice(skaters[team_id])
+        elif event_type == 'blocked-shot':
+            details['blockingPlayerId'] = rng.choice(skaters[opponent_id])
+        elif event_type == 'hit':
+            details['hittingPlayerId'] = player_id
+            details['hitteePlayerId'] = rng.choice(skaters[opponent_id])
+        elif event_type == 'faceoff':
+            details['winningPlayerId'] = player_id
+            details['losingPlayerId'] = rng.choice(skaters[opponent_id])
+        elif event_type in ('giveaway', 'takeaway'):
+            details['playerId'] = player_id
+        elif event_type == 'penalty':
+            details.update(committedByPlayerId=player_id, drawnByPlayerId=rng.choice(skaters[opponent_id]),
+                           typeCode='MIN', descKey=rng.choice(['tripping', 'hooking', 'slashing']), duration=2)
+
+        # A small share of plays aren't located, as in the API's payloads
+        if rng.random() < 0.01:
+            details.pop('xCoord')
+            details.pop('yCoord')
+
+        play['details'] = details
+        return play
+
+
+    def generate_game(self, game_id: str) -> dict:
+        """Generates the play-by-play payload of a finished game.
+
+        Args:
+            game_id (str): Game ID of the payload.
+
+        Returns:
+            dict: Synthetic game data.
+        """
+        rng = random.Random(f'{self.seed}-{game_id}')
+        home_id, away_id = rng.sample(range(1, SYNTHETIC_TEAM_COUNT + 1), 2)
+        rosters = {team_id: self.__get_roster(team_id) for team_id in (home_id, away_id)}
+        skaters = {team_id: [p['playerId'] for p in roster if p['positionCode'] != 'G'] for team_id, roster in rosters.items()}
+        goalies = {team_id: roster[0]['playerId'] for team_id, roster in rosters.items()}
+
+        periods = REGULATION_PERIODS + (1 if rng.random() < self.overtime_rate else 0)
+        event_types = rng.choices(list(self.event_weights), list(self.event_weights.values()), k=self.plays_per_game)
+        plays_per_period = -(-self.plays_per_game // periods)
+        home_defending_side = rng.choice(['left', 'right'])
+        score = {home_id: 0, away_id: 0}
+        sog = {home_id: 0, away_id: 0}
+        plays = []
+
+        def add_play(event_type: str, period: int, seconds: int) -> dict:
+            play = {
+                'eventId': len(plays) + 1,
+                'periodDescriptor': {'number': period, 'periodType': 'REG' if period <= REGULATION_PERIODS else 'OT', 'maxRegulationPeriods': REGULATION_PERIODS},
+                'timeInPeriod': self.__get_time(seconds),
+                'timeRemaining': self.__get_time(SECONDS_PER_PERIOD - seconds),
+                'situationCode': '1551',
+                'homeTeamDefendingSide': home_defending_side,
+                'typeCode': EVENT_TYPE_CODES[event_type],
+                'typeDescKey': event_type,
+                'sortOrder': len(plays) + 1
+            }
+            plays.append(play)
+            return play
+
+        for period in range(1, periods + 1):
+            add_play('period-start', period, 0)
+            period_event_types = event_types[(period - 1) * plays_per_period:period * plays_per_period]
+            times = sorted(rng.randint(1, SECONDS_PER_PERIOD - 1) for _ in period_event_types)
+
+            for event_type, seconds in zip(period_event_types, times):
+                team_id = rng.choice([home_id, away_id])
+                opponent_id = away_id if team_id == home_id else home_id
+                attacks_right = (home_defending_side == 'left') == (team_id == home_id)
+
+                # Goalies are pulled for the extra attacker late in the last period
+                goalies_in_net = dict(goalies)
+                if period == periods and seconds > SECONDS_PER_PERIOD - 90 and rng.random() < 0.3:
+                    goalies_in_net[opponent_id] = None
+
+                play = add_play(event_type, period, seconds)
+                self.__get_play(rng, play, event_type, team_id, opponent_id, attacks_right, goalies_in_net, skaters)
+
+                if event_type in ('shot-on-goal', 'goal'):
+                    sog[team_id] += 1
+                if event_type == 'goal':
+                    score[team_id] += 1
+                    play['details'].update(homeScore=score[home_id], awayScore=score[away_id])
+
+            add_play('period-end', period, SECONDS_PER_PERIOD)
+            home_defending_side = 'right' if home_defending_side == 'left' else 'left'
+
+        add_play('game-end', periods, SECONDS_PER_PERIOD)
+
+        return {
+            'id': int(game_id),
+            'season': int(game_id[:4]) * 10001 + 1,
+            'gameType': int(game_id[4:6]),
+            'gameDate': f'{game_id[:4]}-10-10',
+            'venue': {'default': f'Arena {home_id}'},
+            'gameState': 'OFF',
+            'periodDescriptor': {'number': periods, 'periodType': 'REG' if periods <= REGULATION_PERIODS else 'OT'},
+            'homeTeam': {**self.__get_team(home_id), 'score': score[home_id], 'sog': sog[home_id]},
+            'awayTeam': {**self.__get_team(away_id), 'score': score[away_id], 'sog': sog[away_id]},
+            'plays': plays,
+            'rosterSpots': rosters[home_id] + rosters[away_id]
+        }
+
+
+    def generate_games(self, game_ids: list):
+        """Generates the payloads of games one at a time.
+
+        Args:
+            game_ids (list): Game IDs of the payloads.
+
+        Yields:
+            tuple: Game ID and synthetic game data (game_id: str, dict)
+        """
+        for game_id in game_ids:
+            yield game_id, self.generate_game(game_id)
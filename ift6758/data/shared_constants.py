@@ -1,4 +1,8 @@
 MAX_GAMES_PER_REGULAR_SEASON = 1312
 PLAYOFF_ROUNDS = 4
 MATCHUPS_PER_PLAYOFF_ROUND = [8, 4, 2, 1]
-MAX_GAMES_PER_PLAYOFF_ROUND = 7
\ No newline at end of file
+MAX_GAMES_PER_PLAYOFF_ROUND = 7
+REGULAR_SEASON_GAME_TYPE = 2
+PLAYOFF_GAME_TYPE = 3
+FINAL_GAME_STATES = ['FINAL', 'OFF']
+SCHEDULED_GAME_STATES = ['FUT', 'PRE']
\ No newline at end of file
@@ -3,7 +3,6 @@ from ift6758.data.nhl_helper import NHLHelper
 from matplotlib import image, pyplot as plt
 from IPython.display import display
 from ipywidgets import widgets
-import json
 import os
 import numpy as np
 
@@ -183,8 +182,7 @@ class NHLEventMapper:
             self.data_fetcher.fetch_raw_game_data(game_id)
 
         try:
-            with open(self.data_fetcher.get_game_local_path(game_id), 'r') as file:
-                game_data = json.load(file)
+            game_data = self.data_fetcher.load_raw_game_data(game_id)
         except FileNotFoundError:
             self.__display_game_number_error(n_game)
 
@@ -206,8 +204,7 @@ class NHLEventMapper:
             self.data_fetcher.fetch_raw_game_data(game_id)
 
         try:
-            with open(self.data_fetcher.get_game_local_path(game_id), 'r') as file:
-                game_data = json.load(file)
+            game_data = self.data_fetcher.load_raw_game_data(game_id)
         except FileNotFoundError:
             self.__display_game_number_error(n_game)
 
@@ -0,0 +1,257 @@
+from ift6758.data.nhl_data_parser import NHLDataParser
+from ift6758.data.shared_constants import REGULAR_SEASON_GAME_TYPE
+from scipy.ndimage import gaussian_filter
+import numpy as np
+import os
+import pandas as pd
+
+# Columns of the binned goal probabilities, after the group columns
+BINNED_PROBABILITY_COLUMNS = ['binLeft', 'binRight', 'binMid', 'shotCount', 'goalCount', 'probability']
+
+# Grid of the offensive half of the rink (in ft, shots mirrored onto positive x), with 1 ft cells centered on the
+# integer coordinates of the API. Coarser bins are sums of these cells
+SHOT_GRID_X_EDGES = np.arange(-0.5, 101, 1.0)
+SHOT_GRID_Y_EDGES = np.arange(-42.5, 43, 1.0)
+
+# Shot grids are cached per season under NHL_DATA_PATH/stats/
+SHOT_GRID_DIR = 'stats'
+
+class NHLShotStatsEngine:
+    def __init__(self, data_parser: NHLDataParser = None):
+        """
+        Initialize the engine computing the statistics that NHLStats plots, on whole columns of shots at once.
+
+        Args:
+            data_parser (NHLDataParser, optional): Parser the shots are queried from. Defaults to a new parser.
+        """
+        self.data_parser = data_parser or NHLDataParser()
+        self.shot_grids = {}
+
+
+    def query_shots(self, start_season: int, end_season: int = 0, columns: list = None, **kwargs) -> pd.DataFrame:
+        """Queries the shots and goals of a range of seasons (see NHLDataParser.query_shots). A season column can be
+        requested, it is decoded from the game IDs.
+
+        Args:
+            start_season (int): First season of the query.
+            end_season (int, optional): Last season of the query. Defaults to 0 (only the first season).
+            columns (list, optional): Columns of the DataFrame, season included. Defaults to None (all columns).
+            **kwargs: Other arguments of NHLDataParser.query_shots (game_type, filters, ...).
+
+        Returns:
+            pd.DataFrame: Shots and goals of the seasons.
+        """
+        with_season = columns is not None and 'season' in columns
+        query_columns = None if columns is None else list(dict.fromkeys(
+            ['gameId' if col == 'season' else col for col in columns]
+        ))
+
+        df = self.data_parser.query_shots(start_season, end_season, columns=query_columns, **kwargs)
+
+        if with_season:
+            df['season'] = self.data_parser.helper.decode_game_ids(df['gameId'])['season'].to_numpy()
+            df = df[columns]
+
+        return df
+
+
+    def get_binned_goal_probability(
+            self,
+            df: pd.DataFrame,
+            column: str = 'shotDistance',
+            bin_width: float = 1,
+            by: list = None,
+            norm: bool = False,
+            start: float = None
+        ) -> pd.DataFrame:
+        """Computes the shot counts, goal counts and goal probabilities of bins of a column (shot distance, angle...)
+        in a single pass over the shots, optionally for each group of other columns (shot type, team, season...).
+        The bins are right-closed intervals of bin_width starting at the group's minimum (or at start), like
+        pd.interval_range(minimum, maximum, freq=bin_width): shots at the minimum or past the last whole bin aren't counted.
+
+        Args:
+            df (pd.DataFrame): Shots and goals, with the column, isGoal and the group columns. Shots missing the column
+                or a group column are left out.
+            column (str, optional): Column to bin. Defaults to 'shotDistance'.
+            bin_width (float, optional): Width of the bins. Defaults to 1.
+            by (list, optional): Columns to group the shots by, each group having its own bins. Defaults to None.
+            norm (bool, optional): True for the joint probability (goals of the bin over every shot of df),
+                False for the conditional probability (goals of the bin over the shots of the bin). Defaults to False.
+            start (float, optional): Start of the first bin of every group. Defaults to None (each group's minimum).
+
+        Returns:
+            pd.DataFrame: One row per bin of each group, with the group columns and BINNED_PROBABILITY_COLUMNS.
+                The conditional probability of an empty bin is NaN.
+        """
+        by = list(by or [])
+        # Shots without a value or a group key (e.g. unknown team) aren't in any bin
+        shots = df[by + [column, 'isGoal']].dropna(subset=[column] + by)
+
+        if by:
+            grouped = shots.groupby(by, sort=True, observed=True)
+            group_codes = grouped.ngroup().to_numpy()
+            group_keys = grouped.size().index.to_frame(index=False)
+        else:
+            group_codes = np.zeros(len(shots), dtype=int)
+            group_keys = pd.DataFrame(index=range(1))
+
+        group_count = len(group_keys)
+        values = shots[column].to_numpy(dtype=float)
+        maximums = pd.Series(values).groupby(group_codes).max().reindex(range(group_count)).to_numpy()
+        minimums = pd.Series(values).groupby(group_codes).min().reindex(range(group_count)).to_numpy() \
+            if start is None else np.full(group_count, float(start))
+
+        # Number of whole bins of each group, and the bin of each shot within its group
+        bin_counts = np.nan_to_num(np.floor((maximums - minimums) / bin_width + 1e-9), nan=0).clip(min=0).astype(int)
+        bin_indexes = np.ceil((values - minimums[group_codes]) / bin_width).astype(int) - 1
+        in_bins = (bin_indexes >= 0) & (bin_indexes < bin_counts[group_codes])
+
+        # Bins of every group are laid out one after the other, so a single bincount counts the shots of every bin
+        offsets = np.r_[0, np.cumsum(bin_counts)[:-1]]
+        flat_bins = offsets[group_codes[in_bins]] + bin_indexes[in_bins]
+        total_bins = int(bin_counts.sum())
+        shot_counts = np.bincount(flat_bins, minlength=total_bins)
+        goal_counts = np.bincount(flat_bins, weights=shots['isGoal'].to_numpy()[in_bins], minlength=total_bins).astype(int)
+
+        bin_groups = np.repeat(np.arange(group_count), bin_counts)
+        bin_lefts = minimums[bin_groups] + (np.arange(total_bins) - offsets[bin_groups]) * bin_width
+        denominators = np.full(total_bins, len(df)) if norm else shot_counts
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            probabilities = np.where(denominators > 0, goal_counts / denominators, np.nan)
+
+        result = group_keys.iloc[bin_groups].reset_index(drop=True)
+        result['binLeft'] = bin_lefts
+        result['binRight'] = bin_lefts + bin_width
+        result['binMid'] = bin_lefts + bin_width / 2
+        result['shotCount'] = shot_counts
+        result['goalCount'] = goal_counts
+        result['probability'] = probabilities
+
+        return result
+
+
+    def __get_shot_grid_path(self, season: int) -> str:
+        """Gets the path of the cached shot grid of a season.
+
+        Args:
+            season (int): Season year.
+
+        Returns:
+            str: Path of the shot grid file.
+        """
+        return os.path.join(self.data_parser.data_fetcher.local_data_path, SHOT_GRID_DIR, f'shot_grid_{season}.npz')
+
+
+    def __build_shot_grid(self, season: int) -> dict:
+        """Bins the regular season offensive and neutral zone shots of a season into the rink grid of each team,
+        in a single histogram pass over every shot.
+
+        Args:
+            season (int): Season year.
+
+        Returns:
+            dict: Teams (names), games played by each team and shot counts by team, x cell and y cell
+                (teams: np.ndarray, games: np.ndarray, counts: np.ndarray)
+        """
+        df = self.data_parser.query_shots(
+            season,
+            game_type=REGULAR_SEASON_GAME_TYPE,
+            columns=['gameId', 'xCoord', 'yCoord', 'shootingTeam'],
+            filters=[('zoneCode', 'in', ['O', 'N'])]
+        ).dropna(subset=['shootingTeam'])
+
+        team_codes, teams = pd.factorize(df['shootingTeam'], sort=True)
+        games = df.groupby(team_codes)['gameId'].nunique().reindex(range(len(teams)), fill_value=0).to_numpy()
+
+        # Shots on the left side are mirrored, so every shot is on the offensive half of the right side
+        x_coords = df['xCoord'].to_numpy(dtype=float)
+        y_coords = np.where(x_coords < 0, -df['yCoord'].to_numpy(dtype=float), df['yCoord'].to_numpy(dtype=float))
+
+        counts, _ = np.histogramdd(
+            (team_codes, np.abs(x_coords), y_coords),
+            bins=(np.arange(len(teams) + 1) - 0.5, SHOT_GRID_X_EDGES, SHOT_GRID_Y_EDGES)
+        )
+
+        return {'teams': np.asarray(teams, dtype=str), 'games': games, 'counts': counts.astype(np.int32)}
+
+
+    def get_shot_grid(self, season: int, refresh: bool = False) -> dict:
+        """Gets the shot counts of each team of a regular season on the rink grid (see SHOT_GRID_X_EDGES and
+        SHOT_GRID_Y_EDGES). Grids are cached in memory and on disk, and a cached grid is used as long as no game of the
+        season was parsed after it was built.
+
+        Args:
+            season (int): Season year.
+            refresh (bool, optional): If the season should be brought up to date (new games fetched and parsed) and
+                its grid built again. Defaults to False.
+
+        Returns:
+            dict: Teams (names), games played by each team and shot counts by team, x cell and y cell
+                (teams: np.ndarray, games: np.ndarray, counts: np.ndarray)
+        """
+        grid_path = self.__get_shot_grid_path(season)
+        last_parsed_at = self.data_parser.data_fetcher.catalog.get_last_parsed_at(int(season), REGULAR_SEASON_GAME_TYPE)
+        is_cached = os.path.exists(grid_path) and (last_parsed_at is None or os.path.getmtime(grid_path) >= last_parsed_at)
+
+        if not refresh and season in self.shot_grids and is_cached:
+            return self.shot_grids[season]
+
+        if not refresh and is_cached:
+            with np.load(grid_path) as grid_file:
+                self.shot_grids[season] = {key: grid_file[key] for key in grid_file.files}
+
+            return self.shot_grids[season]
+
+        grid = self.__build_shot_grid(season)
+        os.makedirs(os.path.dirname(grid_path), exist_ok=True)
+
+        # Written to a temporary file first, so a partial grid is never read
+        temp_path = f'{grid_path}.tmp.npz'
+        np.savez_compressed(temp_path, **grid)
+        os.replace(temp_path, grid_path)
+
+        self.shot_grids[season] = grid
+        return grid
+
+
+    def get_excess_shot_rate_grid(self, season: int, bin_size: tuple = (1, 1), sigma: float = 0) -> dict:
+        """Computes the excess shot rate of each team of a regular season on the rink grid: the team's shots per game
+        (per hour of play) in each bin minus the league average, i.e. the mean of every team's rate.
+
+        Args:
+            season (int): Season year.
+            bin_size (tuple, optional): Size of the bins along x and y in ft, whole multiples of the grid's 1 ft cells. Defaults to (1, 1).
+            sigma (float, optional): Standard deviation of the gaussian smoothing of each team's grid, in bins. Defaults to 0 (no smoothing).
+
+        Returns:
+            dict: Teams (names), centers of the x and y bins, league average shot rate by bin and excess shot rate by
+                team and bin (teams: np.ndarray, x: np.ndarray, y: np.ndarray, league: np.ndarray, excess: np.ndarray)
+        """
+        grid = self.get_shot_grid(season)
+        x_size, y_size = (int(size) for size in bin_size)
+        counts = grid['counts']
+        team_count, x_cells, y_cells = counts.shape
+
+        # Coarser bins sum blocks of cells, the grid is padded with empty cells to a whole number of bins
+        x_bins, y_bins = -(-x_cells // x_size), -(-y_cells // y_size)
+        padded = np.zeros((team_count, x_bins * x_size, y_bins * y_size))
+        padded[:, :x_cells, :y_cells] = counts
+        binned = padded.reshape(team_count, x_bins, x_size, y_bins, y_size).sum(axis=(2, 4))
+
+        rates = binned / np.maximum(grid['games'], 1)[:, None, None]
+
+        if sigma:
+            rates = gaussian_filter(rates, sigma=(0, sigma, sigma))
+
+        league = rates.mean(axis=0) if team_count else np.zeros((x_bins, y_bins))
+        x_lefts = SHOT_GRID_X_EDGES[0] + np.arange(x_bins) * x_size
+        y_lefts = SHOT_GRID_Y_EDGES[0] + np.arange(y_bins) * y_size
+
+        return {
+            'teams': grid['teams'],
+            'x': x_lefts + x_size / 2,
+            'y': y_lefts + y_size / 2,
+            'league': league,
+            'excess': rates - league
+        }
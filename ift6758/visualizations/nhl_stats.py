@@ -1,4 +1,5 @@
 from ift6758.data.nhl_data_parser import NHLDataParser
+from ift6758.visualizations.nhl_shot_stats_engine import NHLShotStatsEngine
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
@@ -7,7 +8,6 @@ import plotly.express as px
 import plotly.graph_objects as go
 import os
 from PIL import Image
-from scipy.ndimage import gaussian_filter
 
 season_range = [2016,2017,2018,2019,2020,2021,2022,2023]
 shot_types = ['wrist', 'slap', 'backhand', 'snap', 'tip-in', 'deflected','wrap-around','poke', 'bat', 'between-legs', 'cradle']
@@ -18,6 +18,7 @@ team_list = ['Lightning', 'Penguins', 'Kraken', 'Golden Knights', 'Canadiens','M
 class NHLStats:
     def __init__(self):
         self.data_parser = NHLDataParser()
+        self.engine = NHLShotStatsEngine(self.data_parser)
     
     def plot_shot_type_distribution(self,start_season:int,end_season:int = 0):
         """Plots the Distrbution of Shot Types over a range of seasons. 
@@ -27,7 +28,7 @@ class NHLStats:
         start_season (int): First season in range to plot 
         end_season (int, optional): Last season in range to plot. Defaults to 0.
         """
-        df = self.data_parser.get_shot_and_goal_pbp_df_for_seasons(start_season,end_season)
+        df = self.data_parser.get_shot_and_goal_pbp_df_for_seasons(start_season,end_season,columns=['shotType','isGoal'])
         shot_counts = sns.countplot(x='shotType',data=df,hue='isGoal',order=df['shotType'].value_counts().index)
         plt.legend(title='Outcome', loc='center right', labels=['No Goal', 'Goal'])
         plt.xticks(rotation=90)
@@ -55,7 +56,7 @@ class NHLStats:
             hue ='shotType'
         if by_goal:
             col = 'isGoal'
-        df = self.data_parser.get_shot_and_goal_pbp_df_for_seasons(start_season,end_season)
+        df = self.data_parser.get_shot_and_goal_pbp_df_for_seasons(start_season,end_season,columns=['shotDistance','shotType','isGoal'])
         sns.displot(df,x="shotDistance",kind='hist',hue=hue,col=col,kde=True,binwidth =2,element='step')
         plt.xlabel('Shot Distance (feet)')
         if end_season==0 or start_season==end_season:
@@ -70,26 +71,12 @@ class NHLStats:
         ARGS:
         start_season (int): First season to start getting the play-by-play data for.
         end_season (int, optional): Last season to start getting the play-by-play data for. Defaults to 0.
-        bin_width (float): The width of the bins to consider when plotting the probability. Smaller bins will need more compute time
+        bin_width (float): The width of the bins to consider when plotting the probability
         norm (bool): decided whether to get joint or conditional probability. Set to True for joint probability
         """
-        df = self.data_parser.get_shot_and_goal_pbp_df_for_seasons(start_season,end_season)
-        distance_max = df['shotDistance'].max()
-        distance_min = df['shotDistance'].min()
-        bins = pd.interval_range(distance_min ,distance_max,freq=bin_width)
-        bin_probabilty=[]
-        for bin in bins:
-            df_bin = df[df["shotDistance"].apply(lambda x: x in bin)]
-            if norm:
-                shot_count = df.shape[0]
-            else:
-                shot_count = df_bin.shape[0]
-            goal_count = sum(df_bin['isGoal']==1)
-            if shot_count != 0:
-                bin_probabilty.append(goal_count/shot_count)
-            else:
-                bin_probabilty.append(np.nan)
-        plt.plot(bins.mid,bin_probabilty)
+        df = self.data_parser.get_shot_and_goal_pbp_df_for_seasons(start_season,end_season,columns=['shotDistance','isGoal'])
+        df_prob = self.engine.get_binned_goal_probability(df,'shotDistance',bin_width,norm=norm)
+        plt.plot(df_prob['binMid'],df_prob['probability'])
         plt.xlabel('Shot Distance (feet)')
         if norm:
             plt.ylabel('Joint Probability')
@@ -107,31 +94,17 @@ class NHLStats:
         ARGS:
         start_season (int): First season to start getting the play-by-play data for.
         end_season (int, optional): Last season to start getting the play-by-play data for. Defaults to 0.
-        bin_width (float): The width of the bins to consider when plotting the probability. Smaller bins will need more compute time
+        bin_width (float): The width of the bins to consider when plotting the probability
         shot_types (list): list of shot types to plot for
         norm (bool): decided whether to get joint or conditional probability. Set to True for joint probability
         """ 
-        df = self.data_parser.get_shot_and_goal_pbp_df_for_seasons(start_season,end_season)
+        df = self.data_parser.get_shot_and_goal_pbp_df_for_seasons(start_season,end_season,columns=['shotDistance','shotType','isGoal'])
         ax =plt.subplot()
         if shot_types:
+            df_prob = self.engine.get_binned_goal_probability(df,'shotDistance',bin_width,by=['shotType'],norm=norm)
             for shot in shot_types:
-                df_shot = df[df["shotType"]==shot]
-                distance_max = df_shot['shotDistance'].max()
-                distance_min = df_shot['shotDistance'].min()
-                bins = pd.interval_range(distance_min ,distance_max,freq=bin_width)
-                bin_probabilty=[]
-                for bin in bins:
-                    df_bin = df_shot[df_shot["shotDistance"].apply(lambda x: x in bin)]
-                    if norm:
-                        shot_count = df.shape[0]
-                    else:
-                        shot_count = df_bin.shape[0]
-                    goal_count = sum(df_bin['isGoal']==1)
-                    if shot_count != 0:
-                        bin_probabilty.append(goal_count/shot_count)
-                    else:
-                        bin_probabilty.append(np.nan)
-                line = ax.plot(bins.mid,np.array(bin_probabilty)*100,label= shot)
+                df_shot = df_prob[df_prob['shotType']==shot]
+                line = ax.plot(df_shot['binMid'],df_shot['probability']*100,label= shot)
                     
             ax.legend()
             plt.xlabel('Shot Distance (feet)')
@@ -152,37 +125,20 @@ class NHLStats:
         RETURNS:
         pd.Dataframe: Data frame with excess shot rate for all the teams and league average shot rate by lcoation"""
         
+        #Shot counts and excess shot rates of every team on the 1 ft rink grid (see NHLShotStatsEngine.get_shot_grid)
+        grid = self.engine.get_shot_grid(season)
+        rates = self.engine.get_excess_shot_rate_grid(season)
 
-        df = self.data_parser.get_shot_and_goal_pbp_df_for_seasons(season)
-
-        #Filter The dataframe for the regular season.
-        df = df[df['gameId'].apply(lambda x: str(x)[5]=='2')]
-
-        #Filter the dataframe to consider only the offensive zone stats
-        df = df[(df['zoneCode']=='O')|(df['zoneCode']=='N')]
-
-        #Mirror the coordinates of the shots for one side of the field to get all coordinates in one half of the field
-        df.loc[df['xCoord']<0,'yCoord']=-df.loc[df['xCoord']<0,'yCoord']
-        df.loc[:,'xCoord']=df.loc[:,'xCoord'].abs()
+        #Keep the locations with at least one shot
+        league_counts = grid['counts'].sum(axis=0)
+        x_cells,y_cells = np.nonzero(league_counts)
+        df_shot_loc = pd.DataFrame({'xCoord':rates['x'][x_cells],
+                                    'yCoord':rates['y'][y_cells],
+                                    'league_ShotCount':league_counts[x_cells,y_cells]})
+        df_teams = pd.DataFrame(rates['excess'][:,x_cells,y_cells].T,columns=rates['teams'])
+        df_shot_loc = pd.concat([df_shot_loc,df_teams],axis=1)
+        df_shot_loc['league_shotRate'] = rates['league'][x_cells,y_cells]
 
-        #Group the shots by location
-        df_shot_loc = df.groupby(['xCoord','yCoord']).size().reset_index().rename(columns={0:'league_ShotCount'})
-
-        #Calculate shot rate per hour for each team over the coordinates    
-        for name in team_list:
-            df_team = df[df['shootingTeam']==name]
-            df_team_loc = df_team.groupby(['xCoord','yCoord']).size().reset_index().rename(columns={0:name})
-            df_team_loc[name] = df_team_loc[name].div(82)
-            df_shot_loc=pd.merge(left=df_shot_loc,right=df_team_loc,how='left',on=['xCoord','yCoord'])
-            df_shot_loc[name] = df_shot_loc[name].fillna(0)
-        
-        #Calculate League Average Shot Rate over the coordinates 
-        df_shot_loc['league_shotRate']=df_shot_loc[team_list].sum(axis=1)/32
-
-        #Calculate the difference in shot rate per hour for all teams over the coordinates
-        for name in team_list:
-            df_shot_loc[name]=df_shot_loc[name].sub(df_shot_loc['league_shotRate'])
-        
         return df_shot_loc
     
     def plot_excess_shot_rate(self,season:int,xbin:int,ybin:int,sigma:float):
@@ -191,10 +147,12 @@ class NHLStats:
         season (int): The season to consider for the statistics
         xbin(int): bin width for length  
         ybin(int): bin width for width
-        sigma(float): standard deviation for gaussian filter
+        sigma(float): standard deviation for gaussian filter, in bins
         """
         
-        df = self.get_excess_shot_rate_df(season)
+        #The grid of the season is cached, so only the binning and the smoothing run again for other bin sizes
+        grid = self.engine.get_excess_shot_rate_grid(season,bin_size=(xbin,ybin),sigma=sigma)
+        teams = list(grid['teams'])
         local_data_path = os.getenv('RINK_IMG_PATH')
         rink_image_path = os.path.join(local_data_path, f'nhl_rink.png')
         rink_image = Image.open(rink_image_path)
@@ -202,22 +160,19 @@ class NHLStats:
         crop_rink_image = crop_rink_image.resize((680,800))
         button_list = []
         fig = go.Figure()
-        for team in team_list:
+        for index,team in enumerate(teams):
             fig.add_trace(
-                go.Histogram2dContour(y = df['xCoord'],
-                                  x = -df['yCoord'],
-                                  z = gaussian_filter(df[team],sigma=sigma),
-                                  colorscale = 'RdBu',
-                                  colorbar={"title": f"Excess Shots Per Hour<br> per {xbin*ybin} sqft"},
-                                  reversescale = True,
-                                  histfunc='sum',
-                                  xbins=dict(size=xbin),
-                                  ybins=dict(size=ybin),
-                                  contours=dict(start=-1,end=1,size=0.1),
-                                  name = team))
+                go.Contour(y = grid['x'],
+                           x = -grid['y'],
+                           z = grid['excess'][index],
+                           colorscale = 'RdBu',
+                           colorbar={"title": f"Excess Shots Per Hour<br> per {xbin*ybin} sqft"},
+                           reversescale = True,
+                           contours=dict(start=-1,end=1,size=0.1),
+                           name = team))
             button_list.append(dict(label = team,
                                     method = 'update',
-                                    args = [{'visible': list(pd.Series(team_list)==team)},
+                                    args = [{'visible': list(pd.Series(teams)==team)},
                                             {'title': team + f": {season}-{season+1} ,<br>Regular Season Shot Rates Relative to League Average."}]))
         
         fig.update_layout(
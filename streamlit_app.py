@@ -1,10 +1,8 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import requests
 from wandb import Api
 import pickle
-import requests
 import os
 import ift6758.client as client
 import wandb
@@ -12,8 +10,6 @@ import wandb
 st.title("Live Game Dashboard")
 api = Api()
 MODEL_DIR = 'models'
-API_URL = 'https://api-web.nhle.com'
-PLAY_BY_PLAY_ENDPOINT = '/v1/gamecenter/{game-id}/play-by-play'
 api_key = os.getenv('WANDB_API_KEY', None)
 
 if not api_key:
@@ -57,11 +53,7 @@ with st.sidebar:
 with st.container():
     game_id = st.text_input("Game ID")
     try:
-        pbp_endpoint = PLAY_BY_PLAY_ENDPOINT.replace('{game-id}', game_id)
-        full_endpoint = API_URL + pbp_endpoint
-        response = requests.get(full_endpoint)
-        if response.status_code == 200:
-            json_data = response.json()
+        json_data = st.session_state.game_client.get_game_data(game_id)
         home_score = json_data['homeTeam']['score']
         away_score = json_data['awayTeam']['score']
         home_team = json_data['homeTeam']['commonName']['default']
@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def nhl_data_path(tmp_path, monkeypatch):
+    """Points NHL_DATA_PATH to an empty temporary directory, so tests never touch a real dataset."""
+    monkeypatch.setenv('NHL_DATA_PATH', str(tmp_path))
+    return tmp_path
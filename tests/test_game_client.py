@@ -0,0 +1,45 @@
+from ift6758.client.game_client import GameClient
+from ift6758.data.nhl_synthetic_games import NHLSyntheticGameGenerator
+import numpy as np
+import pandas as pd
+import pytest
+import random
+
+GAMES = 10
+BATCHES = 12
+
+
+@pytest.mark.parametrize('game_number', range(GAMES))
+def test_new_events_in_batches_match_full_parse(game_number, monkeypatch):
+    generator = NHLSyntheticGameGenerator(plays_per_game=300, seed=0)
+    game_id, game_data = next(generator.generate_games(generator.get_season_game_ids(2023, GAMES)[game_number:]))
+    plays = game_data['plays']
+
+    client = GameClient()
+    full_df = client.data_parser.raw_game_data_to_df(game_data, game_id).reset_index(drop=True)
+
+    # The game is polled while it is live, the plays arriving in batches of random sizes, then once it is over
+    rng = random.Random(game_number)
+    cuts = sorted(rng.sample(range(1, len(plays)), BATCHES)) + [len(plays)]
+    snapshots = [dict(game_data, plays=plays[:cut], gameState='LIVE') for cut in cuts] + [game_data]
+    batch_dfs = []
+
+    for snapshot in snapshots:
+        monkeypatch.setattr(client, 'get_game_data', lambda game_id, snapshot=snapshot: snapshot)
+        batch_dfs.append(client.get_new_events(game_id))
+
+    # Once every play was returned, polling again returns no event
+    assert batch_dfs[-1].empty
+
+    incremental_df = pd.concat([df for df in batch_dfs if not df.empty], ignore_index=True)
+
+    # Speeds without a time difference are filled with the mean speed of the game so far, which can only be the
+    # mean of the whole game once it is over, so they are the only values that depend on the batches
+    has_time_diff = full_df['timeDiff'] > 0
+
+    pd.testing.assert_frame_equal(
+        incremental_df.drop(columns='speed'),
+        full_df.drop(columns='speed'),
+        check_dtype=False
+    )
+    np.testing.assert_allclose(incremental_df['speed'][has_time_diff], full_df['speed'][has_time_diff])
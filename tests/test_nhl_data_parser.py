@@ -0,0 +1,253 @@
+from ift6758.data.nhl_data_parser import NHLDataParser
+from ift6758.data.nhl_game_store import NHLGameStore
+from ift6758.data.nhl_synthetic_games import NHLSyntheticGameGenerator
+import json
+import math
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+GAMES = 30
+
+# Columns of the row-wise parser that NHLDataParser replaced
+ROW_WISE_COLUMNS = [
+    'gameId',
+    'timeRemaining',
+    'periodNumber',
+    'timeInPeriod',
+    'isGoal',
+    'shotType',
+    'emptyNet',
+    'xCoord',
+    'yCoord',
+    'zoneCode',
+    'shootingTeam',
+    'shotDistance',
+    'shotAngle',
+    'shootingTeamSide',
+    'shootingPlayer',
+    'goalieInNet',
+    'previousEvent',
+    'timeDiff',
+    'previousEventX',
+    'previousEventY',
+    'rebound',
+    'distanceDiff',
+    'shotAngleDiff',
+    'speed'
+]
+
+
+def get_detail(x: object, info: str):
+    try:
+        return x.get(info)
+    except AttributeError:
+        return None
+
+
+def row_wise_shot_df(game_data: dict, game_id: str, stale_row: bool) -> pd.DataFrame:
+    """Shots-on-net and goals of a game, computed play by play as the parser did before its features were vectorized.
+
+    Args:
+        game_data (dict): Raw game data JSON
+        game_id (str): Game ID of the game
+        stale_row (bool): If shotAngleDiff checks the previous event coordinates of the last shot of the game for every
+            shot, as the row-wise parser did, instead of the coordinates of each shot's own previous event.
+
+    Returns:
+        pd.DataFrame: Shots-on-net and goals with the columns of ROW_WISE_COLUMNS.
+    """
+    all_plays = pd.DataFrame(game_data['plays'])
+    rosters = pd.DataFrame(game_data['rosterSpots'])
+
+    all_plays['timeRemaining'] = all_plays['timeRemaining'].apply(lambda t: int(t.split(':')[0]) * 60 + int(t.split(':')[1]))
+    all_plays['previousEvent'] = all_plays['typeDescKey'].shift(1)
+    all_plays['timeDiff'] = all_plays['timeRemaining'].shift(1) - all_plays['timeRemaining']
+
+    for col in ['xCoord', 'yCoord']:
+        all_plays[col] = all_plays['details'].apply(lambda x: get_detail(x, col))
+
+    all_plays['previousEventX'] = all_plays['xCoord'].shift(1)
+    all_plays['previousEventY'] = all_plays['yCoord'].shift(1)
+    all_plays['distanceDiff'] = all_plays.apply(
+        lambda row: math.sqrt((row['xCoord'] - row['previousEventX']) ** 2 + (row['yCoord'] - row['previousEventY']) ** 2),
+        axis=1
+    )
+
+    shots = all_plays[all_plays['typeDescKey'].isin(['shot-on-goal', 'goal'])].copy()
+    shots['rebound'] = shots['previousEvent'].apply(lambda x: 1 if x == 'shot-on-goal' else 0)
+    shots['speed'] = shots.apply(
+        lambda row: row['distanceDiff'] / row['timeDiff'] if pd.notna(row['timeDiff']) and row['timeDiff'] > 0 else -1,
+        axis=1
+    )
+    shots['speed'] = shots['speed'].replace(-1, shots[shots['speed'] != -1]['speed'].mean())
+    shots['isGoal'] = shots['typeDescKey'].map({'shot-on-goal': 0, 'goal': 1})
+
+    shots['periodNumber'] = shots['periodDescriptor'].apply(lambda x: x.get('number'))
+    for col in ['shotType', 'goalieInNetId', 'zoneCode']:
+        shots[col] = shots['details'].apply(lambda x: get_detail(x, col))
+
+    shots['shootingPlayerId'] = shots.apply(
+        lambda event: event['details'].get('scoringPlayerId') if event['isGoal'] == 1 else event['details'].get('shootingPlayerId'),
+        axis=1
+    )
+
+    player_name_map = rosters.set_index('playerId').apply(
+        lambda p: f"{p['firstName']['default']} {p['lastName']['default']}",
+        axis=1
+    ).to_dict()
+    team_id_map = {
+        game_data['homeTeam']['id']: game_data['homeTeam']['commonName']['default'],
+        game_data['awayTeam']['id']: game_data['awayTeam']['commonName']['default']
+    }
+
+    shots['shootingTeam'] = shots['shootingPlayerId'].map(rosters.set_index('playerId')['teamId'].to_dict()).map(team_id_map)
+    shots['shootingPlayer'] = shots['shootingPlayerId'].map(player_name_map)
+    shots['goalieInNet'] = shots['goalieInNetId'].map(player_name_map)
+    shots['emptyNet'] = np.where(shots['goalieInNet'].isna(), 1, 0)
+
+    # Side of the first team to shoot in the offensive (or else defensive) zone of period 1
+    period1 = shots[shots['periodNumber'] == 1]
+    offense, defense = period1[period1['zoneCode'] == 'O'], period1[period1['zoneCode'] == 'D']
+    first = offense.iloc[0] if not offense.empty else defense.iloc[0]
+    side = (1 if first['xCoord'] < 0 else 0) if not offense.empty else (0 if first['xCoord'] < 0 else 1)
+
+    is_first_team = shots['shootingTeam'] == first['shootingTeam']
+    is_period_odd = shots['periodNumber'] % 2 == 1
+    shots['shootingTeamSide'] = np.where(is_first_team == is_period_odd, side, 1 - side)
+
+    shots['shotDistance'] = None
+    shots['shotAngle'] = None
+
+    for index, row in shots.iterrows():
+        net_x = -89 if 1 - row['shootingTeamSide'] == 0 else 89
+        shots.at[index, 'shotDistance'] = math.sqrt((row['xCoord'] - net_x) ** 2 + row['yCoord'] ** 2)
+        shots.at[index, 'shotAngle'] = math.degrees(math.atan2(abs(row['yCoord']), abs(net_x - row['xCoord'])))
+
+    shots['previousShotAngle'] = shots['shotAngle'].shift(1)
+    shots['shotAngleDiff'] = shots.apply(
+        lambda shot: abs(shot['shotAngle'] - shot['previousShotAngle'])
+            if shot['rebound'] == 1 and pd.notna((row if stale_row else shot)['previousEventX'])
+                and pd.notna((row if stale_row else shot)['previousEventY'])
+            else 0,
+        axis=1
+    )
+
+    shots = shots.dropna(subset=['shotType', 'xCoord', 'yCoord', 'zoneCode'])
+    shots['gameId'] = game_id
+
+    for col in ['shotDistance', 'shotAngle', 'shotAngleDiff']:
+        shots[col] = shots[col].astype(float)
+
+    return shots[ROW_WISE_COLUMNS]
+
+
+@pytest.fixture(scope='module')
+def games():
+    generator = NHLSyntheticGameGenerator(plays_per_game=300, seed=0)
+    return list(generator.generate_games(generator.get_season_game_ids(2023, GAMES)))
+
+
+def test_vectorized_features_match_row_wise_parser(games):
+    parser = NHLDataParser()
+
+    for game_id, game_data in games:
+        df = parser.raw_game_data_to_df(game_data, game_id)
+        expected = row_wise_shot_df(game_data, game_id, stale_row=False)
+
+        pd.testing.assert_frame_equal(
+            df[ROW_WISE_COLUMNS].reset_index(drop=True),
+            expected.reset_index(drop=True),
+            check_dtype=False
+        )
+
+
+def test_shot_angle_diff_checks_each_shots_previous_event(games):
+    """The row-wise parser checked the previous event coordinates of the last shot of the game for every shot
+    (a stale loop variable). The vectorized parser checks each shot's own previous event, so shotAngleDiff is
+    the angle difference for rebounds whose previous event has coordinates, and 0 for every other shot."""
+    parser = NHLDataParser()
+    changed_rows = 0
+
+    for game_id, game_data in games:
+        df = parser.raw_game_data_to_df(game_data, game_id).reset_index(drop=True)
+        expected = row_wise_shot_df(game_data, game_id, stale_row=False).reset_index(drop=True)
+        stale = row_wise_shot_df(game_data, game_id, stale_row=True).reset_index(drop=True)
+        is_counted = df['rebound'].eq(1) & df['previousEventX'].notna() & df['previousEventY'].notna()
+
+        assert (df.loc[~is_counted, 'shotAngleDiff'] == 0).all()
+        np.testing.assert_allclose(df['shotAngleDiff'], expected['shotAngleDiff'])
+
+        changed = ~np.isclose(df['shotAngleDiff'], stale['shotAngleDiff'], equal_nan=True)
+        assert (df.loc[changed, 'rebound'] == 1).all()
+        changed_rows += changed.sum()
+
+    # The behavior change is visible on these games: some rebounds are counted differently than before
+    assert changed_rows > 0
+
+
+def test_cached_season_is_read_without_network(games, monkeypatch):
+    store = NHLGameStore()
+
+    for game_id, game_data in games:
+        store.write_game(game_id, json.dumps(game_data).encode())
+
+    requested_urls = []
+
+    def request(session, method, url, *args, **kwargs):
+        requested_urls.append(url)
+        raise requests.exceptions.ConnectionError(f"Network disabled: {url}")
+
+    monkeypatch.setattr(requests.Session, 'request', request)
+
+    # The copied-in games are registered by the catalog, then parsed and read again from the cache
+    parser = NHLDataParser(workers=1)
+    parsed_df = parser.get_shot_and_goal_pbp_df_for_season(2023)
+    cached_df = NHLDataParser(workers=1).get_shot_and_goal_pbp_df_for_season(2023)
+
+    assert requested_urls == []
+    assert parsed_df['gameId'].nunique() == GAMES
+    pd.testing.assert_frame_equal(cached_df, parsed_df)
+
+
+def test_compact_seasons_share_categories():
+    generator = NHLSyntheticGameGenerator(plays_per_game=300, seed=1)
+    store = NHLGameStore()
+
+    for season in (2022, 2023):
+        for game_id, game_data in generator.generate_games(generator.get_season_game_ids(season, 5)):
+            store.write_game(game_id, json.dumps(game_data).encode())
+
+    parser = NHLDataParser(workers=1)
+    shots_df = parser.query_shots(2022, 2023)
+    compact_df = parser.query_shots(2022, 2023, compact=True)
+
+    # The ID columns are only returned when requested, or with compact types in place of the player names
+    assert list(shots_df.columns) == ROW_WISE_COLUMNS
+    assert {'shootingPlayerId', 'goalieInNetId'} <= set(compact_df.columns)
+    assert not {'shootingPlayer', 'goalieInNet'} & set(compact_df.columns)
+
+    for col in ('shotType', 'zoneCode', 'shootingTeam', 'previousEvent'):
+        assert isinstance(compact_df[col].dtype, pd.CategoricalDtype)
+        assert compact_df[col].astype(object).equals(shots_df[col].astype(object))
+
+
+def test_event_store_matches_raw_game_data(games):
+    store = NHLGameStore()
+
+    for game_id, game_data in games:
+        store.write_game(game_id, json.dumps(game_data).encode())
+
+    parser = NHLDataParser(workers=1)
+    event_store = parser.get_event_store([game_id for game_id, _ in games])
+    expected = pd.concat([parser.raw_game_data_to_df(game_data, game_id) for game_id, game_data in games], ignore_index=True)
+
+    shots_df = parser.event_store_to_shot_df(event_store)
+
+    # The event store keeps the repeated strings as categoricals
+    categorical_columns = [col for col, dtype in shots_df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    shots_df = shots_df.astype({col: object for col in categorical_columns})
+
+    assert parser.parse_failures == {}
+    pd.testing.assert_frame_equal(shots_df, expected, check_dtype=False)
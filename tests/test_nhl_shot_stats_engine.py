@@ -0,0 +1,58 @@
+from ift6758.visualizations.nhl_shot_stats_engine import NHLShotStatsEngine
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def make_shots(count: int = 2000, seed: int = 0) -> pd.DataFrame:
+    """Random shots of a few teams, some without a team (e.g. unknown shooting team) or a distance."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'shotDistance': rng.integers(0, 100, count).astype(float),
+        'shootingTeam': rng.choice(['Canadiens', 'Bruins', 'Leafs', None], count, p=[0.3, 0.3, 0.3, 0.1]),
+        'isGoal': (rng.random(count) < 0.1).astype(int)
+    })
+    df.loc[rng.choice(count, 20, replace=False), 'shotDistance'] = np.nan
+    return df
+
+
+def interval_range_probabilities(df: pd.DataFrame, shots: pd.DataFrame, bin_width: float, norm: bool) -> tuple:
+    """Goal probabilities as computed by NHLStats before the engine: one pass over the shots per interval."""
+    bins = pd.interval_range(shots['shotDistance'].min(), shots['shotDistance'].max(), freq=bin_width)
+    probabilities = []
+
+    for interval in bins:
+        bin_shots = shots[shots['shotDistance'].apply(lambda x: x in interval)]
+        denominator = df.shape[0] if norm else bin_shots.shape[0]
+        probabilities.append(sum(bin_shots['isGoal'] == 1) / denominator if denominator else np.nan)
+
+    return bins.mid.to_numpy(), np.array(probabilities)
+
+
+@pytest.mark.parametrize('bin_width', [1, 2.5, 7])
+@pytest.mark.parametrize('norm', [False, True])
+def test_binned_goal_probability_matches_interval_range(bin_width, norm):
+    df = make_shots()
+    engine = NHLShotStatsEngine()
+
+    result = engine.get_binned_goal_probability(df, 'shotDistance', bin_width, norm=norm)
+    mids, probabilities = interval_range_probabilities(df, df, bin_width, norm)
+
+    np.testing.assert_allclose(result['binMid'], mids)
+    np.testing.assert_allclose(result['probability'], probabilities, equal_nan=True)
+
+
+@pytest.mark.parametrize('norm', [False, True])
+def test_binned_goal_probability_by_group_skips_missing_keys(norm):
+    df = make_shots()
+    engine = NHLShotStatsEngine()
+
+    result = engine.get_binned_goal_probability(df, 'shotDistance', 5, by=['shootingTeam'], norm=norm)
+
+    assert sorted(result['shootingTeam'].unique()) == ['Bruins', 'Canadiens', 'Leafs']
+
+    for team, team_result in result.groupby('shootingTeam'):
+        mids, probabilities = interval_range_probabilities(df, df[df['shootingTeam'] == team], 5, norm)
+
+        np.testing.assert_allclose(team_result['binMid'], mids)
+        np.testing.assert_allclose(team_result['probability'], probabilities, equal_nan=True)